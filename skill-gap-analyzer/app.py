@@ -5,9 +5,14 @@ This application provides job posting analysis, skill comparison, and personaliz
 learning path generation using Google AI Studio tools (Gemini API, Nano Banana Pro, NotebookLM).
 """
 
+import hashlib
 import os
-from flask import Flask, render_template, request, jsonify, session
+import time
+import uuid
+from functools import wraps
+from flask import Flask, Response, g, make_response, render_template, request, jsonify, session, url_for
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 import logging
 from datetime import datetime
 import json
@@ -16,9 +21,22 @@ import json
 from services.job_analyzer import JobAnalyzer
 from services.skill_comparator import SkillComparator
 from services.learning_path_generator import LearningPathGenerator
-from services.firebase_service import FirebaseService
+from services.firebase_service import ANALYSIS_VERSION, FirebaseService
+from services.circuit_breaker import circuit_breaker_states
+from services.analysis_queue import AnalysisQueue, QueueFullError
+from services.rate_limiter import RateLimiter, upstream_rate_limiter_stats
+from services.profiler import RequestProfiler
+from services import metrics
 from config import Config
 
+def skill_update_error(skill_name, proficiency):
+    """Why a skill progress update is invalid, or None if it can be applied"""
+    if not isinstance(skill_name, str) or not skill_name.strip():
+        return 'skill_name is required'
+    if isinstance(proficiency, bool) or not isinstance(proficiency, int) or not 1 <= proficiency <= 10:
+        return 'proficiency_level must be an integer from 1 to 10'
+    return None
+
 def create_app():
     """Application factory pattern for Flask app creation"""
     app = Flask(__name__)
@@ -29,6 +47,10 @@ def create_app():
     # Enable CORS for cross-origin requests
     CORS(app)
     
+    # Trust X-Forwarded-For from our own load balancer so clients are told apart
+    if Config.TRUSTED_PROXY_COUNT:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=Config.TRUSTED_PROXY_COUNT)
+    
     # Configure logging
     logging.basicConfig(
         level=logging.INFO,
@@ -40,6 +62,76 @@ def create_app():
     skill_comparator = SkillComparator()
     learning_path_generator = LearningPathGenerator()
     firebase_service = FirebaseService()
+    analysis_queue = AnalysisQueue(on_status=firebase_service.store_analysis_status)
+    client_rate_limiter = RateLimiter('client', Config.RATE_LIMIT_PER_MINUTE, Config.RATE_LIMIT_BURST)
+    
+    def rate_limited(view):
+        """Apply the per-client token bucket to POST requests on an endpoint"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method == 'POST':
+                allowed, retry_after = client_rate_limiter.check(f'{request.endpoint}:{request.remote_addr}')
+                if not allowed:
+                    response = jsonify({'error': 'Rate limit exceeded. Please slow down.'})
+                    response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+                    return response, 429
+            return view(*args, **kwargs)
+        return wrapper
+    
+    def run_analysis(job_posting, user_skills, analysis_id=None, user_id=None):
+        """Run the full analysis pipeline and persist the result"""
+        # Analyze job posting
+        with metrics.STAGE_DURATION.time(stage='job_analysis'):
+            job_analysis = job_analyzer.extract_job_skills(job_posting)
+        
+        # Compare with user skills
+        with metrics.STAGE_DURATION.time(stage='skill_comparison'):
+            skill_comparison = skill_comparator.compare_skills(user_skills, job_analysis)
+        
+        # Generate learning path
+        with metrics.STAGE_DURATION.time(stage='learning_path'):
+            learning_path = learning_path_generator.generate_path(skill_comparison)
+        
+        # Store results in Firebase
+        with metrics.STAGE_DURATION.time(stage='storage'):
+            analysis_id = firebase_service.store_analysis({
+                'job_analysis': job_analysis,
+                'skill_comparison': skill_comparison,
+                'learning_path': learning_path,
+                'timestamp': datetime.now().isoformat()
+            }, analysis_id=analysis_id, user_id=user_id)
+        
+        return {
+            'analysis_id': analysis_id,
+            'job_analysis': job_analysis,
+            'skill_comparison': skill_comparison,
+            'learning_path': learning_path
+        }
+    
+    register_service_metrics(job_analyzer, learning_path_generator, firebase_service,
+                             analysis_queue, client_rate_limiter)
+    
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        metrics.HTTP_REQUESTS_IN_FLIGHT.inc()
+    
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('request_started', None)
+        if started is not None:
+            endpoint = request.endpoint or 'unmatched'
+            metrics.HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, endpoint=endpoint, method=request.method)
+            metrics.HTTP_REQUESTS_TOTAL.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+        return response
+    
+    @app.teardown_request
+    def finish_request(exc):
+        metrics.HTTP_REQUESTS_IN_FLIGHT.dec()
+    
+    profiler = RequestProfiler()
+    if profiler.enabled:
+        register_profiling(app, profiler)
     
     @app.route('/')
     def index():
@@ -47,6 +139,7 @@ def create_app():
         return render_template('index.html')
     
     @app.route('/analyze', methods=['GET', 'POST'])
+    @rate_limited
     def analyze_job():
         """Job posting analysis interface"""
         if request.method == 'GET':
@@ -56,51 +149,125 @@ def create_app():
             # Get job posting text from form
             job_posting = request.json.get('job_posting', '')
             user_skills = request.json.get('user_skills', [])
+            user_id = request.json.get('user_id')
             
             if not job_posting:
                 return jsonify({'error': 'Job posting text is required'}), 400
             
-            # Analyze job posting
-            job_analysis = job_analyzer.extract_job_skills(job_posting)
-            
-            # Compare with user skills
-            skill_comparison = skill_comparator.compare_skills(user_skills, job_analysis)
+            run_async = request.args.get('async', '').lower() in ('1', 'true') or request.json.get('async') is True
+            if not run_async:
+                return jsonify(run_analysis(job_posting, user_skills, user_id=user_id))
             
-            # Generate learning path
-            learning_path = learning_path_generator.generate_path(skill_comparison)
+            # Queue the pipeline and hand back an id to poll
+            analysis_id = str(uuid.uuid4())
+            try:
+                status = analysis_queue.submit(analysis_id, run_analysis, job_posting, user_skills, analysis_id, user_id)
+            except QueueFullError:
+                response = jsonify({'error': 'Analysis queue is full. Please retry shortly.'})
+                response.headers['Retry-After'] = str(Config.ANALYSIS_QUEUE_RETRY_AFTER)
+                return response, 429
             
-            # Store results in Firebase
-            analysis_id = firebase_service.store_analysis({
-                'job_analysis': job_analysis,
-                'skill_comparison': skill_comparison,
-                'learning_path': learning_path,
-                'timestamp': datetime.now().isoformat()
-            })
-            
-            return jsonify({
+            status_url = url_for('analysis_status', analysis_id=analysis_id)
+            response = jsonify({
                 'analysis_id': analysis_id,
-                'job_analysis': job_analysis,
-                'skill_comparison': skill_comparison,
-                'learning_path': learning_path
+                'status': status['status'],
+                'status_url': status_url,
+                'results_url': url_for('view_results', analysis_id=analysis_id)
             })
+            response.headers['Location'] = status_url
+            return response, 202
             
         except Exception as e:
             app.logger.error(f"Error in job analysis: {str(e)}")
             return jsonify({'error': 'Analysis failed. Please try again.'}), 500
     
+    # A results page only changes with the stored analysis format or the templates rendering it
+    results_render_version = hashlib.sha256(''.join(
+        app.jinja_env.loader.get_source(app.jinja_env, name)[0] for name in ('base.html', 'results.html')
+    ).encode('utf-8')).hexdigest()[:12]
+    
+    def results_etag(analysis_id, created_at):
+        return f'{analysis_id}-{created_at}-{ANALYSIS_VERSION}-{results_render_version}'
+    
     @app.route('/results/<analysis_id>')
     def view_results(analysis_id):
-        """Display analysis results"""
+        """Display analysis results (conditional requests are answered without loading the analysis)"""
         try:
-            results = firebase_service.get_analysis(analysis_id)
-            if not results:
-                return render_template('error.html', message='Analysis not found'), 404
+            # A revalidation reads only the creation time, so an analysis that expired or never existed gets a 404, not a 304
+            created_at = firebase_service.get_analysis_created_at(analysis_id) if request.if_none_match else None
+            if created_at and request.if_none_match.contains(results_etag(analysis_id, created_at)):
+                response = Response(status=304)
+            else:
+                results = firebase_service.get_analysis(analysis_id)
+                if not results:
+                    return render_template('error.html', message='Analysis not found'), 404
+                created_at = results.get('created_at', '')
+                response = make_response(render_template('results.html', results=results))
             
-            return render_template('results.html', results=results)
+            response.set_etag(results_etag(analysis_id, created_at))
+            response.cache_control.private = True
+            response.cache_control.max_age = Config.RESULTS_CACHE_MAX_AGE
+            return response
         except Exception as e:
             app.logger.error(f"Error retrieving results: {str(e)}")
             return render_template('error.html', message='Failed to load results'), 500
     
+    @app.route('/api/analysis/<analysis_id>/status')
+    def analysis_status(analysis_id):
+        """Poll an asynchronous analysis; ?wait=N long-polls up to N seconds"""
+        try:
+            wait = min(float(request.args.get('wait', 0)), Config.ANALYSIS_STATUS_MAX_WAIT)
+        except ValueError:
+            return jsonify({'error': 'wait must be a number of seconds'}), 400
+        
+        wait = max(wait, 0)
+        status = analysis_queue.get_status(analysis_id, wait=wait)
+        if status is None:
+            # Submitted to another worker; every worker publishes its jobs' status to the shared store
+            deadline = time.monotonic() + wait
+            status = firebase_service.get_analysis_status(analysis_id)
+            while status and status['status'] in (AnalysisQueue.QUEUED, AnalysisQueue.RUNNING):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(min(Config.ANALYSIS_STATUS_POLL_INTERVAL, remaining))
+                status = firebase_service.get_analysis_status(analysis_id)
+        
+        if status is None:
+            # Status expired or never published; a stored analysis still means it completed
+            if firebase_service.get_analysis_created_at(analysis_id):
+                status = {'analysis_id': analysis_id, 'status': AnalysisQueue.COMPLETED}
+            else:
+                return jsonify({'error': 'Analysis not found'}), 404
+        
+        if status['status'] == AnalysisQueue.COMPLETED:
+            status = dict(status, results_url=url_for('view_results', analysis_id=analysis_id))
+        return jsonify(status)
+    
+    @app.route('/api/users/<user_id>/analyses')
+    def user_analyses(user_id):
+        """A user's analyses, most recent first; pass next_cursor back as ?cursor= for older ones"""
+        try:
+            limit = int(request.args.get('limit', 10))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        limit = max(1, min(limit, Config.API_MAX_PAGE_SIZE))
+        
+        page = firebase_service.get_user_analyses_page(user_id, limit=limit, cursor=request.args.get('cursor'))
+        return jsonify(dict(page, user_id=user_id))
+    
+    @app.route('/api/users/<user_id>/progress-history')
+    def progress_history(user_id):
+        """A user's progress updates, newest first; pass next_cursor back as ?cursor= for older ones"""
+        try:
+            limit = int(request.args.get('limit', 10))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        limit = max(1, min(limit, Config.API_MAX_PAGE_SIZE))
+        
+        page = firebase_service.get_progress_history_page(user_id, limit=limit, cursor=request.args.get('cursor'))
+        return jsonify(dict(page, user_id=user_id))
+    
     @app.route('/progress/<user_id>')
     def track_progress(user_id):
         """User progress tracking dashboard"""
@@ -112,6 +279,7 @@ def create_app():
             return render_template('error.html', message='Failed to load progress'), 500
     
     @app.route('/api/update-progress', methods=['POST'])
+    @rate_limited
     def update_progress():
         """API endpoint for updating learning progress"""
         try:
@@ -119,8 +287,11 @@ def create_app():
             skill_name = request.json.get('skill_name')
             new_proficiency = request.json.get('proficiency_level')
             
-            if not all([user_id, skill_name, new_proficiency]):
+            if not user_id or skill_name is None or new_proficiency is None:
                 return jsonify({'error': 'Missing required fields'}), 400
+            error = skill_update_error(skill_name, new_proficiency)
+            if error:
+                return jsonify({'error': error}), 400
             
             # Update progress in Firebase
             firebase_service.update_skill_progress(user_id, skill_name, new_proficiency)
@@ -131,17 +302,201 @@ def create_app():
             app.logger.error(f"Error updating progress: {str(e)}")
             return jsonify({'error': 'Failed to update progress'}), 500
     
+    @app.route('/api/update-progress-batch', methods=['POST'])
+    @rate_limited
+    def update_progress_batch():
+        """Update several skills at once; every item is validated before anything is written"""
+        payload = request.get_json(silent=True) or {}
+        user_id = payload.get('user_id')
+        items = payload.get('updates')
+        
+        if not user_id or not isinstance(items, list) or not items:
+            return jsonify({'error': 'user_id and a non-empty updates list are required'}), 400
+        if len(items) > Config.PROGRESS_BATCH_MAX_UPDATES:
+            return jsonify({'error': f'At most {Config.PROGRESS_BATCH_MAX_UPDATES} updates per batch'}), 400
+        
+        results = []
+        valid_updates = []
+        for index, item in enumerate(items):
+            item = item if isinstance(item, dict) else {}
+            skill_name = item.get('skill_name')
+            proficiency = item.get('proficiency_level')
+            result = {'index': index, 'skill_name': skill_name}
+            
+            error = skill_update_error(skill_name, proficiency)
+            if error:
+                result.update(status='invalid', error=error)
+            else:
+                valid_updates.append((skill_name, proficiency))
+                result['status'] = 'pending'
+            results.append(result)
+        
+        if not valid_updates:
+            return jsonify({'error': 'No valid updates', 'results': results}), 400
+        
+        # Valid items are applied together: one write, statistics updated once
+        applied = firebase_service.update_skill_progress_batch(user_id, valid_updates)
+        for result in results:
+            if result['status'] == 'pending':
+                result['status'] = 'updated' if applied else 'failed'
+        
+        body = {
+            'success': applied,
+            'updated': len(valid_updates) if applied else 0,
+            'invalid': len(results) - len(valid_updates),
+            'results': results
+        }
+        return jsonify(body), 200 if applied else 500
+    
     @app.route('/health')
     def health_check():
         """Health check endpoint for deployment monitoring"""
         return jsonify({
             'status': 'healthy',
             'timestamp': datetime.now().isoformat(),
-            'version': '1.0.0'
+            'version': '1.0.0',
+            'analysis_cache': job_analyzer.cache.stats(),
+            'request_coalescing': {
+                'gemini': job_analyzer.single_flight.stats(),
+                'notebooklm': learning_path_generator.single_flight.stats()
+            },
+            'circuit_breakers': circuit_breaker_states(),
+            'analysis_queue': analysis_queue.stats(),
+            'llm_cassette': job_analyzer.cassette.stats(),
+            'local_store': firebase_service.local_storage.stats(),
+            'results_cache': dict(firebase_service.analysis_cache.stats(), hits=firebase_service.analysis_cache_hits,
+                                  misses=firebase_service.analysis_cache_misses) if firebase_service.analysis_cache else None,
+            'shared_job_analysis_cache': firebase_service.job_analysis_cache.stats(),
+            'expiry': firebase_service.expiry_stats,
+            'firebase_write_behind': firebase_service.write_behind.stats() if firebase_service.write_behind else None,
+            'rate_limits': {
+                'client': client_rate_limiter.stats(),
+                'upstream': upstream_rate_limiter_stats()
+            }
         })
     
+    @app.route('/metrics')
+    def prometheus_metrics():
+        """Prometheus scrape endpoint (per worker process)"""
+        return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
+    
     return app
 
+def register_profiling(app, profiler):
+    """Install per-request profiling hooks and the admin endpoints serving stored profiles"""
+    def supplied_token():
+        return request.headers.get('X-Profile-Token') or request.args.get('profile_token')
+    
+    @app.before_request
+    def start_profiling():
+        if request.path.startswith('/admin/profiles'):
+            return
+        if profiler.should_profile(supplied_token()):
+            g.profile = profiler.start()
+    
+    @app.after_request
+    def finish_profiling(response):
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profile_id = profiler.finish(profile, {
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': round((time.perf_counter() - g.get('request_started', time.perf_counter())) * 1000, 1)
+            })
+            response.headers['X-Profile-Id'] = profile_id
+        return response
+    
+    @app.teardown_request
+    def stop_profiling(exc):
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profile.disable()
+    
+    @app.route('/admin/profiles')
+    def list_profiles():
+        """List stored request profiles"""
+        if not profiler.is_authorized(supplied_token()):
+            return jsonify({'error': 'Not found'}), 404
+        return jsonify({'profiles': profiler.list_profiles()})
+    
+    @app.route('/admin/profiles/<profile_id>')
+    def get_profile(profile_id):
+        """Download a profile as pstats data (default) or a text report (?format=text)"""
+        if not profiler.is_authorized(supplied_token()):
+            return jsonify({'error': 'Not found'}), 404
+        
+        if request.args.get('format') == 'text':
+            try:
+                report = profiler.get_text_report(profile_id, sort_by=request.args.get('sort', 'cumulative'))
+            except KeyError:
+                return jsonify({'error': 'Unknown sort key'}), 400
+            if report is None:
+                return jsonify({'error': 'Profile not found'}), 404
+            return Response(report, mimetype='text/plain')
+        
+        data = profiler.get_pstats(profile_id)
+        if data is None:
+            return jsonify({'error': 'Profile not found'}), 404
+        return Response(data, mimetype='application/octet-stream',
+                        headers={'Content-Disposition': f'attachment; filename={profile_id}.pstats'})
+
+def register_service_metrics(job_analyzer, learning_path_generator, firebase_service, analysis_queue, client_rate_limiter):
+    """Expose existing service counters as scrape-time metrics (no hot-path cost)"""
+    registry = metrics.registry
+    cache = job_analyzer.cache
+    
+    registry.callback('skill_gap_analysis_cache_hits_total', 'Job analysis cache hits', 'counter', lambda: cache.hits)
+    registry.callback('skill_gap_analysis_cache_misses_total', 'Job analysis cache misses', 'counter', lambda: cache.misses)
+    registry.callback('skill_gap_analysis_cache_entries', 'Entries in the job analysis cache', 'gauge', lambda: cache.backend.size())
+    if firebase_service.analysis_cache is not None:
+        registry.callback('skill_gap_results_cache_hits_total', 'Stored analyses served from the in-process results cache', 'counter',
+                          lambda: firebase_service.analysis_cache_hits)
+        registry.callback('skill_gap_results_cache_misses_total', 'Stored analyses loaded from the database', 'counter',
+                          lambda: firebase_service.analysis_cache_misses)
+        registry.callback('skill_gap_results_cache_bytes', 'Approximate size of the in-process results cache', 'gauge',
+                          lambda: firebase_service.analysis_cache.stats()['bytes'])
+    registry.callback('skill_gap_shared_job_analysis_cache_entries', 'Shared job analyses held in the in-process hot cache', 'gauge',
+                      lambda: len(firebase_service.job_analysis_cache))
+    registry.callback('skill_gap_expired_records_total', 'Stored records removed by the expiry sweeper', 'counter',
+                      lambda: {'analysis': firebase_service.expiry_stats['expired_analyses'],
+                               'job_analysis': firebase_service.expiry_stats['expired_job_analyses']}, ['kind'])
+    registry.callback('skill_gap_local_storage_entries', 'Keys held in the local storage fallback', 'gauge',
+                      lambda: len(firebase_service.local_storage))
+    registry.callback('skill_gap_local_storage_bytes', 'Approximate serialized size of the local storage fallback', 'gauge',
+                      lambda: firebase_service.local_storage.stats()['bytes'])
+    registry.callback('skill_gap_local_storage_evictions_total', 'Local storage entries evicted', 'counter',
+                      lambda: {'lru': firebase_service.local_storage.evicted_lru,
+                               'expired': firebase_service.local_storage.evicted_expired}, ['reason'])
+    if firebase_service.write_behind is not None:
+        write_behind = firebase_service.write_behind
+        registry.callback('skill_gap_firebase_write_behind_pending', 'Firebase paths waiting in the write-behind queue', 'gauge',
+                          lambda: write_behind.stats()['pending'])
+        registry.callback('skill_gap_firebase_write_behind_flushes_total', 'Multi-path updates written by the write-behind queue', 'counter',
+                          lambda: write_behind.flushes)
+        registry.callback('skill_gap_firebase_write_behind_failed_total', 'Firebase paths dropped after exhausting write-behind retries', 'counter',
+                          lambda: write_behind.failed)
+    registry.callback('skill_gap_analysis_queue_depth', 'Asynchronous analyses waiting for a worker', 'gauge',
+                      lambda: analysis_queue.stats()['queue_depth'])
+    registry.callback('skill_gap_analysis_queue_in_flight', 'Asynchronous analyses being processed', 'gauge',
+                      lambda: analysis_queue.stats()['in_flight'])
+    registry.callback('skill_gap_analysis_queue_rejected_total', 'Asynchronous analyses rejected because the queue was full', 'counter',
+                      lambda: analysis_queue.rejected)
+    registry.callback('skill_gap_analysis_failures_total', 'Asynchronous analyses that failed', 'counter',
+                      lambda: analysis_queue.failed)
+    registry.callback('skill_gap_coalesced_requests_total', 'Upstream requests served by an identical in-flight request', 'counter',
+                      lambda: {'gemini': job_analyzer.single_flight.coalesced,
+                               'notebooklm': learning_path_generator.single_flight.coalesced}, ['upstream'])
+    registry.callback('skill_gap_circuit_breaker_open', 'Circuit breaker state (0 closed, 0.5 half-open, 1 open)', 'gauge',
+                      lambda: {name: {'closed': 0, 'half_open': 0.5, 'open': 1}[state['state']]
+                               for name, state in circuit_breaker_states().items()}, ['upstream'])
+    registry.callback('skill_gap_circuit_breaker_short_circuited_total', 'Upstream calls skipped by an open circuit breaker', 'counter',
+                      lambda: {name: state['short_circuited'] for name, state in circuit_breaker_states().items()}, ['upstream'])
+    registry.callback('skill_gap_rate_limited_total', 'Requests rejected or shed by rate limiters', 'counter',
+                      lambda: {('client',): client_rate_limiter.limited,
+                               **{(f'upstream:{name}',): stats['limited'] for name, stats in upstream_rate_limiter_stats().items()}},
+                      ['limiter'])
+
 if __name__ == '__main__':
     app = create_app()
     port = int(os.environ.get('PORT', 5000))
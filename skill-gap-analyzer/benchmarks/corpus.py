@@ -0,0 +1,168 @@
+"""
+Synthetic benchmark corpus
+
+Seeded generator for realistic job postings (short blurbs to multi-page
+descriptions with varying skill density) and user skill profiles (1-200
+skills). The same seed always yields the same corpus, so benchmark runs are
+comparable across machines and commits.
+"""
+
+import os
+import random
+import sys
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.skill_taxonomy import taxonomy
+
+POSTING_SIZES = {
+    # name: (paragraphs, sentences per paragraph)
+    'short': (1, 3),
+    'medium': (4, 5),
+    'long': (10, 6),
+    'multipage': (40, 8)
+}
+
+SKILL_DENSITIES = {
+    'sparse': 0.1,
+    'normal': 0.3,
+    'dense': 0.7
+}
+
+COMPANIES = ['TechCorp India', 'Infosys', 'Razorpay', 'Swiggy', 'Zoho', 'Freshworks', 'Flipkart', 'CRED']
+TITLES = ['Software Developer', 'Backend Engineer', 'Frontend Engineer', 'Full Stack Developer',
+          'Data Scientist', 'DevOps Engineer', 'ML Engineer', 'Mobile Developer']
+CITIES = ['Bangalore', 'Hyderabad', 'Pune', 'Chennai', 'Gurgaon', 'Mumbai', 'Remote']
+
+FILLER_SENTENCES = [
+    'You will collaborate with product managers and designers to ship features our customers love.',
+    'We value ownership, clear communication and a bias for action.',
+    'The team follows agile practices with two-week sprints and regular retrospectives.',
+    'You will participate in code reviews and mentor junior engineers.',
+    'Our platform serves millions of users across India every day.',
+    'We offer flexible working hours, health insurance and a learning budget.',
+    'You should be comfortable working in a fast-paced startup environment.',
+    'Strong problem-solving skills and attention to detail are essential.',
+    'Experience working with distributed teams is a plus.',
+    'We are an equal opportunity employer and value diversity at our company.'
+]
+
+SKILL_SENTENCES = [
+    'Hands-on experience with {skill} is required.',
+    'Strong knowledge of {skill} and {other}.',
+    'You have built production systems using {skill}.',
+    '{years}+ years of experience in {skill} development.',
+    'Familiarity with {skill} or {other} is preferred.',
+    'Proficiency in {skill} and modern tooling around it.'
+]
+
+
+def _skill_terms() -> List[str]:
+    """Canonical names and aliases, as recruiters write them"""
+    terms = []
+    for skill in taxonomy.skills():
+        terms.append(skill.name if not skill.ambiguous else (skill.aliases[0] if skill.aliases else skill.name))
+        terms.extend(skill.aliases)
+    return terms
+
+
+SKILL_TERMS = _skill_terms()
+CANONICAL_SKILLS = [skill.name for skill in taxonomy.skills()]
+
+
+def generate_posting(rng: random.Random, size: str = 'medium', density: str = 'normal') -> str:
+    """
+    Generate one job posting
+
+    Args:
+        rng: Seeded random generator
+        size: One of POSTING_SIZES
+        density: One of SKILL_DENSITIES (share of sentences mentioning skills)
+
+    Returns:
+        Posting text
+    """
+    paragraphs, sentences = POSTING_SIZES[size]
+    skill_share = SKILL_DENSITIES[density]
+
+    lines = [
+        f'{rng.choice(TITLES)} - {rng.choice(COMPANIES)}',
+        f'Location: {rng.choice(CITIES)}, India',
+        f'Salary: ₹{rng.randint(4, 20)},00,000 - ₹{rng.randint(21, 45)},00,000 per annum',
+        ''
+    ]
+
+    for _ in range(paragraphs):
+        paragraph = []
+        for _ in range(sentences):
+            if rng.random() < skill_share:
+                paragraph.append(rng.choice(SKILL_SENTENCES).format(
+                    skill=rng.choice(SKILL_TERMS),
+                    other=rng.choice(SKILL_TERMS),
+                    years=rng.randint(1, 8)
+                ))
+            else:
+                paragraph.append(rng.choice(FILLER_SENTENCES))
+        lines.append(' '.join(paragraph))
+        lines.append('')
+
+    return '\n'.join(lines)
+
+
+def generate_user_profile(rng: random.Random, skill_count: int) -> List[Dict]:
+    """
+    Generate a user skill profile
+
+    Args:
+        rng: Seeded random generator
+        skill_count: Number of skills (1-200); beyond the taxonomy size, synthetic niche skills are added
+
+    Returns:
+        List of {'name', 'proficiency_level'} dicts
+    """
+    names = rng.sample(CANONICAL_SKILLS, min(skill_count, len(CANONICAL_SKILLS)))
+    names += [f'Niche Skill {i}' for i in range(skill_count - len(names))]
+    return [{'name': name.title(), 'proficiency_level': rng.randint(1, 10)} for name in names]
+
+
+def generate_job_analysis(rng: random.Random, skill_count: int) -> Dict:
+    """Generate a JobAnalyzer-shaped result with skill_count required skills"""
+    names = rng.sample(CANONICAL_SKILLS, min(skill_count, len(CANONICAL_SKILLS)))
+    return {
+        'company_name': rng.choice(COMPANIES),
+        'position_title': rng.choice(TITLES),
+        'salary_range': {'min_salary': None, 'max_salary': None, 'currency': 'INR'},
+        'experience_level': rng.choice(['junior', 'mid', 'senior']),
+        'required_skills': [
+            {
+                'name': name,
+                'priority': rng.choice(['critical', 'important', 'optional']),
+                'proficiency_required': rng.randint(5, 9)
+            }
+            for name in names
+        ],
+        'preferred_skills': [],
+        'technology_domains': ['backend', 'frontend']
+    }
+
+
+def generate_corpus(seed: int = 42) -> Dict:
+    """
+    Generate the full benchmark corpus
+
+    Args:
+        seed: Random seed
+
+    Returns:
+        Dictionary of postings by size/density, user profiles by size and job analyses by size
+    """
+    rng = random.Random(seed)
+    return {
+        'postings': {
+            f'{size}_{density}': [generate_posting(rng, size, density) for _ in range(5)]
+            for size in POSTING_SIZES for density in SKILL_DENSITIES
+        },
+        'profiles': {count: generate_user_profile(rng, count) for count in (1, 10, 50, 200)},
+        'job_analyses': {count: generate_job_analysis(rng, count) for count in (5, 15, 30)}
+    }
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Benchmark runner
+
+Times the CPU-bound parts of the analysis pipeline against the seeded synthetic
+corpus: fallback skill extraction, skill categorization, skill comparison (also
+against a prepared user skill index), fallback learning path generation, the
+analysis storage codec and FirebaseService local-store operations. Upstream
+APIs are never called. Results are written as JSON and compared with a
+baseline recorded on the same host; the run exits non-zero when any benchmark
+is slower than the baseline by more than the threshold. Timings only mean
+something on the machine that took them, so no baseline is committed: the
+first run on a host records one.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --output results.json --threshold 0.25
+    python benchmarks/run_benchmarks.py --update-baseline
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_corpus
+from services.analysis_codec import decode_analysis, encode_analysis
+from services.firebase_service import FirebaseService
+from services.job_analyzer import JobAnalyzer
+from services.learning_path_generator import LearningPathGenerator
+from services.local_store import InMemoryLocalStore, SQLiteLocalStore
+from services.skill_comparator import SkillComparator, UserSkillIndex
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baseline.local.json')  # per host, not committed
+DEFAULT_THRESHOLD = 0.5
+DEFAULT_MIN_DELTA_US = 1.0
+SCHEMA_VERSION = 1
+
+
+def measure(fn: Callable, repeat: int, min_time: float) -> Dict:
+    """
+    Time fn, calibrating the loop count so each sample runs for at least min_time
+
+    Args:
+        fn: Zero-argument callable to benchmark
+        repeat: Number of timed samples
+        min_time: Minimum duration of a single sample in seconds
+
+    Returns:
+        Per-call timings in microseconds
+    """
+    fn()  # warm up caches and lazy imports
+
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        loops *= 2
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - started) / loops * 1e6)
+
+    return {
+        'median_us': round(statistics.median(samples), 3),
+        'min_us': round(min(samples), 3),
+        'max_us': round(max(samples), 3),
+        'loops': loops,
+        'repeat': repeat
+    }
+
+
+def calibration_workload() -> None:
+    """Fixed pure-Python workload used to normalize timings for machine speed"""
+    counts = {}
+    for index in range(2000):
+        word = f'skill-{index % 97}'
+        counts[word] = counts.get(word, 0) + len(word.lower().split('-'))
+    sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+
+def build_benchmarks(corpus: Dict) -> Dict[str, Callable]:
+    """Create the named benchmark callables over the corpus"""
+    analyzer = JobAnalyzer()
+    comparator = SkillComparator()
+    generator = LearningPathGenerator()
+    generator.notebooklm_api_key = None  # always time the local fallback
+
+    benchmarks = {}
+
+    for name, postings in corpus['postings'].items():
+        benchmarks[f'fallback_extraction.{name}'] = (
+            lambda postings=postings: [analyzer._fallback_skill_extraction(posting) for posting in postings]
+        )
+
+    for count, profile in corpus['profiles'].items():
+        skill_names = [skill['name'] for skill in profile]
+        benchmarks[f'categorize_skills.{count}'] = lambda skill_names=skill_names: analyzer.categorize_skills(skill_names)
+
+    comparisons = {}
+    for profile_count, profile in corpus['profiles'].items():
+        index = UserSkillIndex(profile)
+        for job_count, job_analysis in corpus['job_analyses'].items():
+            key = f'{profile_count}x{job_count}'
+            benchmarks[f'compare_skills.{key}'] = (
+                lambda profile=profile, job_analysis=job_analysis: comparator.compare_skills(profile, job_analysis)
+            )
+            benchmarks[f'compare_skills_prepared.{key}'] = (
+                lambda index=index, job_analysis=job_analysis: comparator.compare_skills(index, job_analysis)
+            )
+            comparisons[key] = comparator.compare_skills(profile, job_analysis)
+
+    paths = {}
+    for key in ('1x30', '10x15', '50x5'):
+        benchmarks[f'generate_path.{key}'] = lambda comparison=comparisons[key]: generator.generate_path(comparison)
+        paths[key] = generator.generate_path(comparisons[key])
+    
+    for key, path in paths.items():
+        job_count = int(key.split('x')[1])
+        analysis = {
+            'job_analysis': corpus['job_analyses'][job_count],
+            'skill_comparison': comparisons[key],
+            'learning_path': path,
+            'analysis_id': 'benchmark-analysis',
+            'created_at': '2026-01-01T00:00:00'
+        }
+        stored = encode_analysis(analysis)
+        benchmarks[f'analysis_codec.encode.{key}'] = lambda analysis=analysis: encode_analysis(analysis)
+        benchmarks[f'analysis_codec.decode.{key}'] = lambda stored=stored: decode_analysis(stored)
+
+    benchmarks.update(build_firebase_benchmarks(corpus, comparisons['10x15'], 'firebase_local', InMemoryLocalStore()))
+    database_path = os.path.join(tempfile.mkdtemp(prefix='skill_gap_bench_'), 'local_store.db')
+    benchmarks.update(build_firebase_benchmarks(corpus, comparisons['10x15'], 'firebase_sqlite', SQLiteLocalStore(database_path)))
+    return benchmarks
+
+
+def build_firebase_benchmarks(corpus: Dict, comparison: Dict, prefix: str, local_store) -> Dict[str, Callable]:
+    """Benchmarks for FirebaseService running on the given local store"""
+    firebase_service = FirebaseService(local_store)
+    firebase_service.firebase_initialized = False  # never touch a real database
+
+    analysis = {
+        'job_analysis': corpus['job_analyses'][15],
+        'skill_comparison': comparison,
+        'learning_path': {},
+        'user_skills': corpus['profiles'][10],
+        'user_id': 'benchmark-user'
+    }
+    analysis_id = firebase_service.store_analysis(dict(analysis))
+
+    # A populated store: other users' analyses and a user with a progress history
+    for index in range(500):
+        firebase_service.store_analysis(dict(analysis, user_id=f'user-{index % 50}'))
+    firebase_service.store_user_profile('benchmark-user', {'skills': corpus['profiles'][50]})
+    for index in range(100):
+        firebase_service.update_skill_progress('benchmark-user', f'Skill {index % 20}', index % 10 + 1)
+
+    def store_analysis():
+        firebase_service.store_analysis(dict(analysis), 'benchmark-analysis')
+
+    def update_skill_progress():
+        firebase_service.update_skill_progress('benchmark-progress-user', 'Python', 7)
+
+    return {
+        f'{prefix}.store_analysis': store_analysis,
+        f'{prefix}.get_analysis': lambda: firebase_service.get_analysis(analysis_id),
+        f'{prefix}.get_user_profile': lambda: firebase_service.get_user_profile('benchmark-user'),
+        f'{prefix}.update_skill_progress': update_skill_progress,
+        f'{prefix}.get_user_progress': lambda: firebase_service.get_user_progress('benchmark-user'),
+        f'{prefix}.get_user_analyses': lambda: firebase_service.get_user_analyses('benchmark-user')
+    }
+
+
+def run(seed: int, repeat: int, min_time: float, selected: List[str] = None) -> Dict:
+    """Run every benchmark (or those whose name starts with one of selected)"""
+    corpus = generate_corpus(seed)
+    benchmarks = build_benchmarks(corpus)
+
+    results = {}
+    for name, fn in benchmarks.items():
+        if selected and not any(name.startswith(prefix) for prefix in selected):
+            continue
+        # Machine speed drifts (frequency scaling, noisy neighbours), so each
+        # benchmark carries its own calibration sample taken just before it
+        calibration = measure(calibration_workload, 3, min_time / 4)
+        results[name] = dict(measure(fn, repeat, min_time), calibration_us=calibration['min_us'])
+        print(f"  {name:<48} {results[name]['min_us']:>12.1f} µs")
+
+    return {
+        'schema_version': SCHEMA_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'system': platform.system()
+        },
+        'settings': {'seed': seed, 'repeat': repeat, 'min_time': min_time},
+        'results': results
+    }
+
+
+def compare_with_baseline(current: Dict, baseline: Dict, threshold: float, min_delta_us: float = DEFAULT_MIN_DELTA_US) -> List[Dict]:
+    """
+    Compare timings with a baseline run
+
+    The fastest sample is compared rather than the median: scheduler noise only
+    ever adds time, so the minimum is the most repeatable estimate of cost.
+    Baseline timings are scaled by the ratio of the calibration samples taken
+    next to each benchmark, so a baseline recorded on a faster or slower
+    machine remains comparable.
+
+    Args:
+        current: Result of run()
+        baseline: Stored result of an earlier run()
+        threshold: Allowed slowdown as a fraction (0.5 = 50% slower)
+        min_delta_us: Slowdowns smaller than this many microseconds are ignored
+
+    Returns:
+        List of regressions, empty when every benchmark is within the threshold
+    """
+    regressions = []
+    baseline_results = baseline.get('results', {})
+
+    for name, result in current['results'].items():
+        reference = baseline_results.get(name)
+        if not reference:
+            continue
+        speed_factor = 1.0
+        if result.get('calibration_us') and reference.get('calibration_us'):
+            speed_factor = result['calibration_us'] / reference['calibration_us']
+        expected_us = reference['min_us'] * speed_factor
+        ratio = result['min_us'] / expected_us if expected_us else 1.0
+        if ratio > 1 + threshold and result['min_us'] - expected_us > min_delta_us:
+            regressions.append({
+                'name': name,
+                'baseline_us': round(expected_us, 3),
+                'current_us': result['min_us'],
+                'ratio': round(ratio, 3)
+            })
+
+    return regressions
+
+
+def write_results(results: Dict, path: str) -> None:
+    """Write results as stable, diff-friendly JSON"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+    print(f"\nResults written to {path}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Skill Gap Analyzer benchmark suite')
+    parser.add_argument('--output', help='Write results JSON to this path')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Allowed slowdown before failing, as a fraction (default: 0.5)')
+    parser.add_argument('--min-delta-us', type=float, default=DEFAULT_MIN_DELTA_US,
+                        help='Ignore slowdowns smaller than this many microseconds (default: 1.0)')
+    parser.add_argument('--update-baseline', action='store_true', help='Overwrite the baseline with this run')
+    parser.add_argument('--seed', type=int, default=42, help='Corpus seed')
+    parser.add_argument('--repeat', type=int, default=7, help='Timed samples per benchmark')
+    parser.add_argument('--min-time', type=float, default=0.1, help='Minimum seconds per sample')
+    parser.add_argument('--only', action='append', help='Only run benchmarks whose name starts with this prefix')
+    args = parser.parse_args()
+
+    # Service warnings (missing API keys, Firebase fallback) are expected here
+    logging.disable(logging.CRITICAL)
+
+    print(f"Running benchmarks (seed={args.seed}, repeat={args.repeat})")
+    current = run(args.seed, args.repeat, args.min_time, args.only)
+
+    if args.update_baseline:
+        write_results(current, args.baseline)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        if args.output:
+            write_results(current, args.output)
+        write_results(current, args.baseline)
+        print("No baseline for this host yet; later runs compare against this one")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    if baseline.get('settings', {}).get('seed') != args.seed:
+        print("\n⚠️  Baseline was recorded with a different seed; comparison may be meaningless")
+
+    regressions = compare_with_baseline(current, baseline, args.threshold, args.min_delta_us)
+    if regressions:
+        # Confirm suspected regressions with a second measurement before failing
+        print(f"\nRe-running {len(regressions)} suspected regression(s)")
+        rerun = run(args.seed, args.repeat, args.min_time, [regression['name'] for regression in regressions])
+        for name, result in rerun['results'].items():
+            previous = current['results'].get(name)
+            if previous and result['min_us'] / result['calibration_us'] < previous['min_us'] / previous['calibration_us']:
+                current['results'][name] = result
+        regressions = compare_with_baseline(current, baseline, args.threshold, args.min_delta_us)
+
+    current['regressions'] = regressions
+    if args.output:
+        write_results(current, args.output)
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression['name']}: {regression['baseline_us']:.1f} µs -> "
+                  f"{regression['current_us']:.1f} µs ({regression['ratio']:.2f}x)")
+        return 1
+
+    print(f"\n✅ No regressions beyond {args.threshold:.0%} of baseline")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
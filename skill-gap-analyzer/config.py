@@ -3,6 +3,7 @@ Configuration settings for Skill Gap Analyzer application
 """
 
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -32,6 +33,14 @@ class Config:
     FIREBASE_SERVICE_ACCOUNT_KEY = os.environ.get('FIREBASE_SERVICE_ACCOUNT_KEY')
     FIREBASE_PROJECT_ID = os.environ.get('FIREBASE_PROJECT_ID')
     
+    # Optional write-behind queue for Firebase writes
+    FIREBASE_WRITE_BEHIND = os.environ.get('FIREBASE_WRITE_BEHIND', 'False').lower() == 'true'
+    FIREBASE_WRITE_BEHIND_MAX_PENDING = int(os.environ.get('FIREBASE_WRITE_BEHIND_MAX_PENDING', '5000'))  # paths
+    FIREBASE_WRITE_BEHIND_BATCH_SIZE = int(os.environ.get('FIREBASE_WRITE_BEHIND_BATCH_SIZE', '500'))  # paths per update
+    FIREBASE_WRITE_BEHIND_FLUSH_INTERVAL = float(os.environ.get('FIREBASE_WRITE_BEHIND_FLUSH_INTERVAL', '0.2'))  # seconds
+    FIREBASE_WRITE_BEHIND_MAX_RETRIES = int(os.environ.get('FIREBASE_WRITE_BEHIND_MAX_RETRIES', '5'))
+    FIREBASE_WRITE_BEHIND_SHUTDOWN_TIMEOUT = float(os.environ.get('FIREBASE_WRITE_BEHIND_SHUTDOWN_TIMEOUT', '10'))  # seconds
+    
     # Course integration APIs
     UDEMY_API_KEY = os.environ.get('UDEMY_API_KEY')
     COURSERA_API_KEY = os.environ.get('COURSERA_API_KEY')
@@ -40,11 +49,83 @@ class Config:
     # Performance and rate limiting settings
     API_TIMEOUT = int(os.environ.get('API_TIMEOUT', '10'))  # seconds
     MAX_RETRIES = int(os.environ.get('MAX_RETRIES', '3'))
-    RATE_LIMIT_PER_MINUTE = int(os.environ.get('RATE_LIMIT_PER_MINUTE', '60'))
+    RATE_LIMIT_PER_MINUTE = int(os.environ.get('RATE_LIMIT_PER_MINUTE', '60'))  # per client per endpoint
+    RATE_LIMIT_BURST = int(os.environ.get('RATE_LIMIT_BURST', '10'))
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')  # memory or sqlite (shared by workers)
+    RATE_LIMIT_DB_PATH = os.environ.get('RATE_LIMIT_DB_PATH', os.path.join(tempfile.gettempdir(), 'skill_gap_rate_limits.db'))
+    TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', '0'))  # proxies in front of the app setting X-Forwarded-For
+    
+    # Outbound quotas for upstream AI APIs (requests beyond max wait fall back instead of being sent)
+    GEMINI_RATE_LIMIT_PER_MINUTE = int(os.environ.get('GEMINI_RATE_LIMIT_PER_MINUTE', '60'))
+    NOTEBOOKLM_RATE_LIMIT_PER_MINUTE = int(os.environ.get('NOTEBOOKLM_RATE_LIMIT_PER_MINUTE', '60'))
+    UPSTREAM_RATE_LIMIT_BURST = int(os.environ.get('UPSTREAM_RATE_LIMIT_BURST', '5'))
+    UPSTREAM_RATE_LIMIT_MAX_WAIT = float(os.environ.get('UPSTREAM_RATE_LIMIT_MAX_WAIT', '2'))  # seconds
+    
+    # Asynchronous analysis worker pool
+    ANALYSIS_WORKERS = int(os.environ.get('ANALYSIS_WORKERS', '4'))  # threads per gunicorn worker
+    ANALYSIS_QUEUE_SIZE = int(os.environ.get('ANALYSIS_QUEUE_SIZE', '100'))
+    ANALYSIS_MAX_TRACKED_JOBS = int(os.environ.get('ANALYSIS_MAX_TRACKED_JOBS', '1000'))
+    ANALYSIS_QUEUE_RETRY_AFTER = int(os.environ.get('ANALYSIS_QUEUE_RETRY_AFTER', '5'))  # seconds
+    ANALYSIS_STATUS_MAX_WAIT = float(os.environ.get('ANALYSIS_STATUS_MAX_WAIT', '25'))  # seconds
+    ANALYSIS_STATUS_POLL_INTERVAL = float(os.environ.get('ANALYSIS_STATUS_POLL_INTERVAL', '0.5'))  # seconds between shared status reads
+    API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', '50'))
+    PROGRESS_BATCH_MAX_UPDATES = int(os.environ.get('PROGRESS_BATCH_MAX_UPDATES', '50'))  # skill updates per batch request
+    
+    # Outbound HTTP connection pooling and retry backoff
+    HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', '10'))  # connections per upstream host per worker
+    HTTP_RETRY_BUDGET = float(os.environ.get('HTTP_RETRY_BUDGET', str(API_TIMEOUT)))  # seconds across all attempts
+    RETRY_BACKOFF_BASE = float(os.environ.get('RETRY_BACKOFF_BASE', '0.5'))  # seconds
+    RETRY_BACKOFF_MAX = float(os.environ.get('RETRY_BACKOFF_MAX', '8'))  # seconds
+    SINGLE_FLIGHT_WAIT_TIMEOUT = float(os.environ.get('SINGLE_FLIGHT_WAIT_TIMEOUT', str(HTTP_RETRY_BUDGET + 2)))  # seconds
+    
+    # Circuit breaker for upstream AI services
+    CIRCUIT_BREAKER_FAILURE_RATE = float(os.environ.get('CIRCUIT_BREAKER_FAILURE_RATE', '0.5'))
+    CIRCUIT_BREAKER_SLOW_CALL_SECONDS = float(os.environ.get('CIRCUIT_BREAKER_SLOW_CALL_SECONDS', '8'))
+    CIRCUIT_BREAKER_WINDOW = int(os.environ.get('CIRCUIT_BREAKER_WINDOW', '20'))  # most recent calls
+    CIRCUIT_BREAKER_MIN_CALLS = int(os.environ.get('CIRCUIT_BREAKER_MIN_CALLS', '5'))
+    CIRCUIT_BREAKER_OPEN_SECONDS = float(os.environ.get('CIRCUIT_BREAKER_OPEN_SECONDS', '30'))
+    CIRCUIT_BREAKER_HALF_OPEN_CALLS = int(os.environ.get('CIRCUIT_BREAKER_HALF_OPEN_CALLS', '2'))
+    
+    # Opt-in request profiling (disabled unless a token or sample rate is set)
+    PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN')  # also guards /admin/profiles
+    PROFILE_SAMPLE_RATE = int(os.environ.get('PROFILE_SAMPLE_RATE', '0'))  # profile 1 in N requests, 0 disables
+    PROFILE_MAX_STORED = int(os.environ.get('PROFILE_MAX_STORED', '50'))
+    
+    # Stored analysis format
+    ANALYSIS_STORAGE_CODEC = os.environ.get('ANALYSIS_STORAGE_CODEC', 'z1')  # z1 (compressed) or none (plain JSON)
+    ANALYSIS_COMPRESSION_LEVEL = int(os.environ.get('ANALYSIS_COMPRESSION_LEVEL', '6'))  # zlib level 1-9
+    
+    # Local storage fallback used when Firebase is not configured or unavailable
+    LOCAL_STORE_BACKEND = os.environ.get('LOCAL_STORE_BACKEND', 'sqlite')  # sqlite (shared by workers, durable) or memory
+    LOCAL_STORE_DB_PATH = os.environ.get('LOCAL_STORE_DB_PATH', os.path.join(tempfile.gettempdir(), 'skill_gap_local_store.db'))
+    LOCAL_STORE_MAX_ENTRIES = int(os.environ.get('LOCAL_STORE_MAX_ENTRIES', '10000'))
+    LOCAL_STORE_MAX_BYTES = int(os.environ.get('LOCAL_STORE_MAX_BYTES', str(64 * 1024 * 1024)))  # approximate
+    LOCAL_STORE_ANALYSIS_TTL = int(os.environ.get('LOCAL_STORE_ANALYSIS_TTL', '86400'))  # seconds
+    LOCAL_PROGRESS_HISTORY_LIMIT = int(os.environ.get('LOCAL_PROGRESS_HISTORY_LIMIT', '100'))  # entries per user
+    LOCAL_USER_ANALYSES_INDEX_LIMIT = int(os.environ.get('LOCAL_USER_ANALYSES_INDEX_LIMIT', '1000'))  # indexed analyses per user
+    
+    # Expiry of stored analyses, swept in the background by every worker
+    DATA_RETENTION_DAYS = int(os.environ.get('DATA_RETENTION_DAYS', '30'))
+    EXPIRY_SWEEP_INTERVAL = float(os.environ.get('EXPIRY_SWEEP_INTERVAL', '3600'))  # seconds between sweeps, 0 disables
+    EXPIRY_SWEEP_TIME_BUDGET = float(os.environ.get('EXPIRY_SWEEP_TIME_BUDGET', '0.5'))  # seconds per sweep; the rest waits
+    EXPIRY_SWEEP_BATCH_SIZE = int(os.environ.get('EXPIRY_SWEEP_BATCH_SIZE', '200'))  # Firebase records deleted per write
+    
+    # Record/replay of LLM responses for reproducible offline runs
+    LLM_CASSETTE_MODE = os.environ.get('LLM_CASSETTE_MODE', 'off')  # off, record or replay
+    LLM_CASSETTE_PATH = os.environ.get('LLM_CASSETTE_PATH', 'cassettes/llm_responses.jsonl')  # .gz to compress
+    LLM_CASSETTE_REPLAY_LATENCY = os.environ.get('LLM_CASSETTE_REPLAY_LATENCY', 'False').lower() == 'true'
     
     # Cache settings
     CACHE_TIMEOUT = int(os.environ.get('CACHE_TIMEOUT', '3600'))  # 1 hour
     REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379')
+    ANALYSIS_CACHE_BACKEND = os.environ.get('ANALYSIS_CACHE_BACKEND', 'memory')  # memory or redis
+    ANALYSIS_CACHE_MAX_ENTRIES = int(os.environ.get('ANALYSIS_CACHE_MAX_ENTRIES', '5000'))
+    RESULTS_CACHE_MAX_ENTRIES = int(os.environ.get('RESULTS_CACHE_MAX_ENTRIES', '1000'))  # stored analyses cached per worker
+    RESULTS_CACHE_MAX_BYTES = int(os.environ.get('RESULTS_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))  # approximate, 0 disables
+    RESULTS_CACHE_MAX_AGE = int(os.environ.get('RESULTS_CACHE_MAX_AGE', '3600'))  # seconds, also sent as Cache-Control max-age
+    SHARED_JOB_ANALYSIS_CACHE_MAX_ENTRIES = int(os.environ.get('SHARED_JOB_ANALYSIS_CACHE_MAX_ENTRIES', '2000'))
+    SHARED_JOB_ANALYSIS_CACHE_MAX_BYTES = int(os.environ.get('SHARED_JOB_ANALYSIS_CACHE_MAX_BYTES', str(8 * 1024 * 1024)))  # approximate
+    SHARED_JOB_ANALYSIS_CACHE_TTL = int(os.environ.get('SHARED_JOB_ANALYSIS_CACHE_TTL', '3600'))  # seconds a worker skips rewriting one
     
     # India market specific settings
     DEFAULT_CURRENCY = 'INR'
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Load-test driver
+
+Starts the upstream stubs, then for each gunicorn worker configuration boots
+the application against them and replays concurrent /analyze and
+/api/update-progress traffic built from the benchmark corpus. Reports
+p50/p95/p99 latency, throughput and status codes per endpoint, plus the share
+of analyses finishing within the 10 s (single user) and 15 s (concurrent)
+targets.
+
+Usage:
+    python loadtest/driver.py --configs 1x1,2x1,2x4 --concurrency 20 --duration 60 \\
+        --latency gemini=lognormal:1500,6000 --latency notebooklm=lognormal:2000,8000 \\
+        --latency firebase=fixed:30 --error-rate 0.02 --burst-every 60 --burst-duration 5
+
+    # Drive an already running server (stubs must be configured separately)
+    python loadtest/driver.py --target http://127.0.0.1:8080 --duration 30
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import CANONICAL_SKILLS, generate_posting, generate_user_profile
+from loadtest.stubs import StubCluster, add_stub_arguments, parse_latency_args
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SLA_SECONDS = (10.0, 15.0)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+class TrafficGenerator:
+    """Seeded request mix drawn from a pool of postings, profiles and users"""
+
+    def __init__(self, seed: int, posting_pool: int, users: int, analyze_share: float):
+        rng = random.Random(seed)
+        self.analyze_share = analyze_share
+        sizes = ['short', 'medium', 'medium', 'long', 'multipage']
+        self.postings = [generate_posting(rng, rng.choice(sizes), rng.choice(['sparse', 'normal', 'dense']))
+                         for _ in range(posting_pool)]
+        self.profiles = [generate_user_profile(rng, rng.choice([3, 8, 15, 40])) for _ in range(users)]
+        self.users = [f'loadtest-user-{index}' for index in range(users)]
+        self._rng = rng
+        self._lock = threading.Lock()
+
+    def next_request(self) -> Dict:
+        with self._lock:
+            if self._rng.random() < self.analyze_share:
+                return {
+                    'endpoint': '/analyze',
+                    'json': {
+                        'job_posting': self._rng.choice(self.postings),
+                        'user_skills': self._rng.choice(self.profiles)
+                    }
+                }
+            return {
+                'endpoint': '/api/update-progress',
+                'json': {
+                    'user_id': self._rng.choice(self.users),
+                    'skill_name': self._rng.choice(CANONICAL_SKILLS).title(),
+                    'proficiency_level': self._rng.randint(1, 10)
+                }
+            }
+
+
+def drive(base_url: str, traffic: TrafficGenerator, concurrency: int, duration: float, warmup: float,
+          timeout: float) -> Dict:
+    """
+    Send traffic from concurrency closed-loop clients for warmup + duration seconds
+
+    Returns:
+        Per-endpoint latency samples (seconds) and status counts, excluding warm-up
+    """
+    samples: Dict[str, List[float]] = {}
+    statuses: Dict[str, Dict[str, int]] = {}
+    lock = threading.Lock()
+    measure_from = time.monotonic() + warmup
+    stop_at = measure_from + duration
+
+    def client():
+        session = requests.Session()
+        while time.monotonic() < stop_at:
+            spec = traffic.next_request()
+            started = time.monotonic()
+            try:
+                response = session.post(base_url + spec['endpoint'], json=spec['json'], timeout=timeout)
+                status = str(response.status_code)
+            except requests.exceptions.Timeout:
+                status = 'timeout'
+            except requests.exceptions.RequestException:
+                status = 'connection_error'
+            finished = time.monotonic()
+
+            if started >= measure_from and finished <= stop_at + timeout:
+                with lock:
+                    samples.setdefault(spec['endpoint'], []).append(finished - started)
+                    endpoint_statuses = statuses.setdefault(spec['endpoint'], {})
+                    endpoint_statuses[status] = endpoint_statuses.get(status, 0) + 1
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(client)
+
+    return {'samples': samples, 'statuses': statuses, 'duration': duration}
+
+
+def summarize(run: Dict) -> Dict:
+    """Percentiles, throughput and SLA compliance per endpoint"""
+    summary = {}
+    for endpoint, values in run['samples'].items():
+        values = sorted(values)
+        statuses = run['statuses'].get(endpoint, {})
+        successes = sum(count for status, count in statuses.items() if status.startswith('2'))
+        summary[endpoint] = {
+            'requests': len(values),
+            'throughput_rps': round(len(values) / run['duration'], 2),
+            'success_rate': round(successes / len(values), 4) if values else None,
+            'p50_ms': round(percentile(values, 0.50) * 1000, 1),
+            'p95_ms': round(percentile(values, 0.95) * 1000, 1),
+            'p99_ms': round(percentile(values, 0.99) * 1000, 1),
+            'max_ms': round(values[-1] * 1000, 1),
+            'statuses': statuses
+        }
+        if endpoint == '/analyze':
+            for limit in SLA_SECONDS:
+                summary[endpoint][f'within_{int(limit)}s'] = round(sum(1 for value in values if value <= limit) / len(values), 4)
+    return summary
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_healthy(base_url: str, process: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {process.returncode}")
+        try:
+            if requests.get(base_url + '/health', timeout=1).status_code == 200:
+                return
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Application did not become healthy within {timeout}s")
+
+
+def start_app(workers: int, threads: int, environment: Dict[str, str], log_path: str):
+    """Boot gunicorn with the given worker configuration"""
+    port = free_port()
+    command = [
+        sys.executable, '-m', 'gunicorn',
+        '--bind', f'127.0.0.1:{port}',
+        '--workers', str(workers),
+        '--threads', str(threads),
+        '--timeout', '120',
+        'app:create_app()'
+    ]
+    log_file = open(log_path, 'w', encoding='utf-8')
+    process = subprocess.Popen(command, cwd=APP_DIR, env=dict(os.environ, **environment),
+                               stdout=log_file, stderr=subprocess.STDOUT)
+    return process, log_file, f'http://127.0.0.1:{port}'
+
+
+def parse_configs(value: str) -> List[Dict]:
+    """'1x1,2x4' -> [{'workers': 1, 'threads': 1}, {'workers': 2, 'threads': 4}]"""
+    configs = []
+    for item in value.split(','):
+        workers, _, threads = item.strip().partition('x')
+        configs.append({'workers': int(workers), 'threads': int(threads or 1)})
+    return configs
+
+
+def print_summary(label: str, summary: Dict) -> None:
+    print(f"\n{label}")
+    print(f"  {'endpoint':<22} {'reqs':>6} {'rps':>7} {'ok%':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for endpoint, stats in summary.items():
+        success = f"{stats['success_rate'] * 100:.1f}" if stats['success_rate'] is not None else '-'
+        print(f"  {endpoint:<22} {stats['requests']:>6} {stats['throughput_rps']:>7} {success:>6} "
+              f"{stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9}")
+        if 'within_10s' in stats:
+            print(f"  {'':<22} within 10s: {stats['within_10s']:.1%}   within 15s: {stats['within_15s']:.1%}")
+        print(f"  {'':<22} statuses: {stats['statuses']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Load test the Skill Gap Analyzer against local upstream stubs')
+    parser.add_argument('--configs', default='1x1,2x1,2x4', help='Worker configurations as WORKERSxTHREADS, comma separated')
+    parser.add_argument('--target', help='Drive this already running server instead of starting gunicorn')
+    parser.add_argument('--concurrency', type=int, default=10, help='Concurrent closed-loop clients')
+    parser.add_argument('--duration', type=float, default=30, help='Measured seconds per configuration')
+    parser.add_argument('--warmup', type=float, default=5, help='Unmeasured seconds before each measurement')
+    parser.add_argument('--timeout', type=float, default=60, help='Client request timeout in seconds')
+    parser.add_argument('--analyze-share', type=float, default=0.7, help='Share of requests going to /analyze')
+    parser.add_argument('--posting-pool', type=int, default=200, help='Distinct postings (smaller pools hit the analysis cache more)')
+    parser.add_argument('--users', type=int, default=50, help='Distinct users and skill profiles')
+    parser.add_argument('--env', action='append', default=[], help='Extra app environment as NAME=VALUE (repeatable)')
+    parser.add_argument('--output', help='Write the report as JSON to this path')
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else 42
+    traffic = TrafficGenerator(seed, args.posting_pool, args.users, args.analyze_share)
+    report = {'settings': {key: value for key, value in vars(args).items()}, 'runs': []}
+
+    if args.target:
+        summary = summarize(drive(args.target.rstrip('/'), traffic, args.concurrency, args.duration, args.warmup, args.timeout))
+        print_summary(f"Target {args.target}", summary)
+        report['runs'].append({'target': args.target, 'endpoints': summary})
+    else:
+        stubs = StubCluster(latency=parse_latency_args(args.latency), error_rate=args.error_rate,
+                            burst_every=args.burst_every, burst_duration=args.burst_duration, seed=seed).start()
+        environment = dict(
+            stubs.app_environment(),
+            # All load comes from one address, so the per-client limit would measure nothing but itself
+            RATE_LIMIT_PER_MINUTE='1000000',
+            RATE_LIMIT_BURST='1000000',
+            GEMINI_RATE_LIMIT_PER_MINUTE='1000000',
+            NOTEBOOKLM_RATE_LIMIT_PER_MINUTE='1000000'
+        )
+        environment.update(item.split('=', 1) for item in args.env)
+
+        try:
+            for config in parse_configs(args.configs):
+                label = f"{config['workers']} worker(s) x {config['threads']} thread(s)"
+                log_path = os.path.join(tempfile.gettempdir(), f"loadtest_{config['workers']}x{config['threads']}.log")
+                process, log_file, base_url = start_app(config['workers'], config['threads'], environment, log_path)
+                try:
+                    wait_until_healthy(base_url, process)
+                    run = drive(base_url, traffic, args.concurrency, args.duration, args.warmup, args.timeout)
+                finally:
+                    process.terminate()
+                    try:
+                        process.wait(timeout=30)
+                    except subprocess.TimeoutExpired:
+                        process.kill()
+                    log_file.close()
+
+                summary = summarize(run)
+                print_summary(f"{label} (server log: {log_path})", summary)
+                report['runs'].append(dict(config, endpoints=summary))
+            report['upstream_requests'] = stubs.stats()
+        finally:
+            stubs.stop()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
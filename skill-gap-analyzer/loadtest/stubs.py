@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+Upstream stub servers
+
+Local stand-ins for the Gemini generateContent endpoint, the NotebookLM
+research endpoint and the Firebase Realtime Database REST API, so load tests
+can exercise the real request path without paying for (or being throttled
+by) the hosted services. Every stub injects configurable latency, random
+server errors and periodic 429 bursts.
+
+The Firebase stub speaks the protocol the Admin SDK uses against the database
+emulator: point FIREBASE_DATABASE_URL at http://host:port/?ns=<namespace>.
+
+Usage:
+    python loadtest/stubs.py --latency lognormal:800,4000 --error-rate 0.02 --burst-every 60 --burst-duration 5
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.skill_taxonomy import taxonomy
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyDistribution:
+    """
+    Response delay in seconds drawn from a named distribution
+
+    Specs (milliseconds):
+        fixed:800
+        uniform:200,1500
+        lognormal:800,4000   (median, p99)
+    """
+
+    def __init__(self, spec: str = 'fixed:0', rng: Optional[random.Random] = None):
+        self.spec = spec
+        self.rng = rng or random.Random()
+        kind, _, params = spec.partition(':')
+        values = [float(value) / 1000.0 for value in params.split(',') if value]
+
+        if kind == 'fixed' and len(values) == 1:
+            self._sample = lambda: values[0]
+        elif kind == 'uniform' and len(values) == 2:
+            self._sample = lambda: self.rng.uniform(values[0], values[1])
+        elif kind == 'lognormal' and len(values) == 2 and values[1] >= values[0] > 0:
+            mu = math.log(values[0])
+            sigma = math.log(values[1] / values[0]) / 2.326  # z-score of the 99th percentile
+            self._sample = lambda: self.rng.lognormvariate(mu, sigma)
+        else:
+            raise ValueError(f"Invalid latency spec '{spec}'")
+
+    def sample(self) -> float:
+        return max(0.0, self._sample())
+
+
+class FaultInjector:
+    """Random server errors plus periodic windows where every request gets 429"""
+
+    def __init__(self, error_rate: float = 0.0, burst_every: float = 0.0, burst_duration: float = 0.0,
+                 retry_after: int = 1, rng: Optional[random.Random] = None):
+        self.error_rate = error_rate
+        self.burst_every = burst_every
+        self.burst_duration = burst_duration
+        self.retry_after = retry_after
+        self.rng = rng or random.Random()
+        self.started = time.monotonic()
+
+    def in_burst(self) -> bool:
+        if self.burst_every <= 0 or self.burst_duration <= 0:
+            return False
+        return (time.monotonic() - self.started) % self.burst_every >= self.burst_every - self.burst_duration
+
+    def fault(self) -> Optional[Tuple[int, Dict]]:
+        """Return (status, headers) for an injected failure, or None to serve normally"""
+        if self.in_burst():
+            return 429, {'Retry-After': str(self.retry_after)}
+        if self.error_rate > 0 and self.rng.random() < self.error_rate:
+            return self.rng.choice((500, 503)), {}
+        return None
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded HTTP server carrying stub behaviour and request counters"""
+
+    daemon_threads = True
+
+    def __init__(self, address, handler, name: str, latency: LatencyDistribution, faults: FaultInjector):
+        super().__init__(address, handler)
+        self.name = name
+        self.latency = latency
+        self.faults = faults
+        self.counters: Dict[str, int] = {}
+        self.counters_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def count(self, outcome: str) -> None:
+        with self.counters_lock:
+            self.counters[outcome] = self.counters.get(outcome, 0) + 1
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Shared latency/fault handling; subclasses implement handle_stub_request"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.server.name}: {format % args}")
+
+    def _read_body(self) -> Optional[object]:
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return None
+        return json.loads(self.rfile.read(length).decode('utf-8'))
+
+    def send_json(self, status: int, body: object, headers: Optional[Dict] = None) -> None:
+        payload = json.dumps(body, separators=(',', ':')).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _dispatch(self) -> None:
+        try:
+            body = self._read_body()
+        except ValueError:
+            self.server.count('bad_request')
+            self.send_json(400, {'error': 'Invalid JSON body'})
+            return
+
+        time.sleep(self.server.latency.sample())
+
+        fault = self.server.faults.fault()
+        if fault:
+            status, headers = fault
+            self.server.count(str(status))
+            self.send_json(status, {'error': {'code': status, 'message': 'Injected fault'}}, headers)
+            return
+
+        self.server.count('ok')
+        self.handle_stub_request(body)
+
+    def handle_stub_request(self, body: Optional[object]) -> None:
+        raise NotImplementedError
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _dispatch
+
+
+class GeminiStubHandler(StubHandler):
+    """generateContent stand-in returning a job analysis built from the prompt"""
+
+    def handle_stub_request(self, body: Optional[object]) -> None:
+        if self.command != 'POST' or not isinstance(body, dict):
+            self.send_json(404, {'error': {'code': 404, 'message': 'Not found'}})
+            return
+
+        try:
+            prompt = body['contents'][0]['parts'][0]['text']
+        except (KeyError, IndexError, TypeError):
+            self.send_json(400, {'error': {'code': 400, 'message': 'Missing contents'}})
+            return
+
+        # Deterministic per prompt so repeated postings get identical analyses
+        rng = random.Random(hashlib.sha256(prompt.encode('utf-8')).digest())
+        skills = taxonomy.find_skills(prompt)
+        analysis = {
+            'company_name': 'Stub Company',
+            'position_title': 'Software Engineer',
+            'salary_range': {'min_salary': None, 'max_salary': None, 'currency': 'INR'},
+            'experience_level': rng.choice(['junior', 'mid', 'senior']),
+            'required_skills': [
+                {
+                    'name': skill,
+                    'priority': rng.choice(['critical', 'important', 'optional']),
+                    'proficiency_required': rng.randint(5, 9)
+                }
+                for skill in skills[:15]
+            ],
+            'preferred_skills': [],
+            'technology_domains': sorted({taxonomy.get(skill).category for skill in skills[:15]})
+        }
+
+        self.send_json(200, {
+            'candidates': [{
+                'content': {'parts': [{'text': '```json\n' + json.dumps(analysis) + '\n```'}], 'role': 'model'},
+                'finishReason': 'STOP'
+            }]
+        })
+
+
+class NotebookLMStubHandler(StubHandler):
+    """Research endpoint stand-in"""
+
+    def handle_stub_request(self, body: Optional[object]) -> None:
+        if self.command != 'POST' or not isinstance(body, dict):
+            self.send_json(404, {'error': {'code': 404, 'message': 'Not found'}})
+            return
+
+        query = body.get('query', '')
+        self.send_json(200, {
+            'research_results': {
+                'summary': f'Learning plan covering {len(taxonomy.find_skills(query))} skills',
+                'sources': []
+            }
+        })
+
+
+PUSH_CHARS = '-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz'
+
+
+class FirebaseStubHandler(StubHandler):
+    """
+    Realtime Database REST stand-in backed by an in-memory JSON tree
+
+    Supports GET/PUT/PATCH/POST/DELETE on /<path>.json, the orderBy/equalTo/
+    startAt/endAt/limitToFirst/limitToLast query parameters, ETag
+    conditional writes used by transactions and increment server values.
+    """
+
+    def handle_stub_request(self, body: Optional[object]) -> None:
+        parsed = urlparse(self.path)
+        if not parsed.path.endswith('.json'):
+            self.send_json(404, {'error': 'Not found'})
+            return
+
+        segments = [segment for segment in parsed.path[:-len('.json')].split('/') if segment]
+        params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        store = self.server.store
+
+        with store.lock:
+            current = store.get(segments)
+            etag = store.etag(current)
+
+            if_match = self.headers.get('if-match')
+            if if_match and if_match != etag:
+                self.send_json(412, current, {'ETag': etag})
+                return
+
+            headers = {'ETag': etag} if self.headers.get('X-Firebase-ETag') == 'true' else {}
+
+            if self.command == 'GET':
+                self.send_json(200, store.query(current, params), headers)
+            elif self.command == 'PUT':
+                body = store.resolve(segments, body)
+                store.set(segments, body)
+                self.send_json(200, body, {'ETag': store.etag(body)} if headers else {})
+            elif self.command == 'PATCH':
+                for key, value in (body or {}).items():
+                    path = segments + [part for part in key.split('/') if part]
+                    store.set(path, store.resolve(path, value))
+                self.send_json(200, body)
+            elif self.command == 'POST':
+                name = store.push_id()
+                store.set(segments + [name], body)
+                self.send_json(200, {'name': name})
+            elif self.command == 'DELETE':
+                store.set(segments, None)
+                self.send_json(200, None)
+
+
+class JsonTree:
+    """Thread-safe nested dict with Realtime Database path semantics"""
+
+    def __init__(self):
+        self.root: Dict = {}
+        self.lock = threading.RLock()
+        self._push_counter = itertools.count()
+        self._last_push_time = 0
+
+    def get(self, segments) -> object:
+        node = self.root
+        for segment in segments:
+            if not isinstance(node, dict) or segment not in node:
+                return None
+            node = node[segment]
+        return node
+
+    def set(self, segments, value) -> None:
+        if not segments:
+            self.root = value if isinstance(value, dict) else {}
+            return
+
+        node = self.root
+        for segment in segments[:-1]:
+            child = node.get(segment)
+            if not isinstance(child, dict):
+                if value is None:
+                    return
+                child = node[segment] = {}
+            node = child
+
+        if value is None:
+            node.pop(segments[-1], None)
+        else:
+            node[segments[-1]] = value
+
+    def resolve(self, segments, value) -> object:
+        """Value to store for a write, with an {".sv": {"increment": n}} server value applied"""
+        if isinstance(value, dict) and isinstance(value.get('.sv'), dict) and 'increment' in value['.sv']:
+            current = self.get(segments)
+            return (current if isinstance(current, (int, float)) else 0) + value['.sv']['increment']
+        return value
+
+    @staticmethod
+    def etag(value) -> str:
+        return hashlib.sha1(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def push_id(self) -> str:
+        """Chronologically sortable push key in the Firebase format"""
+        now = int(time.time() * 1000)
+        timestamp = ''.join(PUSH_CHARS[(now >> (6 * shift)) & 63] for shift in range(7, -1, -1))
+        suffix = next(self._push_counter)
+        return timestamp + ''.join(PUSH_CHARS[(suffix >> (6 * shift)) & 63] for shift in range(11, -1, -1))
+
+    @staticmethod
+    def query(value, params: Dict) -> object:
+        """Apply orderBy/equalTo/startAt/endAt/limitToFirst/limitToLast to a collection"""
+        if not isinstance(value, dict) or 'orderBy' not in params:
+            return value
+
+        order_by = json.loads(params['orderBy'])
+
+        def sort_value(item):
+            key, child = item
+            if order_by == '$key':
+                return key
+            if order_by == '$value':
+                return child
+            return child.get(order_by) if isinstance(child, dict) else None
+
+        def sortable(item):
+            # Realtime Database ordering: null < false < true < numbers < strings < objects
+            raw = sort_value(item)
+            if raw is None:
+                return (0, 0, item[0])
+            if isinstance(raw, bool):
+                return (1, int(raw), item[0])
+            if isinstance(raw, (int, float)):
+                return (2, raw, item[0])
+            if isinstance(raw, str):
+                return (3, raw, item[0])
+            return (4, 0, item[0])
+
+        items = sorted(value.items(), key=sortable)
+        if 'equalTo' in params:
+            target = json.loads(params['equalTo'])
+            items = [item for item in items if sort_value(item) == target]
+        if 'startAt' in params:
+            start = json.loads(params['startAt'])
+            items = [item for item in items if sort_value(item) is not None and sort_value(item) >= start]
+        if 'endAt' in params:
+            end = json.loads(params['endAt'])
+            items = [item for item in items if sort_value(item) is not None and sort_value(item) <= end]
+        if 'limitToFirst' in params:
+            items = items[:int(params['limitToFirst'])]
+        if 'limitToLast' in params:
+            items = items[-int(params['limitToLast']):]
+        return dict(items)
+
+
+class StubCluster:
+    """The three upstream stubs running on background threads"""
+
+    def __init__(self, host: str = '127.0.0.1', gemini_port: int = 0, notebooklm_port: int = 0, firebase_port: int = 0,
+                 latency: Optional[Dict[str, str]] = None, error_rate: float = 0.0, burst_every: float = 0.0,
+                 burst_duration: float = 0.0, seed: Optional[int] = None):
+        latency = latency or {}
+        rng = random.Random(seed)
+
+        def make(name, port, handler):
+            return StubServer(
+                (host, port), handler, name,
+                LatencyDistribution(latency.get(name, 'fixed:0'), random.Random(rng.random())),
+                FaultInjector(error_rate, burst_every, burst_duration, rng=random.Random(rng.random()))
+            )
+
+        self.gemini = make('gemini', gemini_port, GeminiStubHandler)
+        self.notebooklm = make('notebooklm', notebooklm_port, NotebookLMStubHandler)
+        # The database stand-in only gets latency: injected faults would just exercise local fallback
+        self.firebase = StubServer((host, firebase_port), FirebaseStubHandler, 'firebase',
+                                   LatencyDistribution(latency.get('firebase', 'fixed:0'), random.Random(rng.random())),
+                                   FaultInjector())
+        self.firebase.store = JsonTree()
+        self.servers = [self.gemini, self.notebooklm, self.firebase]
+        self._threads = []
+
+    def start(self) -> 'StubCluster':
+        for server in self.servers:
+            thread = threading.Thread(target=server.serve_forever, name=f'stub-{server.name}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self) -> None:
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def app_environment(self, namespace: str = 'loadtest') -> Dict[str, str]:
+        """Environment variables pointing the application at the stubs"""
+        return {
+            'GEMINI_API_KEY': 'stub-key',
+            'GEMINI_API_URL': f'{self.gemini.url}/v1beta/models/gemini-pro:generateContent',
+            'NOTEBOOKLM_API_KEY': 'stub-key',
+            'NOTEBOOKLM_URL': f'{self.notebooklm.url}/v1/research',
+            'FIREBASE_DATABASE_URL': f'{self.firebase.url}/?ns={namespace}',
+            'FIREBASE_PROJECT_ID': namespace
+        }
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {server.name: dict(server.counters) for server in self.servers}
+
+
+def parse_latency_args(values) -> Dict[str, str]:
+    """Turn ['lognormal:800,4000', 'firebase=fixed:20'] into per-stub specs"""
+    specs = {}
+    for value in values or []:
+        name, _, spec = value.rpartition('=')
+        for stub in ([name] if name else ['gemini', 'notebooklm', 'firebase']):
+            specs[stub] = spec
+    for spec in specs.values():
+        LatencyDistribution(spec)  # validate early
+    return specs
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser) -> None:
+    """Stub options shared by this script and the load-test driver"""
+    parser.add_argument('--latency', action='append',
+                        help="Latency spec in ms, optionally per stub: 'lognormal:800,4000', "
+                             "'gemini=uniform:500,3000', 'firebase=fixed:20' (repeatable)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of AI API requests answered 500/503')
+    parser.add_argument('--burst-every', type=float, default=0.0, help='Seconds between 429 bursts (0 disables)')
+    parser.add_argument('--burst-duration', type=float, default=0.0, help='Length of each 429 burst in seconds')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for latency and fault randomness')
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Run local Gemini, NotebookLM and Firebase stubs')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--gemini-port', type=int, default=8701)
+    parser.add_argument('--notebooklm-port', type=int, default=8702)
+    parser.add_argument('--firebase-port', type=int, default=8703)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    cluster = StubCluster(args.host, args.gemini_port, args.notebooklm_port, args.firebase_port,
+                          parse_latency_args(args.latency), args.error_rate, args.burst_every,
+                          args.burst_duration, args.seed).start()
+
+    print("Stub servers running. Start the app with:")
+    for name, value in cluster.app_environment().items():
+        print(f"  export {name}='{value}'")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"\nRequest counts: {json.dumps(cluster.stats())}")
+        cluster.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
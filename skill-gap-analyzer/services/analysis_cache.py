@@ -0,0 +1,217 @@
+"""
+Analysis Cache Service
+
+Content-addressed cache for job posting analyses. Postings are normalized
+(case, whitespace and common boilerplate folded) and hashed so the same
+posting swiped by many users only pays for one Gemini round trip.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_VERSION = 'v1'
+
+# Recruiter boilerplate that varies between reposts of the same job
+BOILERPLATE_PATTERNS = [
+    re.compile(r'\b(is|are) an equal opportunit(y|ies) employers?\b[^.\n]*[.\n]?'),
+    re.compile(r'\bposted\s+\d+\s+(minute|hour|day|week|month)s?\s+ago\b'),
+    re.compile(r'\b\d+\+?\s+applicants?\b'),
+    re.compile(r'\b(apply now|easy apply|apply on company website)\b'),
+    re.compile(r'\bjob (id|ref|reference)\s*[:#]?\s*[\w-]+'),
+]
+
+BULLET_PATTERN = re.compile(r'[•‣◦⁃∙▪●*·]+')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_posting_text(job_posting_text: str) -> str:
+    """
+    Fold a job posting into a canonical form for cache keying
+
+    Args:
+        job_posting_text: Raw job posting content
+
+    Returns:
+        Lowercased text with boilerplate, bullets and extra whitespace removed
+    """
+    text = unicodedata.normalize('NFKC', job_posting_text or '').lower()
+    for pattern in BOILERPLATE_PATTERNS:
+        text = pattern.sub(' ', text)
+    text = BULLET_PATTERN.sub(' ', text)
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
+
+
+def posting_cache_key(job_posting_text: str) -> str:
+    """Build the content-addressed cache key for a job posting"""
+    digest = hashlib.sha256(normalize_posting_text(job_posting_text).encode('utf-8')).hexdigest()
+    return f'job_analysis:{CACHE_KEY_VERSION}:{digest}'
+
+
+class InMemoryCacheBackend:
+    """Process-local cache backend with TTL and LRU eviction"""
+
+    def __init__(self, max_entries: int = 5000):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Redis cache backend shared by all workers; eviction is left to Redis maxmemory-policy"""
+
+    def __init__(self, redis_url: str):
+        self.client = redis.Redis.from_url(redis_url, socket_timeout=1, socket_connect_timeout=1)
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(key)
+        return value.decode('utf-8') if value is not None else None
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        self.client.set(key, value, ex=ttl)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(key)
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=f'job_analysis:{CACHE_KEY_VERSION}:*'):
+            self.client.delete(key)
+
+    def size(self) -> Optional[int]:
+        # Counting keys would need a full SCAN; Redis INFO is the place to look
+        return None
+
+
+class AnalysisCache:
+    """Cache of JSON-serializable analyses with hit/miss accounting"""
+
+    def __init__(self, backend, ttl: int = None):
+        self.backend = backend
+        self.ttl = ttl if ttl is not None else Config.CACHE_TIMEOUT
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        # Counters are bumped from every request thread of a gthread worker
+        self._counter_lock = threading.Lock()
+
+    def _count(self, counter: str) -> None:
+        with self._counter_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up a cached analysis
+
+        Args:
+            key: Cache key from posting_cache_key()
+
+        Returns:
+            A fresh copy of the cached analysis, or None on miss
+        """
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.error(f"Analysis cache read failed: {str(e)}")
+            self._count('errors')
+            value = None
+
+        if value is None:
+            self._count('misses')
+            return None
+
+        self._count('hits')
+        return json.loads(value)
+
+    def set(self, key: str, analysis: Dict) -> None:
+        """Store an analysis; backend failures are logged and ignored"""
+        try:
+            self.backend.set(key, json.dumps(analysis, separators=(',', ':')), self.ttl)
+        except Exception as e:
+            logger.error(f"Analysis cache write failed: {str(e)}")
+            self._count('errors')
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters for monitoring"""
+        with self._counter_lock:
+            hits, misses, errors = self.hits, self.misses, self.errors
+        lookups = hits + misses
+        return {
+            'backend': type(self.backend).__name__,
+            'hits': hits,
+            'misses': misses,
+            'errors': errors,
+            'evictions': self.backend.evictions,
+            'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+            'size': self.backend.size()
+        }
+
+
+def create_analysis_cache() -> AnalysisCache:
+    """Create the job analysis cache using the configured backend"""
+    backend_name = Config.ANALYSIS_CACHE_BACKEND.lower()
+
+    if backend_name == 'redis':
+        if REDIS_AVAILABLE:
+            try:
+                backend = RedisCacheBackend(Config.REDIS_URL)
+                backend.client.ping()
+                logger.info("Analysis cache using Redis backend")
+                return AnalysisCache(backend)
+            except Exception as e:
+                logger.error(f"Failed to connect to Redis, using in-process cache: {str(e)}")
+        else:
+            logger.warning("redis package not available. Using in-process analysis cache.")
+
+    return AnalysisCache(InMemoryCacheBackend(max_entries=Config.ANALYSIS_CACHE_MAX_ENTRIES))
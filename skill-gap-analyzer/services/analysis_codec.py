@@ -0,0 +1,180 @@
+"""
+Analysis Codec
+
+Compact, versioned storage format for analyses. The analysis body is
+serialized as compact JSON and deflated against a preset dictionary of the
+fragments every analysis shares (key names, course templates, learning
+strategy and success metric texts), so those fragments are stored as short
+back-references instead of in full. The compressed body is base64 encoded so
+it can live in Firebase, next to the plain metadata fields that indexes and
+cleanup read. Stored analyses without a codec field are returned unchanged,
+so records written before the codec existed keep working.
+"""
+
+import base64
+import json
+import logging
+import zlib
+from typing import Any, Dict
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Kept as plain fields on the stored record so they stay queryable
+METADATA_FIELDS = ('analysis_id', 'created_at', 'user_id', 'version', 'job_analysis_ref')
+
+# Representative analysis whose compact JSON is the z1 preset dictionary.
+# Frozen: payloads written as z1 can only be inflated with exactly these
+# bytes, so changes belong in a new codec version.
+_Z1_SAMPLE = {
+    'job_analysis': {
+        'company_name': None,
+        'position_title': 'Software Developer',
+        'salary_range': {'min_salary': None, 'max_salary': None, 'currency': 'INR'},
+        'experience_level': 'mid',
+        'required_skills': [
+            {'name': 'python', 'priority': 'critical', 'proficiency_required': 8},
+            {'name': 'javascript', 'priority': 'important', 'proficiency_required': 7}
+        ],
+        'preferred_skills': [{'name': 'docker', 'priority': 'nice-to-have', 'proficiency_required': 5}],
+        'technology_domains': ['backend', 'frontend', 'devops', 'data', 'mobile', 'cloud']
+    },
+    'skill_comparison': {
+        'confidence_score': 15,
+        'readiness_status': 'Not Ready Yet',
+        'readiness_statuses': ['Ready to Apply', 'Needs Preparation', 'Analysis Failed'],
+        'missing_skills': [
+            {'skill_name': 'react', 'current_proficiency': 0, 'required_proficiency': 7, 'proficiency_gap': 7,
+             'priority': 'important', 'impact_level': 'High', 'learning_time_days': 35,
+             'estimated_completion_date': '2026-01-01'},
+            {'skill_name': 'sql', 'current_proficiency': 4, 'required_proficiency': 7, 'proficiency_gap': 3,
+             'priority': 'important', 'impact_level': 'Medium', 'learning_time_days': 15,
+             'estimated_completion_date': '2026-01-01'}
+        ],
+        'total_learning_time_days': 50,
+        'skill_matches': [
+            {'skill_name': 'python', 'user_proficiency': 8, 'required_proficiency': 8, 'match_percentage': 100}
+        ],
+        'analysis_timestamp': '2026-01-01T00:00:00.000000'
+    },
+    'learning_path': {
+        'total_duration_days': 50,
+        'estimated_completion_date': '2026-01-01',
+        'milestones': [{
+            'week': 1,
+            'skill_name': 'react',
+            'learning_objectives': [
+                'Understand core concepts of react',
+                'Apply react in practical projects',
+                'Follow best practices and industry standards',
+                'Build portfolio projects using react'
+            ],
+            'duration_days': 35,
+            'start_date': '2026-01-01',
+            'end_date': '2026-01-01',
+            'priority': 'important',
+            'completion_criteria': [
+                'Complete all course modules and assignments',
+                'Build at least one practical project',
+                'Pass skill assessment or quiz',
+                'Demonstrate proficiency in real-world scenarios'
+            ],
+            'courses': [{
+                'title': 'Learn react',
+                'provider': 'Multiple Platforms',
+                'duration': 'Varies',
+                'rating': 4.5,
+                'price_inr': 0,
+                'language': 'English',
+                'url': 'https://www.google.com/search?q=learn+react+course',
+                'is_free': True
+            }]
+        }],
+        'learning_strategy': {
+            'approach': 'Sequential skill building with hands-on projects',
+            'focus_areas': [
+                'Critical skills first for immediate job readiness',
+                'Practical projects to reinforce learning',
+                'Regular progress assessment and adjustment'
+            ],
+            'time_management': {'daily_hours': 2, 'weekly_hours': 14, 'weekend_intensive': True},
+            'success_tips': [
+                'Practice coding daily, even if just 30 minutes',
+                'Build projects to apply new skills immediately',
+                'Join online communities for support and networking',
+                'Take regular breaks to avoid burnout'
+            ]
+        },
+        'success_metrics': [
+            {'metric': 'Course Completion Rate', 'target': '100%', 'measurement': 'Percentage of courses completed'},
+            {'metric': 'Project Portfolio', 'target': '1 project per skill', 'measurement': 'Number of completed projects'},
+            {'metric': 'Skill Assessment Score', 'target': '80%+', 'measurement': 'Average score on skill assessments'},
+            {'metric': 'Job Application Readiness', 'target': '80%+ confidence score',
+             'measurement': 'Updated confidence score after learning'}
+        ],
+        'confidence_projection': {'week_0': 15, 'week_5': 23, 'week_10': 31}
+    },
+    'timestamp': '2026-01-01T00:00:00.000000'
+}
+
+DICTIONARIES = {
+    'z1': json.dumps(_Z1_SAMPLE, separators=(',', ':')).encode('utf-8')
+}
+
+CURRENT_CODEC = 'z1'
+
+# Raw deflate: the zlib header and checksum would only add bytes to every record
+_WBITS = -15
+
+
+def is_encoded(stored: Any) -> bool:
+    """Whether a stored analysis was written by this codec"""
+    return isinstance(stored, dict) and 'codec' in stored and 'payload' in stored
+
+
+def encode_analysis(analysis: Dict, codec: str = None, level: int = None) -> Dict:
+    """
+    Encode an analysis for storage
+
+    Args:
+        analysis: Analysis with its metadata fields
+        codec: Codec version to write (defaults to the current one)
+        level: zlib compression level (defaults to ANALYSIS_COMPRESSION_LEVEL)
+
+    Returns:
+        Stored record: metadata fields, the codec version and the encoded payload
+    """
+    codec = codec or CURRENT_CODEC
+    level = level if level is not None else Config.ANALYSIS_COMPRESSION_LEVEL
+
+    body = {key: value for key, value in analysis.items() if key not in METADATA_FIELDS}
+    raw = json.dumps(body, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _WBITS, zdict=DICTIONARIES[codec])
+    payload = compressor.compress(raw) + compressor.flush()
+
+    stored = {key: analysis[key] for key in METADATA_FIELDS if key in analysis}
+    stored['codec'] = codec
+    stored['payload'] = base64.b64encode(payload).decode('ascii')
+    return stored
+
+
+def decode_analysis(stored: Any) -> Any:
+    """
+    Decode a stored analysis; records written without the codec are returned as they are
+
+    Raises:
+        ValueError: If the record names a codec version this code does not know
+    """
+    if not is_encoded(stored):
+        return stored
+
+    zdict = DICTIONARIES.get(stored['codec'])
+    if zdict is None:
+        raise ValueError(f"Unknown analysis codec '{stored['codec']}'")
+
+    decompressor = zlib.decompressobj(_WBITS, zdict=zdict)
+    payload = base64.b64decode(stored['payload'])
+    analysis = json.loads(decompressor.decompress(payload) + decompressor.flush())
+    analysis.update((key, stored[key]) for key in METADATA_FIELDS if key in stored)
+    return analysis
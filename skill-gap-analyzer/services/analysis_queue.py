@@ -0,0 +1,196 @@
+"""
+Analysis Queue
+
+Bounded background worker pool for asynchronous /analyze requests. Requests
+get an analysis_id immediately; workers run the analysis pipeline and the
+result lands in the same store that /results/<analysis_id> reads from.
+Status changes are also handed to an optional callback, so they can be
+published where every worker can see them.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when the analysis queue has no room for another job"""
+
+
+class AnalysisQueue:
+    """Bounded job queue drained by a fixed pool of worker threads"""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+    def __init__(self, max_workers: int = None, max_queue_size: int = None, max_tracked_jobs: int = None,
+                 on_status: Optional[Callable[[Dict], None]] = None):
+        self.max_workers = max_workers if max_workers is not None else Config.ANALYSIS_WORKERS
+        self.max_queue_size = max_queue_size if max_queue_size is not None else Config.ANALYSIS_QUEUE_SIZE
+        self.max_tracked_jobs = max_tracked_jobs if max_tracked_jobs is not None else Config.ANALYSIS_MAX_TRACKED_JOBS
+        self.on_status = on_status
+
+        self._queue = queue.Queue(maxsize=self.max_queue_size)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._running = 0
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def submit(self, analysis_id: str, task: Callable, *args) -> Dict:
+        """
+        Queue a pipeline run
+
+        Args:
+            analysis_id: Identifier the result will be stored under
+            task: Callable run on a worker thread
+            *args: Arguments passed to task
+
+        Returns:
+            Initial job status
+
+        Raises:
+            QueueFullError: If the queue is at capacity
+        """
+        self._ensure_workers()
+
+        job = {
+            'analysis_id': analysis_id,
+            'status': self.QUEUED,
+            'submitted_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'error': None,
+            'done': threading.Event(),
+            'published': threading.Event()
+        }
+
+        with self._lock:
+            try:
+                self._queue.put_nowait((job, task, args))
+            except queue.Full:
+                self.rejected += 1
+                raise QueueFullError(f"Analysis queue is full ({self.max_queue_size} jobs)")
+
+            self._jobs[analysis_id] = job
+            self.submitted += 1
+            self._trim_finished_jobs()
+
+        status = self._public_status(job)
+        self._publish(status)
+        # The worker waits for this before publishing later states, so they are never overwritten by 'queued'
+        job['published'].set()
+        return status
+
+    def get_status(self, analysis_id: str, wait: float = 0) -> Optional[Dict]:
+        """
+        Get job status, optionally blocking until the job finishes
+
+        Args:
+            analysis_id: Analysis identifier
+            wait: Seconds to wait for completion (long polling)
+
+        Returns:
+            Job status or None if this process does not know the job
+        """
+        with self._lock:
+            job = self._jobs.get(analysis_id)
+
+        if job is None:
+            return None
+
+        if wait > 0:
+            job['done'].wait(wait)
+
+        return self._public_status(job)
+
+    def stats(self) -> Dict:
+        """Queue depth and throughput counters"""
+        return {
+            'queue_depth': self._queue.qsize(),
+            'queue_capacity': self.max_queue_size,
+            'in_flight': self._running,
+            'workers': self.max_workers,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected
+        }
+
+    def _ensure_workers(self) -> None:
+        # Threads are started lazily so they are created in each gunicorn worker, not the master
+        if self._workers:
+            return
+
+        with self._lock:
+            if self._workers:
+                return
+            for i in range(self.max_workers):
+                worker = threading.Thread(target=self._worker_loop, name=f'analysis-worker-{i}', daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def _worker_loop(self) -> None:
+        while True:
+            job, task, args = self._queue.get()
+            job['status'] = self.RUNNING
+            job['started_at'] = time.time()
+            with self._lock:
+                self._running += 1
+            job['published'].wait()
+            self._publish(self._public_status(job))
+
+            try:
+                task(*args)
+                job['status'] = self.COMPLETED
+                self.completed += 1
+            except Exception as e:
+                logger.error(f"Background analysis {job['analysis_id']} failed: {str(e)}")
+                job['status'] = self.FAILED
+                job['error'] = 'Analysis failed. Please try again.'
+                self.failed += 1
+            finally:
+                job['finished_at'] = time.time()
+                with self._lock:
+                    self._running -= 1
+                self._publish(self._public_status(job))
+                job['done'].set()
+                self._queue.task_done()
+
+    def _publish(self, status: Dict) -> None:
+        if self.on_status is None:
+            return
+        try:
+            self.on_status(status)
+        except Exception as e:
+            logger.warning(f"Could not publish status of analysis {status['analysis_id']}: {str(e)}")
+
+    def _trim_finished_jobs(self) -> None:
+        """Forget the oldest finished jobs once too many are tracked (caller holds the lock)"""
+        excess = len(self._jobs) - self.max_tracked_jobs
+        if excess <= 0:
+            return
+
+        for analysis_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[analysis_id]['done'].is_set():
+                del self._jobs[analysis_id]
+                excess -= 1
+
+    @staticmethod
+    def _public_status(job: Dict) -> Dict:
+        return {key: value for key, value in job.items() if key not in ('done', 'published')}
@@ -0,0 +1,161 @@
+"""
+Circuit Breaker
+
+Guards calls to upstream AI services. When the recent error rate or slow-call
+rate crosses a threshold the breaker opens and callers go straight to their
+fallback path instead of waiting out API_TIMEOUT. After a cool-down a few probe
+requests are let through (half-open) to decide whether to close again.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Sliding-window circuit breaker with closed, open and half-open states"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_rate_threshold: float = None, slow_call_seconds: float = None,
+                 window_size: int = None, minimum_calls: int = None, open_seconds: float = None,
+                 half_open_max_calls: int = None):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold if failure_rate_threshold is not None else Config.CIRCUIT_BREAKER_FAILURE_RATE
+        self.slow_call_seconds = slow_call_seconds if slow_call_seconds is not None else Config.CIRCUIT_BREAKER_SLOW_CALL_SECONDS
+        self.window_size = window_size if window_size is not None else Config.CIRCUIT_BREAKER_WINDOW
+        self.minimum_calls = minimum_calls if minimum_calls is not None else Config.CIRCUIT_BREAKER_MIN_CALLS
+        self.open_seconds = open_seconds if open_seconds is not None else Config.CIRCUIT_BREAKER_OPEN_SECONDS
+        self.half_open_max_calls = half_open_max_calls if half_open_max_calls is not None else Config.CIRCUIT_BREAKER_HALF_OPEN_CALLS
+
+        self._state = self.CLOSED
+        self._window = deque(maxlen=self.window_size)  # True for failed or slow calls
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+
+        self.short_circuited = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Decide whether a call may go upstream
+
+        Returns:
+            False when the breaker is open (caller should use its fallback)
+        """
+        with self._lock:
+            self._maybe_half_open()
+
+            if self._state == self.CLOSED:
+                return True
+
+            if self._state == self.HALF_OPEN and self._probes_in_flight < self.half_open_max_calls:
+                self._probes_in_flight += 1
+                return True
+
+            self.short_circuited += 1
+            return False
+
+    def record_success(self, duration: float) -> None:
+        """Record a completed call; calls slower than slow_call_seconds count against the breaker"""
+        if duration >= self.slow_call_seconds:
+            self._record(failed=True, reason=f'slow call ({duration:.2f}s)')
+        else:
+            self._record(failed=False)
+
+    def record_failure(self, reason: str = 'error') -> None:
+        """Record a failed call"""
+        self._record(failed=True, reason=reason)
+
+    def _record(self, failed: bool, reason: str = None) -> None:
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if failed:
+                    self._open(f'probe failed: {reason}')
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_max_calls:
+                        self._close()
+                return
+
+            if self._state == self.OPEN:
+                # Late result from a call admitted before the breaker opened
+                return
+
+            self._window.append(failed)
+            if len(self._window) >= self.minimum_calls:
+                failure_rate = sum(self._window) / len(self._window)
+                if failure_rate >= self.failure_rate_threshold:
+                    self._open(f'failure rate {failure_rate:.0%} over last {len(self._window)} calls, last: {reason}')
+
+    def _maybe_half_open(self) -> None:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+            logger.info(f"Circuit breaker '{self.name}' half-open, probing upstream")
+
+    def _open(self, reason: str) -> None:
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+        logger.warning(f"Circuit breaker '{self.name}' opened: {reason}")
+
+    def _close(self) -> None:
+        self._state = self.CLOSED
+        self._window.clear()
+        logger.info(f"Circuit breaker '{self.name}' closed")
+
+    def snapshot(self) -> Dict:
+        """Current state and counters for monitoring"""
+        with self._lock:
+            self._maybe_half_open()
+            failures = sum(self._window)
+            return {
+                'state': self._state,
+                'window_calls': len(self._window),
+                'window_failures': failures,
+                'failure_rate': round(failures / len(self._window), 3) if self._window else 0.0,
+                'times_opened': self.times_opened,
+                'short_circuited': self.short_circuited,
+                'seconds_until_probe': round(max(0.0, self.open_seconds - (time.monotonic() - self._opened_at)), 1)
+                if self._state == self.OPEN else 0.0
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str, **kwargs) -> CircuitBreaker:
+    """Return the process-wide breaker for an upstream, creating it on first use"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, **kwargs)
+            _breakers[name] = breaker
+        return breaker
+
+
+def circuit_breaker_states() -> Dict[str, Dict]:
+    """Snapshot of every registered breaker, keyed by upstream name"""
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {name: breaker.snapshot() for name, breaker in breakers.items()}
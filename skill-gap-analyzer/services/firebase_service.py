@@ -4,11 +4,18 @@ Firebase Service
 Handles data persistence and retrieval using Firebase Realtime Database.
 """
 
+import base64
+import bisect
+import hashlib
 import json
 import logging
+import os
+import random
+import threading
+import time
 import uuid
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
 
 try:
     import firebase_admin
@@ -19,25 +26,243 @@ except ImportError:
     logging.warning("Firebase Admin SDK not available. Using local storage fallback.")
 
 from config import Config
+from services.analysis_codec import DICTIONARIES, decode_analysis, encode_analysis
+from services.local_store import InMemoryLocalStore, create_local_store
+from services.write_behind import MISSING, WriteBehindQueue, increment_delta, server_increment
 
 logger = logging.getLogger(__name__)
 
+# Stored on every analysis; bump when the stored analysis format changes
+ANALYSIS_VERSION = '1.0'
+
+
+def user_index_entry(analysis_data: Dict) -> str:
+    """
+    Per-user index value for an analysis
+    
+    Values sort by creation time, with the analysis ID as a tie-breaker, and
+    double as opaque pagination cursors.
+    """
+    return f"{analysis_data['created_at']}|{analysis_data['analysis_id']}"
+
+
+def expiry_bucket(created_at: str) -> str:
+    """
+    Hourly expiry bucket of an ISO creation timestamp
+    
+    Buckets sort chronologically as strings, so every bucket before the
+    cutoff's own bucket holds only expired analyses.
+    """
+    return created_at[:13]
+
+
+# Analyses per local expiry index slot; hourly buckets are split into slots so every index write stays small
+EXPIRY_SLOT_SIZE = 64
+
+
+_SKILL_KEY_TRANSLATION = str.maketrans(
+    {' ': '_', **{character: f'%{ord(character):02X}' for character in '%.$#[]/'}}
+)
+
+
+def skill_key(skill_name: str) -> str:
+    """
+    Database key for a skill name
+    
+    Spaces become underscores; '%' and the characters Firebase does not allow
+    in keys ('.', '$', '#', '[', ']', '/') are percent-encoded, so names such
+    as "Node.js" or "CI/CD" get a valid key of their own.
+    """
+    return skill_name.translate(_SKILL_KEY_TRANSLATION)
+
+
+def legacy_progress_statistics(skills_data: Dict, history_count: int = 0, statistics: Optional[Dict] = None) -> Dict:
+    """
+    Progress statistics of a user stored before they were kept at write time
+    
+    Rebuilt from the current skills; every update left a history entry and
+    every skill had at least one update, so the larger count is used.
+    """
+    return {
+        'total_skills': len(skills_data),
+        'proficiency_sum': sum(skill.get('proficiency_level', 0) for skill in skills_data.values()),
+        'total_updates': max(history_count, len(skills_data), (statistics or {}).get('total_updates', 0)),
+        'last_updated': max((skill.get('updated_at', '') for skill in skills_data.values()), default='')
+    }
+
+
+def apply_statistics_changes(statistics: Optional[Dict], changes: Dict) -> Dict:
+    """Statistics with changes applied: server increments are added, other values replace"""
+    statistics = dict(statistics or {})
+    for field, value in changes.items():
+        delta = increment_delta(value)
+        statistics[field] = statistics.get(field, 0) + delta if delta is not None else value
+    return statistics
+
+
+def progress_statistics_changes(statistics: Optional[Dict], skills_data: Dict,
+                                progress_entries: List[Tuple[str, Dict]], history_count: int = 0) -> Dict:
+    """
+    Changes to a user's progress statistics for a batch of skill updates
+    
+    The skill count and proficiency sum change by the difference from each
+    skill's previous level, written as server increments so batches from
+    other requests add up. Users without statistics get all of them written
+    once, seeded from their current skills and history_count.
+    
+    Args:
+        statistics: Stored statistics, None for a user without any
+        skills_data: The user's skills before the batch, keyed by skill key
+        progress_entries: (skill key, progress entry) pairs of the batch, oldest first
+        history_count: Progress history entries stored before the batch (only used to seed)
+        
+    Returns:
+        Mapping of statistics field to its new value or server increment
+    """
+    levels = {key: entry['proficiency_level'] for key, entry in progress_entries}
+    previous = {key: skills_data[key].get('proficiency_level', 0) for key in levels if key in skills_data}
+    changes = {
+        'total_skills': server_increment(len(levels) - len(previous)),
+        'proficiency_sum': server_increment(sum(levels.values()) - sum(previous.values())),
+        'total_updates': server_increment(len(progress_entries)),
+        'last_updated': progress_entries[-1][1]['updated_at']
+    }
+    if statistics and 'total_skills' in statistics:
+        return changes
+    return apply_statistics_changes(legacy_progress_statistics(skills_data, history_count, statistics), changes)
+
+
+def summarize_progress_statistics(statistics: Optional[Dict]) -> Dict:
+    """Public view of the progress statistics kept at write time"""
+    statistics = statistics or {}
+    total_skills = statistics.get('total_skills', 0)
+    average_proficiency = statistics.get('proficiency_sum', 0) / total_skills if total_skills else 0
+    return {
+        'total_skills': total_skills,
+        'average_proficiency': round(average_proficiency, 1),
+        'total_updates': statistics.get('total_updates', 0),
+        'last_updated': statistics.get('last_updated', '')
+    }
+
+
+def history_page(history: List[Dict], limit: int, cursor: Optional[str] = None) -> Dict:
+    """Newest-first page of a chronological progress history list"""
+    end = len(history)
+    if cursor:
+        end = bisect.bisect_left(history, cursor, key=lambda entry: entry.get('entry_id', ''))
+    start = max(0, end - limit)
+    entries = history[start:end][::-1]
+    next_cursor = entries[-1].get('entry_id') if start > 0 and entries else None
+    return {'entries': entries, 'next_cursor': next_cursor or None}
+
+
+def job_analysis_key(job_analysis: Dict) -> str:
+    """
+    Content hash under which a job analysis is stored once
+    
+    Hashing the analysis rather than the posting text means two different
+    analyses of the same posting (Gemini and fallback, or before and after a
+    cache expiry) never share a key.
+    """
+    canonical = json.dumps(job_analysis, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+PUSH_CHARS = '-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz'
+# Standard base64 digits mapped onto the push ID alphabet, so encoding is a single translate
+_PUSH_CHARS_TRANSLATION = str.maketrans(
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/', PUSH_CHARS
+)
+_push_id_lock = threading.Lock()
+_last_push_time = 0
+_last_push_prefix = ''
+_last_push_random = 0
+
+
+def _encode_push_chars(value: int, size: int) -> str:
+    """Encode the size-byte big-endian value as 4 * size / 3 push ID characters"""
+    return base64.b64encode(value.to_bytes(size, 'big')).decode('ascii').translate(_PUSH_CHARS_TRANSLATION)
+
+
+def generate_push_id() -> str:
+    """
+    Generate a Firebase-style push ID locally
+    
+    Same format as the IDs the server assigns on push(): 8 characters of
+    millisecond timestamp followed by 12 random characters, incremented within
+    the same millisecond so IDs sort in creation order. Generating them here
+    lets a push be part of a multi-path update instead of its own round trip.
+    """
+    global _last_push_time, _last_push_prefix, _last_push_random
+    with _push_id_lock:
+        now = int(time.time() * 1000)
+        if now == _last_push_time:
+            _last_push_random = (_last_push_random + 1) & ((1 << 72) - 1)
+        else:
+            _last_push_time = now
+            _last_push_prefix = _encode_push_chars(now, 6)
+            _last_push_random = random.getrandbits(72)
+        return _last_push_prefix + _encode_push_chars(_last_push_random, 9)
+
 class FirebaseService:
     """Service for Firebase Realtime Database operations"""
     
-    def __init__(self):
+    def __init__(self, local_store=None, write_behind: Optional[bool] = None):
         self.db_url = Config.FIREBASE_DATABASE_URL
         self.project_id = Config.FIREBASE_PROJECT_ID
         self.service_account_key = Config.FIREBASE_SERVICE_ACCOUNT_KEY
         
-        # Local storage fallback
-        self.local_storage = {}
+        # Bounded local storage fallback
+        self.local_storage = local_store if local_store is not None else create_local_store()
+        
+        # Stored analysis format; reads decode whatever format a record was written in
+        self.analysis_codec = Config.ANALYSIS_STORAGE_CODEC.lower()
+        if self.analysis_codec != 'none' and self.analysis_codec not in DICTIONARIES:
+            logger.error(f"Unknown analysis storage codec '{self.analysis_codec}', storing plain JSON")
+            self.analysis_codec = 'none'
+        
+        # Read-through cache of stored (encoded) analyses, which never change once written
+        self.analysis_cache = None
+        if Config.RESULTS_CACHE_MAX_BYTES > 0:
+            self.analysis_cache = InMemoryLocalStore(Config.RESULTS_CACHE_MAX_ENTRIES, Config.RESULTS_CACHE_MAX_BYTES)
+        self.analysis_cache_hits = 0
+        self.analysis_cache_misses = 0
+        
+        # Hot copies of shared job analyses by content hash
+        self.job_analysis_cache = InMemoryLocalStore(Config.SHARED_JOB_ANALYSIS_CACHE_MAX_ENTRIES,
+                                                     Config.SHARED_JOB_ANALYSIS_CACHE_MAX_BYTES)
+        # Content hashes whose full shared record this worker has seen written to Firebase
+        self.job_analyses_written = InMemoryLocalStore(Config.SHARED_JOB_ANALYSIS_CACHE_MAX_ENTRIES,
+                                                       Config.SHARED_JOB_ANALYSIS_CACHE_MAX_ENTRIES * 256)
+        # Well inside the retention window, so the sweeper cannot have removed a record still marked here
+        self.job_analyses_written_ttl = min(Config.SHARED_JOB_ANALYSIS_CACHE_TTL,
+                                            Config.DATA_RETENTION_DAYS * 86400 // 2)
+        
+        # Background expiry of analyses older than DATA_RETENTION_DAYS
+        self._sweeper = None
+        self._sweeper_lock = threading.Lock()
+        self._expiry_slot = None  # (slot this worker appends to, entries in it)
+        self._expiry_slot_lock = threading.Lock()
+        self.expiry_stats = {
+            'sweeps': 0,
+            'unfinished_sweeps': 0,
+            'expired_analyses': 0,
+            'expired_job_analyses': 0,
+            'expired_analysis_statuses': 0,
+            'last_sweep_seconds': 0.0
+        }
         
         if FIREBASE_AVAILABLE and self.db_url and self.project_id:
             self._initialize_firebase()
         else:
             logger.warning("Firebase not configured. Using local storage fallback.")
             self.firebase_initialized = False
+        
+        write_behind = write_behind if write_behind is not None else Config.FIREBASE_WRITE_BEHIND
+        self.write_behind = None
+        if write_behind and self.firebase_initialized:
+            self.write_behind = WriteBehindQueue(self._write_updates, on_failure=self._store_failed_updates_locally,
+                                                 on_written=self._mark_job_analyses_written)
     
     def _initialize_firebase(self):
         """Initialize Firebase Admin SDK"""
@@ -63,47 +288,202 @@ class FirebaseService:
             logger.error(f"Failed to initialize Firebase: {str(e)}")
             self.firebase_initialized = False
     
-    def store_analysis(self, analysis_data: Dict) -> str:
+    def _write_updates(self, updates: Dict) -> None:
+        """Apply a multi-path update in one round trip"""
+        db.reference().update(updates)
+    
+    def _write(self, updates: Dict) -> None:
+        """Write a multi-path update, through the write-behind queue when enabled"""
+        if self.write_behind is not None and self.write_behind.enqueue(updates):
+            return
+        # Queue disabled or full: write synchronously
+        self._write_updates(updates)
+        self._mark_job_analyses_written(updates)
+    
+    def _read(self, path: str):
+        """Read a path from Firebase, seeing writes still waiting in the write-behind queue"""
+        if self.write_behind is not None:
+            data = self.write_behind.get(path)
+            if data is not MISSING:
+                return data
+        return db.reference(path).get()
+    
+    def _read_children(self, path: str, data) -> Dict:
+        """Merge children of path still waiting in the write-behind queue into data read from Firebase"""
+        data = dict(data) if isinstance(data, dict) else {}
+        if self.write_behind is not None:
+            data.update(self.write_behind.pending_children(path))
+        return data
+    
+    def _mark_job_analyses_written(self, updates: Dict) -> None:
+        """Remember shared job analyses whose full record a successful write contained"""
+        for path, value in updates.items():
+            if path.startswith('job_analyses/') and isinstance(value, dict) and 'referenced_at' in value:
+                self.job_analyses_written.set(path.split('/', 1)[1], True, ttl=self.job_analyses_written_ttl)
+    
+    def _store_failed_updates_locally(self, updates: Dict) -> None:
+        """Keep analyses the write-behind queue could not write readable from local storage"""
+        for path, value in updates.items():
+            if path.startswith(('analyses/', 'job_analyses/')) and isinstance(value, dict):
+                self.local_storage.set(path, value, ttl=Config.LOCAL_STORE_ANALYSIS_TTL)
+    
+    def store_analysis(self, analysis_data: Dict, analysis_id: Optional[str] = None,
+                       user_id: Optional[str] = None) -> str:
         """
         Store job analysis results
         
         Args:
             analysis_data: Complete analysis results
+            analysis_id: Pre-assigned identifier (asynchronous analyses); generated if omitted
+            user_id: Owner of the analysis; added to the user's analysis index
             
         Returns:
             Analysis ID for retrieval
         """
-        analysis_id = str(uuid.uuid4())
+        analysis_id = analysis_id or str(uuid.uuid4())
+        user_id = user_id or analysis_data.get('user_id')
         
         # Add metadata
         analysis_data.update({
             'analysis_id': analysis_id,
             'created_at': datetime.now().isoformat(),
-            'version': '1.0'
+            'version': ANALYSIS_VERSION
         })
+        if user_id:
+            analysis_data['user_id'] = user_id
+        
+        # Everyone analyzing the same posting gets the same job analysis, so it is stored once
+        record = dict(analysis_data)
+        job_analysis = record.pop('job_analysis', None)
+        job_analysis_ref = job_analysis_key(job_analysis) if job_analysis else None
+        if job_analysis_ref:
+            record['job_analysis_ref'] = job_analysis_ref
+        stored = self._encode(record)
         
         try:
             if self.firebase_initialized:
-                ref = db.reference(f'analyses/{analysis_id}')
-                ref.set(analysis_data)
+                updates = {f'analyses/{analysis_id}': stored}
+                if job_analysis_ref and self.job_analyses_written.get(job_analysis_ref) is None:
+                    # Not known to be in Firebase (never written, still queued, given up on or swept);
+                    # rewriting identical content is harmless
+                    updates[f'job_analyses/{job_analysis_ref}'] = dict(self._encode({'job_analysis': job_analysis}),
+                                                                       referenced_at=analysis_data['created_at'])
+                elif job_analysis_ref:
+                    # Keeps the shared record from expiring while analyses still refer to it
+                    updates[f'job_analyses/{job_analysis_ref}/referenced_at'] = analysis_data['created_at']
+                if user_id:
+                    # Record and index entry are written in one atomic multi-path update
+                    updates[f'user_analyses/{user_id}/{analysis_id}'] = user_index_entry(analysis_data)
+                self._write(updates)
                 logger.info(f"Analysis stored in Firebase: {analysis_id}")
             else:
                 # Fallback to local storage
-                self.local_storage[f'analyses/{analysis_id}'] = analysis_data
+                self._store_analysis_locally(analysis_id, stored, user_id, job_analysis)
                 logger.info(f"Analysis stored locally: {analysis_id}")
             
+            self._cache_analysis(analysis_id, stored)
+            if job_analysis_ref:
+                self.job_analysis_cache.set(job_analysis_ref, job_analysis, ttl=Config.SHARED_JOB_ANALYSIS_CACHE_TTL)
+            self._ensure_sweeper()
             return analysis_id
             
         except Exception as e:
             logger.error(f"Error storing analysis: {str(e)}")
             # Fallback to local storage
-            self.local_storage[f'analyses/{analysis_id}'] = analysis_data
+            self._store_analysis_locally(analysis_id, stored, user_id, job_analysis)
+            self._cache_analysis(analysis_id, stored)
             return analysis_id
     
+    def _encode(self, record: Dict) -> Dict:
+        return record if self.analysis_codec == 'none' else encode_analysis(record, self.analysis_codec)
+    
+    def _store_analysis_locally(self, analysis_id: str, stored: Dict, user_id: Optional[str],
+                                job_analysis: Optional[Dict] = None) -> None:
+        """Store an encoded analysis, its shared job analysis and its owner's index entry in local storage"""
+        self.local_storage.set(f'analyses/{analysis_id}', stored, ttl=Config.LOCAL_STORE_ANALYSIS_TTL)
+        if stored.get('job_analysis_ref'):
+            # Written only when missing, but the TTL is renewed so it outlives every analysis referring to it
+            self.local_storage.update(
+                f"job_analyses/{stored['job_analysis_ref']}",
+                lambda current: current if current is not None else self._encode({'job_analysis': job_analysis}),
+                ttl=Config.LOCAL_STORE_ANALYSIS_TTL
+            )
+        self._index_expiry_locally(analysis_id, stored['created_at'], user_id)
+        if not user_id:
+            return
+        
+        entry = user_index_entry(stored)
+        
+        def add_to_index(entries):
+            entries = [existing for existing in (entries or []) if not existing.endswith(f'|{analysis_id}')]
+            bisect.insort(entries, entry)
+            # Oldest entries fall off; their analyses expire from the store anyway
+            del entries[:-Config.LOCAL_USER_ANALYSES_INDEX_LIMIT]
+            return entries
+        
+        self.local_storage.update(f'user_analyses/{user_id}', add_to_index)
+    
+    def _index_expiry_locally(self, analysis_id: str, created_at: str, user_id: Optional[str]) -> None:
+        """Add a locally stored analysis to a slot of its expiry bucket"""
+        bucket = expiry_bucket(created_at)
+        with self._expiry_slot_lock:
+            # Claimed under the lock, so request threads never overfill a slot or open two at once
+            slot, count = self._expiry_slot or (None, 0)
+            new_slot = slot is None or not slot.startswith(f'{bucket}/') or count >= EXPIRY_SLOT_SIZE
+            if new_slot:
+                # Slots are per worker, so workers sharing a SQLite store never contend for one
+                slot, count = f'{bucket}/{os.getpid()}-{uuid.uuid4().hex[:8]}', 0
+            self._expiry_slot = (slot, count + 1)
+        
+        if new_slot:
+            def add_to_directory(slots):
+                slots = list(slots or [])
+                bisect.insort(slots, slot)
+                return slots
+            
+            self.local_storage.update('expiry_slots', add_to_directory)
+        
+        def add_to_slot(entries):
+            return (entries or []) + [[analysis_id, user_id, created_at]]
+        
+        self.local_storage.update(f'expiry_index/{slot}', add_to_slot)
+    
+    def _load_analysis(self, stored: Dict) -> Dict:
+        """Decode a stored analysis and put its shared job analysis back in place"""
+        analysis = dict(decode_analysis(stored))
+        job_analysis_ref = analysis.pop('job_analysis_ref', None)
+        if job_analysis_ref is None:
+            return analysis
+        
+        job_analysis = self.job_analysis_cache.get(job_analysis_ref)
+        if job_analysis is None:
+            path = f'job_analyses/{job_analysis_ref}'
+            sources = (self._read, self.local_storage.get) if self.firebase_initialized else (self.local_storage.get,)
+            for read in sources:
+                shared = read(path)
+                job_analysis = decode_analysis(shared).get('job_analysis') if shared else None
+                if job_analysis is not None:
+                    self.job_analysis_cache.set(job_analysis_ref, job_analysis, ttl=Config.SHARED_JOB_ANALYSIS_CACHE_TTL)
+                    break
+                # Missing, or holding only referenced_at after a sweep: the next store must write it in full
+                self.job_analyses_written.delete(job_analysis_ref)
+            else:
+                logger.warning(f"Shared job analysis not found: {job_analysis_ref}")
+        
+        analysis['job_analysis'] = job_analysis or {}
+        return analysis
+    
+    def _cache_analysis(self, analysis_id: str, stored: Dict) -> None:
+        if self.analysis_cache is not None:
+            self.analysis_cache.set(analysis_id, stored, ttl=Config.RESULTS_CACHE_MAX_AGE)
+    
     def get_analysis(self, analysis_id: str) -> Optional[Dict]:
         """
         Retrieve analysis results by ID
         
+        Analyses are immutable once written, so they are served from an
+        in-process cache bounded by RESULTS_CACHE_MAX_BYTES when possible.
+        
         Args:
             analysis_id: Analysis identifier
             
@@ -111,18 +491,26 @@ class FirebaseService:
             Analysis data or None if not found
         """
         try:
+            if self.analysis_cache is not None:
+                data = self.analysis_cache.get(analysis_id)
+                if data is not None:
+                    self.analysis_cache_hits += 1
+                    return self._load_analysis(data)
+                self.analysis_cache_misses += 1
+            
             if self.firebase_initialized:
-                ref = db.reference(f'analyses/{analysis_id}')
-                data = ref.get()
+                data = self._read(f'analyses/{analysis_id}')
                 if data:
                     logger.info(f"Analysis retrieved from Firebase: {analysis_id}")
-                    return data
+                    self._cache_analysis(analysis_id, data)
+                    return self._load_analysis(data)
             
             # Check local storage
             data = self.local_storage.get(f'analyses/{analysis_id}')
             if data:
                 logger.info(f"Analysis retrieved from local storage: {analysis_id}")
-                return data
+                self._cache_analysis(analysis_id, data)
+                return self._load_analysis(data)
             
             logger.warning(f"Analysis not found: {analysis_id}")
             return None
@@ -131,6 +519,87 @@ class FirebaseService:
             logger.error(f"Error retrieving analysis: {str(e)}")
             return None
     
+    def get_analysis_created_at(self, analysis_id: str) -> Optional[str]:
+        """
+        Creation time of a stored analysis, without loading the analysis
+        
+        Reads only the created_at field, which is stored uncompressed, so a
+        conditional request can be answered without fetching the payload.
+        
+        Args:
+            analysis_id: Analysis identifier
+            
+        Returns:
+            ISO creation timestamp, or None if the analysis does not exist
+        """
+        try:
+            if self.analysis_cache is not None:
+                data = self.analysis_cache.get(analysis_id)
+                if data is not None:
+                    return data.get('created_at')
+            
+            if self.firebase_initialized:
+                if self.write_behind is not None:
+                    data = self.write_behind.get(f'analyses/{analysis_id}')
+                    if data is not MISSING:
+                        return data.get('created_at') if data else None
+                created_at = db.reference(f'analyses/{analysis_id}/created_at').get()
+                if created_at:
+                    return created_at
+            
+            data = self.local_storage.get(f'analyses/{analysis_id}')
+            return data.get('created_at') if data else None
+            
+        except Exception as e:
+            logger.error(f"Error checking analysis: {str(e)}")
+            return None
+    
+    def store_analysis_status(self, status: Dict) -> bool:
+        """
+        Publish the status of an asynchronous analysis to every worker
+        
+        Args:
+            status: Job status from the analysis queue
+        
+        Returns:
+            Success status
+        """
+        analysis_id = status['analysis_id']
+        record = dict(status, updated_at=datetime.now().isoformat())
+        try:
+            if self.firebase_initialized:
+                self._write({f'analysis_status/{analysis_id}': record})
+            else:
+                self.local_storage.set(f'analysis_status/{analysis_id}', record, ttl=Config.LOCAL_STORE_ANALYSIS_TTL)
+            return True
+        
+        except Exception as e:
+            logger.error(f"Error storing analysis status: {str(e)}")
+            self.local_storage.set(f'analysis_status/{analysis_id}', record, ttl=Config.LOCAL_STORE_ANALYSIS_TTL)
+            return False
+    
+    def get_analysis_status(self, analysis_id: str) -> Optional[Dict]:
+        """
+        Status of an asynchronous analysis as last published by any worker
+        
+        Args:
+            analysis_id: Analysis identifier
+        
+        Returns:
+            Job status or None if no worker published one
+        """
+        try:
+            if self.firebase_initialized:
+                data = self._read(f'analysis_status/{analysis_id}')
+                if data:
+                    return data
+        
+            return self.local_storage.get(f'analysis_status/{analysis_id}')
+        
+        except Exception as e:
+            logger.error(f"Error retrieving analysis status: {str(e)}")
+            return None
+    
     def store_user_profile(self, user_id: str, profile_data: Dict) -> bool:
         """
         Store or update user profile
@@ -149,11 +618,10 @@ class FirebaseService:
             })
             
             if self.firebase_initialized:
-                ref = db.reference(f'users/{user_id}/profile')
-                ref.set(profile_data)
+                self._write({f'users/{user_id}/profile': profile_data})
                 logger.info(f"User profile stored in Firebase: {user_id}")
             else:
-                self.local_storage[f'users/{user_id}/profile'] = profile_data
+                self.local_storage.set(f'users/{user_id}/profile', profile_data)
                 logger.info(f"User profile stored locally: {user_id}")
             
             return True
@@ -174,8 +642,7 @@ class FirebaseService:
         """
         try:
             if self.firebase_initialized:
-                ref = db.reference(f'users/{user_id}/profile')
-                data = ref.get()
+                data = self._read(f'users/{user_id}/profile')
                 if data:
                     return data
             
@@ -198,34 +665,82 @@ class FirebaseService:
         Returns:
             Success status
         """
+        return self.update_skill_progress_batch(user_id, [(skill_name, new_proficiency)])
+    
+    def update_skill_progress_batch(self, user_id: str, updates: List[Tuple[str, int]]) -> bool:
+        """
+        Update several of a user's skill proficiency levels at once
+        
+        Skills, progress history entries and the user's statistics are
+        written in one multi-path update (one store update locally), so they
+        are applied together. The statistics change by server-side increments
+        computed from the skills' previous levels, so reading progress never
+        aggregates skills or history. A skill updated more than once ends at
+        its last level; every update is kept in the history.
+        
+        Args:
+            user_id: User identifier
+            updates: (skill name, new proficiency level 1-10) pairs, oldest first
+            
+        Returns:
+            Success status; either every update is applied or none is (with
+            write-behind, a batch the queue gives up on is dropped as a whole)
+        """
         try:
-            progress_entry = {
-                'skill_name': skill_name,
-                'proficiency_level': new_proficiency,
-                'updated_at': datetime.now().isoformat()
-            }
+            updated_at = datetime.now().isoformat()
+            # Push IDs are generated in order, so history keeps the order of the batch
+            progress_entries = [
+                (skill_key(skill_name), {
+                    'skill_name': skill_name,
+                    'proficiency_level': new_proficiency,
+                    'updated_at': updated_at,
+                    'entry_id': generate_push_id()
+                })
+                for skill_name, new_proficiency in updates
+            ]
             
             if self.firebase_initialized:
-                # Update skill in user profile
-                ref = db.reference(f'users/{user_id}/skills/{skill_name.replace(" ", "_")}')
-                ref.set(progress_entry)
+                # Previous levels and whether statistics exist yet, both seeing writes still queued
+                skills_path = f'users/{user_id}/skills'
+                statistics_path = f'users/{user_id}/statistics'
+                skills_data = self._read_children(skills_path, db.reference(skills_path).get())
+                statistics = self._read_children(statistics_path, db.reference(statistics_path).get())
+                history_count = 0
+                if 'total_skills' not in statistics:
+                    # Seeding a user stored before statistics were kept: count the history once (keys only)
+                    history_path = f'users/{user_id}/progress_history'
+                    history_count = len(self._read_children(history_path, db.reference(history_path).get(shallow=True)))
+                changes = progress_statistics_changes(statistics, skills_data, progress_entries, history_count)
                 
-                # Add to progress history
-                history_ref = db.reference(f'users/{user_id}/progress_history')
-                history_ref.push(progress_entry)
+                # Skills, progress history entries and statistics in one round trip
+                batch = {f'{statistics_path}/{field}': value for field, value in changes.items()}
+                for key, progress_entry in progress_entries:
+                    batch[f'users/{user_id}/skills/{key}'] = progress_entry
+                    batch[f'users/{user_id}/progress_history/{progress_entry["entry_id"]}'] = progress_entry
+                self._write(batch)
                 
-                logger.info(f"Skill progress updated in Firebase: {user_id} - {skill_name}")
+                logger.info(f"Skill progress updated in Firebase: {user_id} - {len(progress_entries)} skill(s)")
             else:
                 # Local storage update
-                user_key = f'users/{user_id}'
-                if user_key not in self.local_storage:
-                    self.local_storage[user_key] = {'skills': {}, 'progress_history': []}
+                def apply_progress(user_data):
+                    # Copied rather than mutated: concurrent readers may hold the stored value
+                    user_data = dict(user_data or {})
+                    skills = dict(user_data.get('skills') or {})
+                    history = list(user_data.get('progress_history') or [])
+                    statistics = user_data.get('statistics')
+                    changes = progress_statistics_changes(statistics, skills, progress_entries, len(history))
+                    statistics = apply_statistics_changes(statistics, changes)
+                    for key, progress_entry in progress_entries:
+                        skills[key] = progress_entry
+                        history.append(progress_entry)
+                    # Keep only the most recent entries per user
+                    del history[:-Config.LOCAL_PROGRESS_HISTORY_LIMIT]
+                    user_data.update(statistics=statistics, skills=skills, progress_history=history)
+                    return user_data
                 
-                skill_key = skill_name.replace(" ", "_")
-                self.local_storage[user_key]['skills'][skill_key] = progress_entry
-                self.local_storage[user_key]['progress_history'].append(progress_entry)
+                self.local_storage.update(f'users/{user_id}', apply_progress)
                 
-                logger.info(f"Skill progress updated locally: {user_id} - {skill_name}")
+                logger.info(f"Skill progress updated locally: {user_id} - {len(progress_entries)} skill(s)")
             
             return True
             
@@ -233,50 +748,46 @@ class FirebaseService:
             logger.error(f"Error updating skill progress: {str(e)}")
             return False
     
-    def get_user_progress(self, user_id: str) -> Dict:
+    def get_user_progress(self, user_id: str, history_limit: int = 10) -> Dict:
         """
-        Get user's learning progress and history
+        Get user's learning progress and the most recent page of history
         
         Args:
             user_id: User identifier
+            history_limit: Number of history entries to include
             
         Returns:
-            Progress data including skills and history
+            Progress data including skills, history and statistics; pass
+            history_cursor to get_progress_history_page for older entries
         """
         try:
             if self.firebase_initialized:
                 # Get current skills
-                skills_ref = db.reference(f'users/{user_id}/skills')
-                skills_data = skills_ref.get() or {}
-                
-                # Get progress history
-                history_ref = db.reference(f'users/{user_id}/progress_history')
-                history_data = history_ref.get() or {}
-                
-                # Convert history to list
-                history_list = list(history_data.values()) if isinstance(history_data, dict) else []
-                
+                skills_path = f'users/{user_id}/skills'
+                skills_data = self._read_children(skills_path, db.reference(skills_path).get())
+                statistics_path = f'users/{user_id}/statistics'
+                statistics = db.reference(statistics_path).get()
+                if self.write_behind is not None:
+                    # Read after Firebase, so a flush in between can only make the totals briefly off
+                    statistics = apply_statistics_changes(statistics, self.write_behind.pending_children(statistics_path))
+                page = self.get_progress_history_page(user_id, history_limit)
             else:
                 # Local storage retrieval
-                user_data = self.local_storage.get(f'users/{user_id}', {})
+                user_data = self.local_storage.get(f'users/{user_id}') or {}
                 skills_data = user_data.get('skills', {})
-                history_list = user_data.get('progress_history', [])
-            
-            # Calculate progress statistics
-            total_skills = len(skills_data)
-            avg_proficiency = 0
-            if total_skills > 0:
-                avg_proficiency = sum(skill.get('proficiency_level', 0) for skill in skills_data.values()) / total_skills
+                statistics = user_data.get('statistics')
+                page = history_page(user_data.get('progress_history', []), history_limit)
             
             return {
                 'user_id': user_id,
                 'current_skills': skills_data,
-                'progress_history': sorted(history_list, key=lambda x: x.get('updated_at', ''), reverse=True),
-                'statistics': {
-                    'total_skills': total_skills,
-                    'average_proficiency': round(avg_proficiency, 1),
-                    'last_updated': max([skill.get('updated_at', '') for skill in skills_data.values()], default='')
-                }
+                'progress_history': page['entries'],
+                'history_cursor': page['next_cursor'],
+                'statistics': summarize_progress_statistics(
+                    statistics if statistics and 'total_skills' in statistics
+                    # Not updated since statistics were kept: derived once here, written by the next update
+                    else legacy_progress_statistics(skills_data, statistics=statistics)
+                )
             }
             
         except Exception as e:
@@ -285,10 +796,44 @@ class FirebaseService:
                 'user_id': user_id,
                 'current_skills': {},
                 'progress_history': [],
-                'statistics': {'total_skills': 0, 'average_proficiency': 0, 'last_updated': ''},
+                'history_cursor': None,
+                'statistics': {'total_skills': 0, 'average_proficiency': 0, 'total_updates': 0, 'last_updated': ''},
                 'error': 'Failed to retrieve progress data'
             }
     
+    def get_progress_history_page(self, user_id: str, limit: int = 10, cursor: Optional[str] = None) -> Dict:
+        """
+        Get one page of a user's progress history, newest first
+        
+        Args:
+            user_id: User identifier
+            limit: Maximum number of entries to return
+            cursor: next_cursor from the previous page; omit for the newest page
+            
+        Returns:
+            Dictionary with the page's entries and the cursor of the next page
+            (None when there are no older entries)
+        """
+        try:
+            if self.firebase_initialized:
+                # History keys are push IDs, which sort chronologically
+                history_path = f'users/{user_id}/progress_history'
+                query = db.reference(history_path).order_by_key()
+                if cursor:
+                    # end_at is inclusive, so fetch one extra to drop the cursor entry itself
+                    query = query.end_at(cursor)
+                results = self._read_children(history_path, query.limit_to_last(limit + (2 if cursor else 1)).get())
+                entry_ids = sorted(entry_id for entry_id in results if not cursor or entry_id < cursor)
+                history = [dict(results[entry_id], entry_id=entry_id) for entry_id in entry_ids]
+                return history_page(history, limit)
+            
+            user_data = self.local_storage.get(f'users/{user_id}') or {}
+            return history_page(user_data.get('progress_history', []), limit, cursor)
+            
+        except Exception as e:
+            logger.error(f"Error retrieving progress history: {str(e)}")
+            return {'entries': [], 'next_cursor': None}
+    
     def store_learning_milestone(self, user_id: str, milestone_data: Dict) -> bool:
         """
         Store completed learning milestone
@@ -307,16 +852,17 @@ class FirebaseService:
             })
             
             if self.firebase_initialized:
-                ref = db.reference(f'users/{user_id}/milestones')
-                ref.push(milestone_data)
+                self._write({f'users/{user_id}/milestones/{generate_push_id()}': milestone_data})
             else:
-                user_key = f'users/{user_id}'
-                if user_key not in self.local_storage:
-                    self.local_storage[user_key] = {}
-                if 'milestones' not in self.local_storage[user_key]:
-                    self.local_storage[user_key]['milestones'] = []
+                def apply_milestone(user_data):
+                    user_data = dict(user_data or {})
+                    milestones = list(user_data.get('milestones') or [])
+                    milestones.append(milestone_data)
+                    del milestones[:-Config.LOCAL_PROGRESS_HISTORY_LIMIT]
+                    user_data['milestones'] = milestones
+                    return user_data
                 
-                self.local_storage[user_key]['milestones'].append(milestone_data)
+                self.local_storage.update(f'users/{user_id}', apply_milestone)
             
             logger.info(f"Learning milestone stored: {user_id}")
             return True
@@ -334,70 +880,187 @@ class FirebaseService:
             limit: Maximum number of analyses to return
             
         Returns:
-            List of recent analyses
+            List of recent analyses, most recent first
         """
-        try:
-            analyses = []
+        return self.get_user_analyses_page(user_id, limit)['analyses']
+    
+    def get_user_analyses_page(self, user_id: str, limit: int = 10, cursor: Optional[str] = None) -> Dict:
+        """
+        Get one page of a user's analyses, most recent first
+        
+        Reads the per-user index maintained by store_analysis, so a page costs
+        O(limit) lookups regardless of how many analyses are stored.
+        
+        Args:
+            user_id: User identifier
+            limit: Maximum number of analyses to return
+            cursor: next_cursor from the previous page; omit for the newest page
             
+        Returns:
+            Dictionary with the page's analyses and the cursor of the next page
+            (None when there are no older analyses)
+        """
+        try:
             if self.firebase_initialized:
-                # Query analyses by user_id (would need to be indexed in real implementation)
-                ref = db.reference('analyses')
-                all_analyses = ref.order_by_child('user_id').equal_to(user_id).limit_to_last(limit).get()
-                
-                if all_analyses:
-                    analyses = list(all_analyses.values())
+                # Requires ".indexOn": ".value" on user_analyses/$user_id
+                index_path = f'user_analyses/{user_id}'
+                query = db.reference(index_path).order_by_value()
+                if cursor:
+                    # end_at is inclusive, so fetch one extra to drop the cursor entry itself
+                    query = query.end_at(cursor).limit_to_last(limit + 2)
+                else:
+                    query = query.limit_to_last(limit + 1)
+                results = query.get() or {}
+                # A full result may have more entries beyond it even if some below are stale
+                more_available = len(results) == (limit + 2 if cursor else limit + 1)
+                entries = sorted(self._read_children(index_path, results).values())
+                if cursor:
+                    entries = [entry for entry in entries if entry < cursor]
+                fetch = lambda analysis_id: self._read(f'analyses/{analysis_id}')
             else:
-                # Local storage search
-                for key, data in self.local_storage.items():
-                    if key.startswith('analyses/') and data.get('user_id') == user_id:
-                        analyses.append(data)
+                entries = self.local_storage.get(f'user_analyses/{user_id}') or []
+                if cursor:
+                    entries = entries[:bisect.bisect_left(entries, cursor)]
+                more_available = False
+                fetch = lambda analysis_id: self.local_storage.get(f'analyses/{analysis_id}')
             
-            # Sort by creation date (most recent first)
-            analyses.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+            analyses = []
+            next_cursor = None
+            for position in range(len(entries) - 1, -1, -1):
+                if len(analyses) == limit:
+                    next_cursor = entries[position + 1]
+                    break
+                data = fetch(entries[position].rsplit('|', 1)[1])
+                # Entries whose analysis expired or was cleaned up are skipped
+                if data:
+                    analyses.append(self._load_analysis(data))
+            if next_cursor is None and more_available and entries:
+                next_cursor = entries[0]
             
-            return analyses[:limit]
+            return {'analyses': analyses, 'next_cursor': next_cursor}
             
         except Exception as e:
             logger.error(f"Error retrieving user analyses: {str(e)}")
-            return []
+            return {'analyses': [], 'next_cursor': None}
     
-    def cleanup_old_data(self, days_old: int = 30) -> bool:
+    def cleanup_old_data(self, days_old: int = 30, time_budget: Optional[float] = None) -> bool:
         """
         Clean up old analysis data (for storage management)
         
+        Only expired data is visited: local analyses through their hourly
+        expiry buckets, Firebase analyses and shared job analyses through
+        batched range queries on created_at and referenced_at.
+        
         Args:
             days_old: Remove data older than this many days
+            time_budget: Seconds this pass may spend; what is left is removed by the next pass
             
         Returns:
             Success status
         """
+        started = time.monotonic()
+        deadline = started + time_budget if time_budget is not None else None
+        cutoff = (datetime.now() - timedelta(days=days_old)).isoformat()
+        expired_before = self.expiry_stats['expired_analyses']
+        
         try:
-            cutoff_date = datetime.now().timestamp() - (days_old * 24 * 60 * 60)
-            
-            if self.firebase_initialized:
-                # This would require a more sophisticated cleanup process in production
-                logger.info("Firebase cleanup would be implemented with Cloud Functions")
-            else:
-                # Local storage cleanup
-                keys_to_remove = []
-                for key, data in self.local_storage.items():
-                    if key.startswith('analyses/'):
-                        created_at = data.get('created_at', '')
-                        if created_at:
-                            try:
-                                data_timestamp = datetime.fromisoformat(created_at.replace('Z', '+00:00')).timestamp()
-                                if data_timestamp < cutoff_date:
-                                    keys_to_remove.append(key)
-                            except ValueError:
-                                continue
-                
-                for key in keys_to_remove:
-                    del self.local_storage[key]
-                
-                logger.info(f"Cleaned up {len(keys_to_remove)} old analyses")
+            finished = self._sweep_local(expiry_bucket(cutoff), deadline)
+            if self.firebase_initialized and finished:
+                finished = self._sweep_firebase(cutoff, deadline)
             
+            self.expiry_stats['sweeps'] += 1
+            if not finished:
+                self.expiry_stats['unfinished_sweeps'] += 1
+            self.expiry_stats['last_sweep_seconds'] = round(time.monotonic() - started, 3)
+            logger.info(f"Cleaned up {self.expiry_stats['expired_analyses'] - expired_before} old analyses")
             return True
             
         except Exception as e:
             logger.error(f"Error during cleanup: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+    
+    def _sweep_local(self, cutoff_bucket: str, deadline: Optional[float]) -> bool:
+        """Remove locally stored analyses in buckets before cutoff_bucket; False if the deadline hit first"""
+        swept = set()
+        finished = True
+        for slot in self.local_storage.get('expiry_slots') or []:
+            if slot.split('/', 1)[0] >= cutoff_bucket:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                finished = False
+                break
+            self._delete_local_analyses(self.local_storage.get(f'expiry_index/{slot}') or [])
+            self.local_storage.delete(f'expiry_index/{slot}')
+            swept.add(slot)
+        
+        if swept:
+            self.local_storage.update('expiry_slots', lambda slots: [s for s in slots or [] if s not in swept] or None)
+        return finished
+    
+    def _delete_local_analyses(self, entries: List) -> None:
+        """Delete expired local analyses and their owners' index entries"""
+        expired_by_user = {}
+        for analysis_id, user_id, created_at in entries:
+            self.local_storage.delete(f'analyses/{analysis_id}')
+            if self.analysis_cache is not None:
+                self.analysis_cache.delete(analysis_id)
+            if user_id:
+                expired_by_user.setdefault(user_id, set()).add(f'{created_at}|{analysis_id}')
+        
+        for user_id, expired in expired_by_user.items():
+            self.local_storage.update(f'user_analyses/{user_id}',
+                                      lambda index, expired=expired: [e for e in index or [] if e not in expired] or None)
+        self.expiry_stats['expired_analyses'] += len(entries)
+    
+    def _sweep_firebase(self, cutoff: str, deadline: Optional[float]) -> bool:
+        """Remove expired Firebase analyses, shared job analyses nothing refers to anymore and old job statuses"""
+        batch_size = Config.EXPIRY_SWEEP_BATCH_SIZE
+        
+        for path, field, counter in (('analyses', 'created_at', 'expired_analyses'),
+                                     ('job_analyses', 'referenced_at', 'expired_job_analyses'),
+                                     ('analysis_status', 'updated_at', 'expired_analysis_statuses')):
+            while True:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+                
+                # start_at('') skips records without the field (null sorts before strings)
+                expired = (db.reference(path).order_by_child(field).start_at('').end_at(cutoff)
+                           .limit_to_first(batch_size).get()) or {}
+                if not expired:
+                    break
+                
+                updates = {}
+                for key, data in expired.items():
+                    updates[f'{path}/{key}'] = None
+                    if path == 'analyses':
+                        if isinstance(data, dict) and data.get('user_id'):
+                            updates[f"user_analyses/{data['user_id']}/{key}"] = None
+                        if self.analysis_cache is not None:
+                            self.analysis_cache.delete(key)
+                    elif path == 'job_analyses':
+                        self.job_analysis_cache.delete(key)
+                        self.job_analyses_written.delete(key)
+                
+                # Written directly: a queued delete would be found again by the next range query
+                self._write_updates(updates)
+                self.expiry_stats[counter] += len(expired)
+                if len(expired) < batch_size:
+                    break
+        return True
+    
+    def _ensure_sweeper(self) -> None:
+        # Started lazily so the thread lives in each gunicorn worker, not the master
+        if self._sweeper is not None or Config.EXPIRY_SWEEP_INTERVAL <= 0:
+            return
+        
+        with self._sweeper_lock:
+            if self._sweeper is not None:
+                return
+            self._sweeper = threading.Thread(target=self._sweep_loop, name='expiry-sweeper', daemon=True)
+            self._sweeper.start()
+    
+    def _sweep_loop(self) -> None:
+        while True:
+            # Jittered so the workers of one host do not sweep in lockstep
+            time.sleep(Config.EXPIRY_SWEEP_INTERVAL * random.uniform(0.8, 1.2))
+            self.cleanup_old_data(Config.DATA_RETENTION_DAYS, time_budget=Config.EXPIRY_SWEEP_TIME_BUDGET)
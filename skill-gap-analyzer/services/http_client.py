@@ -0,0 +1,236 @@
+"""
+HTTP Client
+
+Shared outbound HTTP layer for the Gemini and NotebookLM integrations. Keeps a
+pooled keep-alive session per upstream host and retries 429/5xx responses and
+connection failures with jittered exponential backoff, honoring Retry-After.
+UpstreamClient wraps those calls in cassette replay, rate limiting, a circuit
+breaker and latency metrics, the same way for every upstream.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import Config
+from services.circuit_breaker import get_circuit_breaker
+from services.llm_cassette import get_llm_cassette
+from services.metrics import UPSTREAM_REQUEST_DURATION
+from services.rate_limiter import get_upstream_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header value
+
+    Args:
+        value: Header value, either delay-seconds or an HTTP-date
+
+    Returns:
+        Delay in seconds, or None if absent or unparseable
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class PooledHttpClient:
+    """Keep-alive session pool with retry and backoff"""
+
+    def __init__(self, pool_size: int = None, max_retries: int = None,
+                 backoff_base: float = None, backoff_max: float = None, retry_budget: float = None):
+        self.pool_size = pool_size if pool_size is not None else Config.HTTP_POOL_SIZE
+        self.max_retries = max_retries if max_retries is not None else Config.MAX_RETRIES
+        self.backoff_base = backoff_base if backoff_base is not None else Config.RETRY_BACKOFF_BASE
+        self.backoff_max = backoff_max if backoff_max is not None else Config.RETRY_BACKOFF_MAX
+        self.retry_budget = retry_budget if retry_budget is not None else Config.HTTP_RETRY_BUDGET
+
+        self._sessions: Dict[Tuple[str, str], requests.Session] = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def session_for(self, url: str) -> requests.Session:
+        """Return the pooled session for the URL's scheme and host"""
+        parts = urlsplit(url)
+        host_key = (parts.scheme, parts.netloc)
+
+        with self._lock:
+            # Sockets must not be shared with a parent process after a gunicorn fork
+            if os.getpid() != self._pid:
+                self._sessions = {}
+                self._pid = os.getpid()
+
+            session = self._sessions.get(host_key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount(f'{parts.scheme}://', adapter)
+                self._sessions[host_key] = session
+
+            return session
+
+    def post(self, url: str, headers: Dict = None, json: Dict = None, timeout: float = None) -> requests.Response:
+        """
+        POST with retries on 429/5xx responses and connection errors
+
+        Args:
+            url: Request URL
+            headers: Request headers
+            json: JSON request body
+            timeout: Per-attempt timeout in seconds
+
+        Returns:
+            The final response, which may still carry an error status once retries are exhausted
+
+        Raises:
+            requests.exceptions.RequestException: If the last attempt failed without a response
+        """
+        timeout = timeout if timeout is not None else Config.API_TIMEOUT
+        session = self.session_for(url)
+        deadline = time.monotonic() + self.retry_budget
+        attempt = 0
+
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                response = session.post(url, headers=headers, json=json, timeout=min(timeout, max(remaining, 0.1)))
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                delay = self._backoff_delay(attempt)
+                if attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                    raise
+                logger.warning(f"Request to {urlsplit(url).netloc} failed ({type(e).__name__}), retrying in {delay:.2f}s")
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    return response
+
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                delay = max(retry_after, self._backoff_delay(attempt)) if retry_after is not None else self._backoff_delay(attempt)
+                if attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                    return response
+                logger.warning(f"Request to {urlsplit(url).netloc} returned {response.status_code}, retrying in {delay:.2f}s")
+                response.close()
+
+            time.sleep(delay)
+            attempt += 1
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def close(self) -> None:
+        """Close all pooled sessions"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions = {}
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_http_client() -> PooledHttpClient:
+    """Return the process-wide shared HTTP client"""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = PooledHttpClient()
+    return _default_client
+
+
+class UpstreamClient:
+    """Guarded JSON POSTs to one LLM upstream"""
+
+    def __init__(self, name: str, display_name: str, rate_per_minute: float, http_client: PooledHttpClient = None):
+        self.name = name
+        self.display_name = display_name
+        self.http_client = http_client if http_client is not None else get_http_client()
+        self.circuit_breaker = get_circuit_breaker(name)
+        self.rate_limiter = get_upstream_rate_limiter(name, rate_per_minute)
+        self.cassette = get_llm_cassette()
+
+    def post_json(self, url: str, headers: Dict, payload: Dict, prompt: str, timeout: float = None) -> Optional[Dict]:
+        """
+        POST a prompt's request and return the decoded JSON response
+
+        Args:
+            url: Request URL
+            headers: Request headers
+            payload: JSON request body
+            prompt: Prompt the request was built from; keys cassette recordings
+            timeout: Per-attempt timeout in seconds
+
+        Returns:
+            Response data, or None if the call was skipped or failed
+        """
+        # Offline runs serve recorded responses instead of calling the API
+        if self.cassette.replaying:
+            return self.cassette.play(self.name, prompt)
+
+        # Shed instead of sending requests that would exceed the upstream quota
+        if not self.rate_limiter.acquire(max_wait=Config.UPSTREAM_RATE_LIMIT_MAX_WAIT):
+            logger.warning(f"{self.display_name} rate limit reached. Skipping API call.")
+            return None
+
+        # Skip the upstream entirely while it is known to be unhealthy
+        if not self.circuit_breaker.allow_request():
+            logger.info(f"{self.display_name} circuit breaker open. Skipping API call.")
+            return None
+
+        started = time.monotonic()
+        outcome = 'error'
+        try:
+            response = self.http_client.post(url, headers=headers, json=payload, timeout=timeout)
+
+            if response.status_code == 200:
+                outcome = 'success'
+                self.circuit_breaker.record_success(time.monotonic() - started)
+                response_data = response.json()
+                if self.cassette.recording:
+                    self.cassette.record(self.name, prompt, response_data, time.monotonic() - started)
+                return response_data
+            else:
+                if response.status_code == 429 or response.status_code >= 500:
+                    self.circuit_breaker.record_failure(f'HTTP {response.status_code}')
+                else:
+                    self.circuit_breaker.record_success(time.monotonic() - started)
+                logger.error(f"{self.display_name} API error: {response.status_code} - {response.text}")
+                return None
+
+        except requests.exceptions.Timeout:
+            outcome = 'timeout'
+            self.circuit_breaker.record_failure('timeout')
+            logger.error(f"{self.display_name} API request timed out")
+            return None
+        except Exception as e:
+            self.circuit_breaker.record_failure(type(e).__name__)
+            logger.error(f"{self.display_name} API call failed: {str(e)}")
+            return None
+        finally:
+            UPSTREAM_REQUEST_DURATION.observe(time.monotonic() - started, upstream=self.name, outcome=outcome)
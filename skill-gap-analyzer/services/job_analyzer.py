@@ -6,21 +6,29 @@ Integrates with Gemini API to parse job postings and extract structured skill re
 
 import json
 import logging
-import requests
 from typing import Dict, List, Optional
 from config import Config
+from services.analysis_cache import AnalysisCache, create_analysis_cache, posting_cache_key
+from services.http_client import UpstreamClient
+from services.metrics import FALLBACK_TOTAL
+from services.single_flight import SingleFlight
+from services.skill_taxonomy import taxonomy
 
 logger = logging.getLogger(__name__)
 
 class JobAnalyzer:
     """Service for analyzing job postings using Gemini API"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[AnalysisCache] = None):
         self.api_key = Config.GEMINI_API_KEY
         self.api_url = Config.GEMINI_API_URL
         self.timeout = Config.API_TIMEOUT
+        self.upstream = UpstreamClient('gemini', 'Gemini', Config.GEMINI_RATE_LIMIT_PER_MINUTE)
+        self.cache = cache if cache is not None else create_analysis_cache()
+        self.single_flight = SingleFlight('gemini')
+        self.cassette = self.upstream.cassette
         
-        if not self.api_key:
+        if not self.api_key and not self.cassette.replaying:
             logger.warning("Gemini API key not configured. Job analysis will use fallback methods.")
     
     def extract_job_skills(self, job_posting_text: str) -> Dict:
@@ -34,21 +42,35 @@ class JobAnalyzer:
             Dictionary containing extracted job information
         """
         try:
-            if not self.api_key:
+            if not self.api_key and not self.cassette.replaying:
                 return self._fallback_skill_extraction(job_posting_text)
             
-            prompt = self._build_job_analysis_prompt(job_posting_text)
-            response = self._call_gemini_api(prompt)
+            # Identical postings are analyzed once per cache lifetime
+            cache_key = posting_cache_key(job_posting_text)
+            cached_analysis = self.cache.get(cache_key)
+            if cached_analysis is not None:
+                return cached_analysis
             
-            if response:
-                return self._parse_gemini_response(response)
-            else:
-                return self._fallback_skill_extraction(job_posting_text)
+            # Concurrent requests for the same posting share one Gemini call
+            return self.single_flight.do(cache_key, self._analyze_with_gemini, job_posting_text, cache_key)
                 
         except Exception as e:
             logger.error(f"Error in job skill extraction: {str(e)}")
             return self._fallback_skill_extraction(job_posting_text)
     
+    def _analyze_with_gemini(self, job_posting_text: str, cache_key: str) -> Dict:
+        """Call Gemini for an uncached posting and populate the cache"""
+        prompt = self._build_job_analysis_prompt(job_posting_text)
+        response = self._call_gemini_api(prompt)
+        
+        if response:
+            job_analysis = self._parse_gemini_response(response)
+            if job_analysis != self._create_empty_analysis():
+                self.cache.set(cache_key, job_analysis)
+            return job_analysis
+        else:
+            return self._fallback_skill_extraction(job_posting_text)
+    
     def categorize_skills(self, skills_list: List[str]) -> Dict[str, List[str]]:
         """
         Categorize skills by technology domain
@@ -59,38 +81,13 @@ class JobAnalyzer:
         Returns:
             Dictionary with skills grouped by domain
         """
-        categories = {
-            'frontend': [],
-            'backend': [],
-            'ai_ml': [],
-            'devops': [],
-            'database': [],
-            'mobile': [],
-            'other': []
-        }
-        
-        # Skill categorization mappings
-        skill_mappings = {
-            'frontend': ['react', 'vue', 'angular', 'javascript', 'typescript', 'html', 'css', 'sass', 'tailwind'],
-            'backend': ['python', 'java', 'node.js', 'express', 'django', 'flask', 'spring', 'php', 'ruby'],
-            'ai_ml': ['machine learning', 'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'numpy', 'ai'],
-            'devops': ['docker', 'kubernetes', 'aws', 'azure', 'gcp', 'jenkins', 'terraform', 'ansible'],
-            'database': ['sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch'],
-            'mobile': ['react native', 'flutter', 'swift', 'kotlin', 'android', 'ios']
-        }
+        categories = {category: [] for category in taxonomy.categories}
+        categories.setdefault('other', [])
         
         for skill in skills_list:
-            skill_lower = skill.lower()
-            categorized = False
-            
-            for category, keywords in skill_mappings.items():
-                if any(keyword in skill_lower for keyword in keywords):
-                    categories[category].append(skill)
-                    categorized = True
-                    break
-            
-            if not categorized:
-                categories['other'].append(skill)
+            skill_info = taxonomy.resolve(skill)
+            category = skill_info.category if skill_info else 'other'
+            categories.get(category, categories['other']).append(skill)
         
         return categories
     
@@ -104,35 +101,12 @@ class JobAnalyzer:
         Returns:
             Estimated learning time in days
         """
-        # Basic difficulty estimation based on skill complexity
-        difficulty_map = {
-            # Frontend (easier to start)
-            'html': 7, 'css': 14, 'javascript': 30, 'react': 45, 'vue': 40, 'angular': 60,
-            
-            # Backend (moderate complexity)
-            'python': 30, 'java': 45, 'node.js': 35, 'django': 40, 'flask': 25, 'express': 30,
-            
-            # AI/ML (higher complexity)
-            'machine learning': 90, 'tensorflow': 60, 'pytorch': 60, 'data science': 75,
-            
-            # DevOps (moderate to high)
-            'docker': 20, 'kubernetes': 45, 'aws': 60, 'azure': 55, 'terraform': 35,
-            
-            # Database (moderate)
-            'sql': 25, 'mongodb': 30, 'postgresql': 35, 'redis': 20
-        }
+        skill_info = taxonomy.resolve(skill_name)
+        if skill_info and skill_info.difficulty_days:
+            return skill_info.difficulty_days
         
         skill_lower = skill_name.lower()
         
-        # Check for exact matches first
-        if skill_lower in difficulty_map:
-            return difficulty_map[skill_lower]
-        
-        # Check for partial matches
-        for known_skill, days in difficulty_map.items():
-            if known_skill in skill_lower or skill_lower in known_skill:
-                return days
-        
         # Default estimation based on skill name length and complexity indicators
         if any(word in skill_lower for word in ['advanced', 'senior', 'expert', 'architect']):
             return 60
@@ -174,41 +148,22 @@ class JobAnalyzer:
     
     def _call_gemini_api(self, prompt: str) -> Optional[Dict]:
         """Make API call to Gemini"""
-        try:
-            headers = {
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {self.api_key}'
-            }
-            
-            payload = {
-                'contents': [{
-                    'parts': [{'text': prompt}]
-                }],
-                'generationConfig': {
-                    'temperature': 0.1,
-                    'maxOutputTokens': 2048
-                }
+        headers = {
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {self.api_key}'
+        }
+        
+        payload = {
+            'contents': [{
+                'parts': [{'text': prompt}]
+            }],
+            'generationConfig': {
+                'temperature': 0.1,
+                'maxOutputTokens': 2048
             }
-            
-            response = requests.post(
-                self.api_url,
-                headers=headers,
-                json=payload,
-                timeout=self.timeout
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                logger.error(f"Gemini API error: {response.status_code} - {response.text}")
-                return None
-                
-        except requests.exceptions.Timeout:
-            logger.error("Gemini API request timed out")
-            return None
-        except Exception as e:
-            logger.error(f"Gemini API call failed: {str(e)}")
-            return None
+        }
+        
+        return self.upstream.post_json(self.api_url, headers, payload, prompt, timeout=self.timeout)
     
     def _parse_gemini_response(self, response: Dict) -> Dict:
         """Parse Gemini API response and extract job analysis"""
@@ -240,25 +195,18 @@ class JobAnalyzer:
     def _fallback_skill_extraction(self, job_text: str) -> Dict:
         """Fallback method for skill extraction when API is unavailable"""
         logger.info("Using fallback skill extraction method")
+        FALLBACK_TOTAL.inc(service='job_analyzer')
         
-        # Basic keyword-based skill extraction
-        common_skills = [
-            'python', 'java', 'javascript', 'react', 'node.js', 'sql', 'aws', 'docker',
-            'kubernetes', 'machine learning', 'tensorflow', 'django', 'flask', 'angular',
-            'vue', 'mongodb', 'postgresql', 'redis', 'git', 'linux', 'html', 'css'
+        # Keyword-based skill extraction in one pass over the posting
+        found_skills = [
+            {
+                'name': skill,
+                'priority': 'important',
+                'proficiency_required': 7
+            }
+            for skill in taxonomy.find_skills(job_text)
         ]
         
-        job_text_lower = job_text.lower()
-        found_skills = []
-        
-        for skill in common_skills:
-            if skill in job_text_lower:
-                found_skills.append({
-                    'name': skill,
-                    'priority': 'important',
-                    'proficiency_required': 7
-                })
-        
         return {
             'company_name': None,
             'position_title': 'Software Developer',
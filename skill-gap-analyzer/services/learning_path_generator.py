@@ -4,12 +4,16 @@ Learning Path Generator Service
 Integrates with NotebookLM to generate personalized learning roadmaps and course recommendations.
 """
 
+import hashlib
 import json
 import logging
-import requests
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from config import Config
+from services.http_client import UpstreamClient
+from services.metrics import FALLBACK_TOTAL
+from services.single_flight import SingleFlight
+from services.skill_taxonomy import taxonomy
 
 logger = logging.getLogger(__name__)
 
@@ -20,8 +24,11 @@ class LearningPathGenerator:
         self.notebooklm_api_key = Config.NOTEBOOKLM_API_KEY
         self.notebooklm_url = Config.NOTEBOOKLM_URL
         self.timeout = Config.API_TIMEOUT
+        self.upstream = UpstreamClient('notebooklm', 'NotebookLM', Config.NOTEBOOKLM_RATE_LIMIT_PER_MINUTE)
+        self.single_flight = SingleFlight('notebooklm')
+        self.cassette = self.upstream.cassette
         
-        if not self.notebooklm_api_key:
+        if not self.notebooklm_api_key and not self.cassette.replaying:
             logger.warning("NotebookLM API key not configured. Using fallback learning path generation.")
     
     def generate_path(self, skill_comparison: Dict) -> Dict:
@@ -41,7 +48,7 @@ class LearningPathGenerator:
                 return self._create_no_gaps_path()
             
             # Generate learning path using NotebookLM or fallback
-            if self.notebooklm_api_key:
+            if self.notebooklm_api_key or self.cassette.replaying:
                 learning_path = self._generate_with_notebooklm(missing_skills)
             else:
                 learning_path = self._generate_fallback_path(missing_skills)
@@ -65,7 +72,10 @@ class LearningPathGenerator:
         """Generate learning path using NotebookLM API"""
         try:
             prompt = self._build_learning_path_prompt(missing_skills)
-            response = self._call_notebooklm_api(prompt)
+            
+            # Identical skill gaps arriving together share one NotebookLM call
+            prompt_key = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+            response = self.single_flight.do(prompt_key, self._call_notebooklm_api, prompt)
             
             if response:
                 return self._parse_notebooklm_response(response, missing_skills)
@@ -79,6 +89,7 @@ class LearningPathGenerator:
     def _generate_fallback_path(self, missing_skills: List[Dict]) -> Dict:
         """Generate learning path using fallback logic"""
         logger.info("Using fallback learning path generation")
+        FALLBACK_TOTAL.inc(service='learning_path_generator')
         
         # Sort skills by dependency and impact
         ordered_skills = self._order_skills_by_dependency(missing_skills)
@@ -114,40 +125,24 @@ class LearningPathGenerator:
     
     def _order_skills_by_dependency(self, skills: List[Dict]) -> List[Dict]:
         """Order skills by learning dependency and impact"""
-        # Define skill dependencies
-        dependencies = {
-            'html': [],
-            'css': ['html'],
-            'javascript': ['html', 'css'],
-            'react': ['javascript'],
-            'vue': ['javascript'],
-            'angular': ['javascript'],
-            'node.js': ['javascript'],
-            'express': ['node.js'],
-            'python': [],
-            'django': ['python'],
-            'flask': ['python'],
-            'sql': [],
-            'mongodb': [],
-            'docker': [],
-            'kubernetes': ['docker'],
-            'aws': [],
-            'machine learning': ['python'],
-            'tensorflow': ['python', 'machine learning'],
-            'pytorch': ['python', 'machine learning']
-        }
+        # Prerequisites come from the shared taxonomy, keyed by canonical name
+        def canonical_name(skill):
+            return taxonomy.canonicalize(skill['skill_name']) or skill['skill_name'].lower()
+        
+        def prerequisites(skill):
+            skill_info = taxonomy.get(skill['skill_name'])
+            return skill_info.prerequisites if skill_info else ()
         
-        # Create dependency graph
-        skill_names = [skill['skill_name'].lower() for skill in skills]
+        skill_names = {canonical_name(skill) for skill in skills}
         ordered = []
+        ordered_names = set()
         remaining = skills.copy()
         
         while remaining:
             # Find skills with no unmet dependencies
             ready_skills = []
             for skill in remaining:
-                skill_deps = dependencies.get(skill['skill_name'].lower(), [])
-                if all(dep in [s['skill_name'].lower() for s in ordered] or dep not in skill_names for dep in skill_deps):
+                if all(dep in ordered_names or dep not in skill_names for dep in prerequisites(skill)):
                     ready_skills.append(skill)
             
             if not ready_skills:
@@ -163,6 +158,7 @@ class LearningPathGenerator:
             # Add the highest priority skill
             next_skill = ready_skills[0]
             ordered.append(next_skill)
+            ordered_names.add(canonical_name(next_skill))
             remaining.remove(next_skill)
         
         return ordered
@@ -179,68 +175,8 @@ class LearningPathGenerator:
         """Get course recommendations for a specific skill"""
         # This is a simplified version - in a real implementation,
         # this would integrate with course APIs (Udemy, Coursera, etc.)
-        
-        course_templates = {
-            'python': [
-                {
-                    'title': 'Complete Python Bootcamp',
-                    'provider': 'Udemy',
-                    'duration': '40 hours',
-                    'rating': 4.6,
-                    'price_inr': 3499,
-                    'language': 'English',
-                    'url': 'https://www.udemy.com/course/complete-python-bootcamp/',
-                    'is_free': False
-                },
-                {
-                    'title': 'Python for Everybody Specialization',
-                    'provider': 'Coursera',
-                    'duration': '32 hours',
-                    'rating': 4.8,
-                    'price_inr': 0,
-                    'language': 'English',
-                    'url': 'https://www.coursera.org/specializations/python',
-                    'is_free': True
-                }
-            ],
-            'javascript': [
-                {
-                    'title': 'The Complete JavaScript Course',
-                    'provider': 'Udemy',
-                    'duration': '69 hours',
-                    'rating': 4.7,
-                    'price_inr': 3999,
-                    'language': 'English',
-                    'url': 'https://www.udemy.com/course/the-complete-javascript-course/',
-                    'is_free': False
-                },
-                {
-                    'title': 'JavaScript Algorithms and Data Structures',
-                    'provider': 'freeCodeCamp',
-                    'duration': '300 hours',
-                    'rating': 4.9,
-                    'price_inr': 0,
-                    'language': 'English',
-                    'url': 'https://www.freecodecamp.org/learn/javascript-algorithms-and-data-structures/',
-                    'is_free': True
-                }
-            ],
-            'react': [
-                {
-                    'title': 'React - The Complete Guide',
-                    'provider': 'Udemy',
-                    'duration': '48 hours',
-                    'rating': 4.6,
-                    'price_inr': 4499,
-                    'language': 'English',
-                    'url': 'https://www.udemy.com/course/react-the-complete-guide-incl-redux/',
-                    'is_free': False
-                }
-            ]
-        }
-        
-        skill_lower = skill_name.lower()
-        courses = course_templates.get(skill_lower, [])
+        skill_info = taxonomy.get(skill_name)
+        courses = [dict(course) for course in skill_info.courses] if skill_info else []
         
         # If no specific courses found, create generic recommendations
         if not courses:
@@ -289,33 +225,16 @@ class LearningPathGenerator:
     
     def _get_learning_objectives(self, skill_name: str) -> List[str]:
         """Get learning objectives for a skill"""
-        objectives_map = {
-            'python': [
-                'Understand Python syntax and basic programming concepts',
-                'Work with data structures (lists, dictionaries, sets)',
-                'Handle file operations and error handling',
-                'Build simple applications and scripts'
-            ],
-            'javascript': [
-                'Master JavaScript fundamentals and ES6+ features',
-                'Understand DOM manipulation and event handling',
-                'Work with asynchronous programming (Promises, async/await)',
-                'Build interactive web applications'
-            ],
-            'react': [
-                'Understand React components and JSX',
-                'Master state management and props',
-                'Implement hooks and lifecycle methods',
-                'Build responsive single-page applications'
-            ]
-        }
+        skill_info = taxonomy.get(skill_name)
+        if skill_info and skill_info.learning_objectives:
+            return list(skill_info.learning_objectives)
         
-        return objectives_map.get(skill_name.lower(), [
+        return [
             f'Understand core concepts of {skill_name}',
             f'Apply {skill_name} in practical projects',
             f'Follow best practices and industry standards',
             f'Build portfolio projects using {skill_name}'
-        ])
+        ]
     
     def _get_completion_criteria(self, skill_name: str) -> List[str]:
         """Get completion criteria for a skill"""
@@ -403,37 +322,18 @@ class LearningPathGenerator:
     
     def _call_notebooklm_api(self, prompt: str) -> Optional[Dict]:
         """Make API call to NotebookLM"""
-        try:
-            headers = {
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {self.notebooklm_api_key}'
-            }
-            
-            payload = {
-                'query': prompt,
-                'research_depth': 'comprehensive',
-                'output_format': 'structured_json'
-            }
-            
-            response = requests.post(
-                self.notebooklm_url,
-                headers=headers,
-                json=payload,
-                timeout=self.timeout
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                logger.error(f"NotebookLM API error: {response.status_code} - {response.text}")
-                return None
-                
-        except requests.exceptions.Timeout:
-            logger.error("NotebookLM API request timed out")
-            return None
-        except Exception as e:
-            logger.error(f"NotebookLM API call failed: {str(e)}")
-            return None
+        headers = {
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {self.notebooklm_api_key}'
+        }
+        
+        payload = {
+            'query': prompt,
+            'research_depth': 'comprehensive',
+            'output_format': 'structured_json'
+        }
+        
+        return self.upstream.post_json(self.notebooklm_url, headers, payload, prompt, timeout=self.timeout)
     
     def _parse_notebooklm_response(self, response: Dict, missing_skills: List[Dict]) -> Dict:
         """Parse NotebookLM API response"""
@@ -0,0 +1,183 @@
+"""
+LLM Cassette
+
+Record/replay layer for Gemini and NotebookLM responses. In record mode every
+successful upstream response is appended to a JSON Lines cassette keyed by a
+hash of the service name and prompt. In replay mode responses are served from
+the cassette (optionally with their recorded latency) and upstream APIs are
+never called, so a corpus of postings can be re-run through the full pipeline
+offline and reproducibly.
+"""
+
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+MODES = ('off', 'record', 'replay')
+
+# Entries compressed together into one gzip member when recording to a .gz cassette
+GZIP_MEMBER_ENTRIES = 64
+
+
+def cassette_key(service: str, prompt: str) -> str:
+    """Stable key for one upstream request"""
+    return hashlib.sha256(f'{service}\0{prompt}'.encode('utf-8')).hexdigest()
+
+
+class LLMCassette:
+    """Records upstream LLM responses to, or replays them from, a JSON Lines file"""
+
+    def __init__(self, mode: str = None, path: str = None, replay_latency: bool = None):
+        mode = (mode if mode is not None else Config.LLM_CASSETTE_MODE).lower()
+        if mode not in MODES:
+            logger.error(f"Unknown LLM cassette mode '{mode}', disabling cassette")
+            mode = 'off'
+
+        self.mode = mode
+        self.path = path if path is not None else Config.LLM_CASSETTE_PATH
+        self.replay_latency = replay_latency if replay_latency is not None else Config.LLM_CASSETTE_REPLAY_LATENCY
+
+        self._entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._pending_lines: List[str] = []
+        self._flush_at_exit = False
+
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+        if self.mode == 'replay':
+            self._load()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == 'record'
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+
+    def _load(self) -> None:
+        """Read the cassette; later entries for the same key win"""
+        if not os.path.exists(self.path):
+            logger.warning(f"LLM cassette {self.path} not found; every replayed request will miss")
+            return
+
+        try:
+            opener = gzip.open if self.path.endswith('.gz') else open
+            with opener(self.path, 'rt', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                        self._entries[entry['key']] = entry
+                    except (ValueError, KeyError):
+                        logger.warning(f"Skipping malformed LLM cassette line {line_number}")
+            logger.info(f"Loaded {len(self._entries)} recorded LLM responses from {self.path}")
+        except Exception as e:
+            logger.error(f"Failed to load LLM cassette {self.path}: {str(e)}")
+
+    def play(self, service: str, prompt: str) -> Optional[Dict]:
+        """
+        Return the recorded response for a request
+
+        Args:
+            service: Upstream name ('gemini' or 'notebooklm')
+            prompt: Prompt sent to the upstream
+
+        Returns:
+            Recorded response body, or None if the request was never recorded
+        """
+        entry = self._entries.get(cassette_key(service, prompt))
+        if entry is None:
+            self.misses += 1
+            logger.warning(f"No recorded {service} response for this prompt; using fallback")
+            return None
+
+        self.hits += 1
+        if self.replay_latency:
+            time.sleep(entry.get('latency', 0))
+        return json.loads(json.dumps(entry['response']))
+
+    def record(self, service: str, prompt: str, response: Dict, latency: float) -> None:
+        """Append a successful upstream response to the cassette"""
+        entry = {
+            'key': cassette_key(service, prompt),
+            'service': service,
+            'latency': round(latency, 4),
+            'response': response
+        }
+        line = json.dumps(entry, separators=(',', ':'), sort_keys=True) + '\n'
+
+        try:
+            with self._lock:
+                if self.path.endswith('.gz'):
+                    # Compressing entries one by one would cost a gzip header per line and no shared dictionary
+                    self._pending_lines.append(line)
+                    if not self._flush_at_exit:
+                        atexit.register(self.flush)
+                        self._flush_at_exit = True
+                    if len(self._pending_lines) >= GZIP_MEMBER_ENTRIES:
+                        self._write_pending()
+                else:
+                    self._append(line.encode('utf-8'))
+                self.recorded += 1
+        except Exception as e:
+            logger.error(f"Failed to record LLM response: {str(e)}")
+
+    def flush(self) -> None:
+        """Write entries still buffered for a .gz cassette"""
+        try:
+            with self._lock:
+                self._write_pending()
+        except Exception as e:
+            logger.error(f"Failed to write buffered LLM responses: {str(e)}")
+
+    def _write_pending(self) -> None:
+        if self._pending_lines:
+            # Concatenated gzip members read back as one stream
+            self._append(gzip.compress(''.join(self._pending_lines).encode('utf-8')))
+            self._pending_lines = []
+
+    def _append(self, data: bytes) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # One write per line or member keeps them intact when several workers record at once
+        with open(self.path, 'ab') as f:
+            f.write(data)
+
+    def stats(self) -> Dict:
+        """Cassette usage counters for monitoring"""
+        return {
+            'mode': self.mode,
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'recorded': self.recorded,
+            'buffered': len(self._pending_lines)
+        }
+
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+
+def get_llm_cassette() -> LLMCassette:
+    """Return the process-wide cassette shared by the LLM services"""
+    global _cassette
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = LLMCassette()
+        return _cassette
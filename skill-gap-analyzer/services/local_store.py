@@ -0,0 +1,482 @@
+"""
+Local Store
+
+Bounded key-value store used by FirebaseService when Firebase is not
+configured or unavailable. Entries are evicted oldest first once the entry
+count or the approximate serialized size exceeds its limits, and entries
+written with a TTL (analyses) expire. A store can limit eviction and expiry
+to keys under given prefixes, so the fallback store only ever drops analyses
+and never user records or indexes. Eviction counters are exposed so fallback
+mode can be watched while it serves production traffic.
+
+Two backends share one interface: a per-process in-memory LRU store, and a
+SQLite database in WAL mode that every gunicorn worker on the host shares and
+that survives restarts. Both are safe to use from the threads of a gthread
+worker. Stored values are treated as immutable: update() callbacks build a new
+value instead of mutating the current one, so readers never see a value
+change underneath them.
+"""
+
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Expired entries are also swept in bulk at most this often (seconds)
+PURGE_INTERVAL = 60
+
+# Written entries are measured once this many are pending, or after MEASURE_INTERVAL seconds
+MEASURE_BATCH = 64
+MEASURE_INTERVAL = 1.0
+
+# Per-key locks serializing writers of a key; keys on different stripes never wait for each other
+LOCK_STRIPES = 64
+
+# Keys the FirebaseService fallback store may evict or expire; everything else is kept until deleted
+FALLBACK_EVICTABLE_PREFIXES = ('analyses/', 'job_analyses/', 'analysis_status/')
+
+
+def approximate_size(key: str, value: Any) -> int:
+    """Approximate footprint of an entry as its pickled length (several times cheaper than JSON encoding)"""
+    try:
+        return len(key) + len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return len(key) + len(json.dumps(value, separators=(',', ':'), default=str))
+
+
+class _Entry:
+    """Stored value with its accounted size and expiry"""
+
+    __slots__ = ('value', 'size', 'expires_at')
+
+    def __init__(self, value: Any, size: int, expires_at: Optional[float]):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+
+
+class InMemoryLocalStore:
+    """
+    Per-process store bounded by entry count and approximate bytes, with LRU and TTL eviction
+
+    Sizes of written entries are measured in batches, so a record updated many
+    times in quick succession is measured once. When evictable_prefixes is
+    given, only keys under those prefixes are evicted or expire.
+
+    Writers of a key hold its stripe lock, so an update() callback runs
+    without blocking writers of unrelated keys; the store-wide lock only
+    guards the LRU bookkeeping and is never held while a callback runs.
+    """
+
+    def __init__(self, max_entries: int = None, max_bytes: int = None, evictable_prefixes: Tuple[str, ...] = None):
+        self.max_entries = max_entries if max_entries is not None else Config.LOCAL_STORE_MAX_ENTRIES
+        self.max_bytes = max_bytes if max_bytes is not None else Config.LOCAL_STORE_MAX_BYTES
+        self.evictable_prefixes = evictable_prefixes
+
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+        # Evictable keys in LRU order; the entries themselves when every key is evictable
+        self._lru = self._entries if evictable_prefixes is None else OrderedDict()
+        self._bytes = 0
+        self._unmeasured = set()
+        self._lock = threading.RLock()
+        self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._last_purge = time.monotonic()
+        self._last_measure = time.monotonic()
+
+        self.evicted_lru = 0
+        self.evicted_expired = 0
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.evicted_expired += 1
+                return None
+            self._touch(key)
+            return entry.value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, evicting least recently used entries to stay within bounds
+
+        Args:
+            key: Storage key (Firebase-style path)
+            value: JSON-serializable value
+            ttl: Seconds until the entry expires; None keeps it until evicted
+        """
+        with self._stripe(key):
+            self._set(key, value, ttl)
+
+    def update(self, key: str, fn: Callable[[Optional[Any]], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Atomically replace the value for key with fn(current value)
+
+        fn receives None when the key is missing and must return a new value
+        rather than mutate the current one, which other threads may be reading.
+        Returning None deletes the key.
+
+        Returns:
+            The new value
+        """
+        with self._stripe(key):
+            value = fn(self.get(key))
+            if value is None:
+                self._delete(key)
+            else:
+                self._set(key, value, ttl)
+            return value
+
+    def delete(self, key: str) -> None:
+        with self._stripe(key):
+            self._delete(key)
+
+    def items(self, prefix: str = '') -> List[Tuple[str, Any]]:
+        """Snapshot of live entries whose key starts with prefix"""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                (key, entry.value) for key, entry in self._entries.items()
+                if key.startswith(prefix) and (entry.expires_at is None or entry.expires_at > now)
+            ]
+
+    def measure(self) -> None:
+        """Bring the byte accounting up to date with pending writes"""
+        with self._lock:
+            self._measure(time.monotonic())
+            self._evict()
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry; returns how many were removed"""
+        with self._lock:
+            return self._purge_expired(time.monotonic())
+
+    def stats(self) -> Dict:
+        """Size and eviction counters for monitoring"""
+        self.measure()
+        return {
+            'backend': 'memory',
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'evicted_lru': self.evicted_lru,
+            'evicted_expired': self.evicted_expired,
+            'rejected': self.rejected
+        }
+
+    def _stripe(self, key: str) -> threading.Lock:
+        return self._stripes[hash(key) % LOCK_STRIPES]
+
+    def _evictable(self, key: str) -> bool:
+        return self.evictable_prefixes is None or key.startswith(self.evictable_prefixes)
+
+    def _touch(self, key: str) -> None:
+        if key in self._lru:
+            self._lru.move_to_end(key)
+
+    def _set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        with self._lock:
+            now = time.monotonic()
+            entry = self._entries.get(key)
+            evictable = self._evictable(key)
+            expires_at = now + ttl if ttl is not None and evictable else None
+            if entry is None:
+                self._entries[key] = _Entry(value, 0, expires_at)
+                if evictable and self._lru is not self._entries:
+                    self._lru[key] = None
+            else:
+                entry.value = value
+                entry.expires_at = expires_at
+                self._touch(key)
+            self._unmeasured.add(key)
+
+            if len(self._unmeasured) >= MEASURE_BATCH or now - self._last_measure >= MEASURE_INTERVAL:
+                self._measure(now)
+            if now - self._last_purge >= PURGE_INTERVAL:
+                self._purge_expired(now)
+            self._evict()
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        if self._lru is not self._entries:
+            self._lru.pop(key, None)
+        self._bytes -= entry.size
+        self._unmeasured.discard(key)
+
+    def _measure(self, now: float) -> None:
+        for key in self._unmeasured:
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            size = approximate_size(key, entry.value)
+            self._bytes += size - entry.size
+            entry.size = size
+            if size > self.max_bytes:
+                self._remove(key)
+                self.rejected += 1
+                logger.warning(f"Local store entry {key} ({size} bytes) exceeds the store limit; dropped")
+        self._unmeasured.clear()
+        self._last_measure = now
+
+    def _purge_expired(self, now: float) -> int:
+        expired = [key for key, entry in self._entries.items() if entry.expires_at is not None and entry.expires_at <= now]
+        for key in expired:
+            self._remove(key)
+        self.evicted_expired += len(expired)
+        self._last_purge = now
+        return len(expired)
+
+    def _evict(self) -> None:
+        while self._lru and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._lru)))
+            self.evicted_lru += 1
+
+
+class SQLiteLocalStore:
+    """
+    Durable store in a SQLite database shared by all worker processes on the host
+
+    Values are stored as compact JSON. Entry and byte totals are maintained by
+    triggers, so bounds are enforced without scanning the table; past a bound
+    the least recently written evictable entries are evicted. Reads never write.
+    """
+
+    EVICT_BATCH = 64
+
+    def __init__(self, path: str, max_entries: int = None, max_bytes: int = None,
+                 evictable_prefixes: Tuple[str, ...] = None):
+        self.path = path
+        self.max_entries = max_entries if max_entries is not None else Config.LOCAL_STORE_MAX_ENTRIES
+        self.max_bytes = max_bytes if max_bytes is not None else Config.LOCAL_STORE_MAX_BYTES
+        self.evictable_prefixes = evictable_prefixes
+
+        self._local = threading.local()
+        self._last_purge = time.monotonic()
+
+        self.evicted_lru = 0
+        self.evicted_expired = 0
+        self.rejected = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS local_store (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL,
+                updated_at REAL NOT NULL,
+                evictable INTEGER NOT NULL DEFAULT 1
+            );
+            CREATE INDEX IF NOT EXISTS local_store_expires_at ON local_store (expires_at) WHERE expires_at IS NOT NULL;
+
+            CREATE TABLE IF NOT EXISTS local_store_totals (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                entries INTEGER NOT NULL,
+                bytes INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO local_store_totals (id, entries, bytes) VALUES (0, 0, 0);
+
+            CREATE TRIGGER IF NOT EXISTS local_store_insert AFTER INSERT ON local_store BEGIN
+                UPDATE local_store_totals SET entries = entries + 1, bytes = bytes + NEW.size WHERE id = 0;
+            END;
+            CREATE TRIGGER IF NOT EXISTS local_store_update AFTER UPDATE ON local_store BEGIN
+                UPDATE local_store_totals SET bytes = bytes + NEW.size - OLD.size WHERE id = 0;
+            END;
+            CREATE TRIGGER IF NOT EXISTS local_store_delete AFTER DELETE ON local_store BEGIN
+                UPDATE local_store_totals SET entries = entries - 1, bytes = bytes - OLD.size WHERE id = 0;
+            END;
+        ''')
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(local_store)')}
+        if 'evictable' not in columns:
+            # Databases created before eviction was limited to some keys: classify existing rows once
+            conn.execute('ALTER TABLE local_store ADD COLUMN evictable INTEGER NOT NULL DEFAULT 1')
+            if evictable_prefixes is not None:
+                for key, in conn.execute('SELECT key FROM local_store').fetchall():
+                    if not self._evictable(key):
+                        conn.execute('UPDATE local_store SET evictable = 0 WHERE key = ?', (key,))
+        conn.execute('DROP INDEX IF EXISTS local_store_updated_at')
+        conn.execute('CREATE INDEX IF NOT EXISTS local_store_evictable_updated_at '
+                     'ON local_store (updated_at) WHERE evictable = 1')
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def __len__(self) -> int:
+        return self._connection().execute('SELECT entries FROM local_store_totals WHERE id = 0').fetchone()[0]
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the value for key, or None if missing or expired"""
+        row = self._connection().execute(
+            'SELECT value FROM local_store WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)',
+            (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Same contract as InMemoryLocalStore.set, atomic across processes"""
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            self._write(conn, key, value, ttl)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        self._maybe_purge()
+
+    def update(self, key: str, fn: Callable[[Optional[Any]], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Atomically replace the value for key with fn(current value)
+
+        The read, fn and the write run in one write transaction, so concurrent
+        updates from other workers and threads are serialized rather than lost.
+        Each thread uses its own connection.
+        """
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT value FROM local_store WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)',
+                (key, time.time())
+            ).fetchone()
+            value = fn(json.loads(row[0]) if row else None)
+            if value is None:
+                conn.execute('DELETE FROM local_store WHERE key = ?', (key,))
+            else:
+                self._write(conn, key, value, ttl)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        self._maybe_purge()
+        return value
+
+    def delete(self, key: str) -> None:
+        self._connection().execute('DELETE FROM local_store WHERE key = ?', (key,))
+
+    def items(self, prefix: str = '') -> List[Tuple[str, Any]]:
+        """Live entries whose key starts with prefix, read with a primary key range scan"""
+        rows = self._connection().execute(
+            'SELECT key, value FROM local_store WHERE key >= ? AND key < ? AND (expires_at IS NULL OR expires_at > ?)',
+            (prefix, prefix + '\U0010ffff', time.time())
+        ).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def measure(self) -> None:
+        """Sizes are exact at write time; nothing to do"""
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry; returns how many were removed"""
+        removed = self._connection().execute(
+            'DELETE FROM local_store WHERE expires_at IS NOT NULL AND expires_at <= ?', (time.time(),)
+        ).rowcount
+        self.evicted_expired += removed
+        self._last_purge = time.monotonic()
+        return removed
+
+    def stats(self) -> Dict:
+        """Size and eviction counters for monitoring (eviction counts are per process)"""
+        entries, total_bytes = self._connection().execute(
+            'SELECT entries, bytes FROM local_store_totals WHERE id = 0').fetchone()
+        return {
+            'backend': 'sqlite',
+            'path': self.path,
+            'entries': entries,
+            'bytes': total_bytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'evicted_lru': self.evicted_lru,
+            'evicted_expired': self.evicted_expired,
+            'rejected': self.rejected
+        }
+
+    def _evictable(self, key: str) -> bool:
+        return self.evictable_prefixes is None or key.startswith(self.evictable_prefixes)
+
+    def _write(self, conn: sqlite3.Connection, key: str, value: Any, ttl: Optional[float]) -> None:
+        """Upsert one entry and evict past the bounds; caller holds the write transaction"""
+        encoded = json.dumps(value, separators=(',', ':'), default=str)
+        size = len(key) + len(encoded)
+        if size > self.max_bytes:
+            self.rejected += 1
+            logger.warning(f"Local store entry {key} ({size} bytes) exceeds the store limit; not stored")
+            return
+
+        now = time.time()
+        evictable = self._evictable(key)
+        conn.execute(
+            'INSERT INTO local_store (key, value, size, expires_at, updated_at, evictable) VALUES (?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET value = excluded.value, size = excluded.size, '
+            'expires_at = excluded.expires_at, updated_at = excluded.updated_at, evictable = excluded.evictable',
+            (key, encoded, size, now + ttl if ttl is not None and evictable else None, now, int(evictable))
+        )
+
+        while True:
+            entries, total_bytes = conn.execute('SELECT entries, bytes FROM local_store_totals WHERE id = 0').fetchone()
+            if entries <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            oldest = conn.execute(
+                'SELECT key FROM local_store WHERE evictable = 1 AND key != ? ORDER BY updated_at LIMIT ?',
+                (key, self.EVICT_BATCH)
+            ).fetchall()
+            if not oldest:
+                break
+            # Remove just enough of the oldest batch to get back within bounds
+            for (old_key,) in oldest:
+                conn.execute('DELETE FROM local_store WHERE key = ?', (old_key,))
+                self.evicted_lru += 1
+                entries, total_bytes = conn.execute('SELECT entries, bytes FROM local_store_totals WHERE id = 0').fetchone()
+                if entries <= self.max_entries and total_bytes <= self.max_bytes:
+                    break
+
+    def _maybe_purge(self) -> None:
+        if time.monotonic() - self._last_purge >= PURGE_INTERVAL:
+            try:
+                self.purge_expired()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to purge expired local store entries: {str(e)}")
+
+
+def create_local_store():
+    """Create the fallback store selected by LOCAL_STORE_BACKEND"""
+    if Config.LOCAL_STORE_BACKEND.lower() == 'sqlite':
+        try:
+            store = SQLiteLocalStore(Config.LOCAL_STORE_DB_PATH, evictable_prefixes=FALLBACK_EVICTABLE_PREFIXES)
+            logger.info(f"Local storage shared across workers via {Config.LOCAL_STORE_DB_PATH}")
+            return store
+        except Exception as e:
+            logger.error(f"Failed to open local store database, using in-process storage: {str(e)}")
+    return InMemoryLocalStore(evictable_prefixes=FALLBACK_EVICTABLE_PREFIXES)
@@ -0,0 +1,121 @@
+"""
+Request Profiler
+
+Opt-in deterministic profiling of individual requests in production. A request
+is profiled when it carries the profiling token (X-Profile-Token header or
+profile_token query parameter), or when it is picked by 1-in-N sampling. The
+resulting pstats data is kept in a bounded in-memory store and served by the
+admin endpoints. When neither a token nor a sample rate is configured the app
+does not install the profiling hooks at all.
+"""
+
+import cProfile
+import hmac
+import io
+import itertools
+import logging
+import marshal
+import pstats
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class _StoredStats:
+    """Adapter letting pstats.Stats load a stored stats dict"""
+
+    def __init__(self, stats: Dict):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+class RequestProfiler:
+    """Per-request cProfile sessions with a bounded profile store"""
+
+    def __init__(self, token: str = None, sample_rate: int = None, max_profiles: int = None):
+        self.token = token if token is not None else Config.PROFILING_TOKEN
+        self.sample_rate = sample_rate if sample_rate is not None else Config.PROFILE_SAMPLE_RATE
+        self.max_profiles = max_profiles if max_profiles is not None else Config.PROFILE_MAX_STORED
+
+        self._counter = itertools.count(1)
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token) or self.sample_rate > 0
+
+    def is_authorized(self, supplied_token: Optional[str]) -> bool:
+        """Constant-time check of a supplied profiling token"""
+        return bool(self.token) and bool(supplied_token) and hmac.compare_digest(supplied_token, self.token)
+
+    def should_profile(self, supplied_token: Optional[str]) -> bool:
+        """Decide whether to profile a request from its token or the sampling rate"""
+        if self.is_authorized(supplied_token):
+            return True
+        return self.sample_rate > 0 and next(self._counter) % self.sample_rate == 0
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """Begin profiling the current thread"""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Another profiler already owns this interpreter
+            logger.warning(f"Could not start request profiler: {str(e)}")
+            return None
+        return profile
+
+    def finish(self, profile: cProfile.Profile, metadata: Dict) -> str:
+        """
+        Stop profiling and store the result
+
+        Args:
+            profile: Profile returned by start()
+            metadata: Request details stored alongside the stats
+
+        Returns:
+            Profile identifier for the admin endpoint
+        """
+        profile.disable()
+        profile.create_stats()
+
+        profile_id = uuid.uuid4().hex
+        entry = dict(metadata, profile_id=profile_id, created_at=time.time(), stats=profile.stats)
+
+        with self._lock:
+            self._profiles[profile_id] = entry
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+        return profile_id
+
+    def list_profiles(self) -> List[Dict]:
+        """Metadata of stored profiles, newest first"""
+        with self._lock:
+            entries = list(self._profiles.values())
+        return [{key: value for key, value in entry.items() if key != 'stats'} for entry in reversed(entries)]
+
+    def get_pstats(self, profile_id: str) -> Optional[bytes]:
+        """Stored profile in pstats (marshal) format, loadable with pstats.Stats(path)"""
+        entry = self._profiles.get(profile_id)
+        return marshal.dumps(entry['stats']) if entry else None
+
+    def get_text_report(self, profile_id: str, sort_by: str = 'cumulative', limit: int = 50) -> Optional[str]:
+        """Human-readable pstats report of a stored profile"""
+        entry = self._profiles.get(profile_id)
+        if entry is None:
+            return None
+
+        output = io.StringIO()
+        stats = pstats.Stats(_StoredStats(dict(entry['stats'])), stream=output)
+        stats.sort_stats(sort_by).print_stats(limit)
+        return output.getvalue()
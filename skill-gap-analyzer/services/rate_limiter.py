@@ -0,0 +1,251 @@
+"""
+Rate Limiter
+
+Token-bucket rate limiting for inbound API requests (per client) and outbound
+calls to the Gemini and NotebookLM quotas. Buckets live in process memory by
+default, or in a local SQLite file so every gunicorn worker on the host shares
+one budget.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def refill_tokens(tokens: float, updated_at: float, now: float, rate_per_second: float, capacity: float) -> float:
+    """Return the bucket level after refilling for the time elapsed since updated_at"""
+    return min(capacity, tokens + max(0.0, now - updated_at) * rate_per_second)
+
+
+class InMemoryRateLimitBackend:
+    """Per-process token buckets; least recently used buckets are dropped past max_keys"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, key: str, rate_per_second: float, capacity: float, cost: float = 1.0) -> Tuple[bool, float]:
+        """
+        Take tokens from a bucket if available
+
+        Args:
+            key: Bucket identifier
+            rate_per_second: Refill rate
+            capacity: Bucket size (burst)
+            cost: Tokens needed
+
+        Returns:
+            Tuple of (allowed, seconds until enough tokens are available)
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = refill_tokens(tokens, updated_at, now, rate_per_second, capacity)
+
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        wait = 0.0 if allowed else (cost - tokens) / rate_per_second
+        return allowed, wait
+
+
+class SQLiteRateLimitBackend:
+    """
+    Token buckets in a local SQLite file shared by all worker processes on the host
+
+    Each row records when its bucket will be full again; a bucket that is
+    full behaves exactly like a missing row, so rows past that time are
+    pruned every prune_interval seconds to keep the table bounded by the
+    number of recently active keys.
+    """
+
+    def __init__(self, path: str, prune_interval: float = 60.0):
+        self.path = path
+        self.prune_interval = prune_interval
+        self._next_prune = 0.0
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS rate_limit_buckets ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, '
+                'full_at REAL NOT NULL DEFAULT 0)'
+            )
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(rate_limit_buckets)')}
+            if 'full_at' not in columns:
+                # Tables created before pruning: existing rows are pruned on the first pass
+                conn.execute('ALTER TABLE rate_limit_buckets ADD COLUMN full_at REAL NOT NULL DEFAULT 0')
+            conn.execute('CREATE INDEX IF NOT EXISTS rate_limit_buckets_full_at ON rate_limit_buckets (full_at)')
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def try_acquire(self, key: str, rate_per_second: float, capacity: float, cost: float = 1.0) -> Tuple[bool, float]:
+        """Same contract as InMemoryRateLimitBackend.try_acquire, atomic across processes"""
+        conn = self._connection()
+        now = time.time()
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?', (key,)).fetchone()
+            tokens = refill_tokens(row[0], row[1], now, rate_per_second, capacity) if row else capacity
+
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+
+            conn.execute(
+                'INSERT INTO rate_limit_buckets (key, tokens, updated_at, full_at) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at, '
+                'full_at = excluded.full_at',
+                (key, tokens, now, now + (capacity - tokens) / rate_per_second)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        if now >= self._next_prune:
+            self._prune(conn, now)
+
+        wait = 0.0 if allowed else (cost - tokens) / rate_per_second
+        return allowed, wait
+
+    def _prune(self, conn: sqlite3.Connection, now: float) -> None:
+        """Delete buckets that have refilled completely since their last use"""
+        # Per process; workers pruning the same rows at the same time is harmless
+        self._next_prune = now + self.prune_interval
+        try:
+            conn.execute('DELETE FROM rate_limit_buckets WHERE full_at <= ?', (now,))
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to prune rate limit buckets: {str(e)}")
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter allowing rate_per_minute requests per key with bursts up to burst
+
+    A rate of 0 or less disables the limiter: every request is allowed.
+    """
+
+    def __init__(self, name: str, rate_per_minute: float, burst: float, backend=None):
+        self.name = name
+        self.enabled = rate_per_minute > 0
+        if not self.enabled:
+            logger.info(f"Rate limiter '{name}' disabled (rate {rate_per_minute} per minute)")
+        self.rate_per_second = max(rate_per_minute, 0) / 60.0
+        self.capacity = max(1.0, float(burst))
+        self.backend = backend if backend is not None else get_rate_limit_backend()
+
+        self.allowed = 0
+        self.limited = 0
+
+    def check(self, key: str = '') -> Tuple[bool, float]:
+        """
+        Consume one token for key without waiting
+
+        Returns:
+            Tuple of (allowed, retry_after_seconds)
+        """
+        if not self.enabled:
+            self.allowed += 1
+            return True, 0.0
+
+        try:
+            allowed, wait = self.backend.try_acquire(f'{self.name}:{key}', self.rate_per_second, self.capacity)
+        except Exception as e:
+            # Limiter storage problems must not take the endpoint down with them
+            logger.error(f"Rate limiter '{self.name}' backend error: {str(e)}")
+            return True, 0.0
+
+        if allowed:
+            self.allowed += 1
+        else:
+            self.limited += 1
+        return allowed, wait
+
+    def acquire(self, key: str = '', max_wait: float = 0) -> bool:
+        """
+        Consume one token, queueing up to max_wait seconds for the bucket to refill
+
+        Returns:
+            False if the request should be shed instead of sent
+        """
+        deadline = time.monotonic() + max_wait
+        while True:
+            allowed, wait = self.check(key)
+            if allowed:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def stats(self) -> Dict:
+        """Allowed/limited counters for monitoring"""
+        return {
+            'enabled': self.enabled,
+            'rate_per_minute': round(self.rate_per_second * 60, 2),
+            'burst': self.capacity,
+            'allowed': self.allowed,
+            'limited': self.limited
+        }
+
+
+_backend = None
+_backend_lock = threading.Lock()
+_upstream_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_rate_limit_backend():
+    """Return the process-wide bucket store selected by RATE_LIMIT_BACKEND"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if Config.RATE_LIMIT_BACKEND.lower() == 'sqlite':
+                try:
+                    _backend = SQLiteRateLimitBackend(Config.RATE_LIMIT_DB_PATH)
+                    logger.info(f"Rate limits shared across workers via {Config.RATE_LIMIT_DB_PATH}")
+                except Exception as e:
+                    logger.error(f"Failed to open rate limit database, using in-process buckets: {str(e)}")
+            if _backend is None:
+                _backend = InMemoryRateLimitBackend()
+        return _backend
+
+
+def get_upstream_rate_limiter(name: str, rate_per_minute: float) -> RateLimiter:
+    """Return the shared outbound limiter for an upstream API quota"""
+    with _backend_lock:
+        limiter = _upstream_limiters.get(name)
+    if limiter is None:
+        limiter = RateLimiter(f'upstream:{name}', rate_per_minute, Config.UPSTREAM_RATE_LIMIT_BURST)
+        with _backend_lock:
+            limiter = _upstream_limiters.setdefault(name, limiter)
+    return limiter
+
+
+def upstream_rate_limiter_stats() -> Dict[str, Dict]:
+    """Snapshot of every outbound limiter, keyed by upstream name"""
+    with _backend_lock:
+        limiters = dict(_upstream_limiters)
+    return {name: limiter.stats() for name, limiter in limiters.items()}
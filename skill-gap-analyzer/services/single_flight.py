@@ -0,0 +1,100 @@
+"""
+Single Flight
+
+Coalesces concurrent identical upstream requests. The first caller for a key
+(the leader) does the work; callers arriving while it is in flight wait for
+and share its result or its exception instead of issuing their own request.
+"""
+
+import copy
+import logging
+import threading
+from typing import Any, Callable, Dict
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlightTimeout(Exception):
+    """Raised to a waiting caller when the in-flight request takes too long"""
+
+
+class _Call:
+    """One in-flight request shared by its leader and waiters"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Per-process in-flight request deduplication keyed by normalized input"""
+
+    def __init__(self, name: str, wait_timeout: float = None):
+        self.name = name
+        self.wait_timeout = wait_timeout if wait_timeout is not None else Config.SINGLE_FLIGHT_WAIT_TIMEOUT
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+        self.leaders = 0
+        self.coalesced = 0
+        self.timeouts = 0
+
+    def do(self, key: str, fn: Callable, *args) -> Any:
+        """
+        Run fn(*args) once for all concurrent callers with the same key
+
+        Args:
+            key: Normalized request key
+            fn: Function performing the upstream request
+            *args: Arguments passed to fn
+
+        Returns:
+            fn's result; waiters receive a deep copy so callers never share mutable state
+
+        Raises:
+            SingleFlightTimeout: If a waiter gives up before the leader finishes
+            Exception: Whatever fn raised, re-raised to the leader and every waiter
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self.leaders += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if leader:
+            try:
+                call.result = fn(*args)
+                return call.result
+            except Exception as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if not call.done.wait(self.wait_timeout):
+            self.timeouts += 1
+            raise SingleFlightTimeout(f"Timed out after {self.wait_timeout}s waiting for in-flight {self.name} request")
+
+        if call.error is not None:
+            raise call.error
+
+        return copy.deepcopy(call.result)
+
+    def stats(self) -> Dict:
+        """Leader/coalesced counters for monitoring"""
+        return {
+            'in_flight': len(self._calls),
+            'leaders': self.leaders,
+            'coalesced': self.coalesced,
+            'timeouts': self.timeouts
+        }
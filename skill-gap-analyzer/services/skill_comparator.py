@@ -5,36 +5,54 @@ Compares user skills against job requirements and calculates skill gaps.
 """
 
 import logging
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
+from services.skill_taxonomy import taxonomy
 
 logger = logging.getLogger(__name__)
 
+
+class UserSkillIndex:
+    """
+    A user's skills normalized once, reusable across any number of postings
+    
+    Skill names match case-insensitively; when a name is listed more than
+    once, the last entry wins.
+    """
+    
+    __slots__ = ('skills',)
+    
+    def __init__(self, user_skills: List[Dict]):
+        self.skills = {skill['name'].lower(): skill for skill in user_skills}
+    
+    def get(self, skill_name: str) -> Optional[Dict]:
+        """The user's entry for a skill, or None if they do not list it"""
+        return self.skills.get(skill_name.lower())
+
+
 class SkillComparator:
     """Service for comparing user skills with job requirements"""
     
     def __init__(self):
         pass
     
-    def compare_skills(self, user_skills: List[Dict], job_analysis: Dict) -> Dict:
+    def compare_skills(self, user_skills: Union[List[Dict], UserSkillIndex], job_analysis: Dict) -> Dict:
         """
         Compare user skills against job requirements
         
         Args:
-            user_skills: List of user skills with proficiency levels
+            user_skills: List of user skills with proficiency levels, or a
+                UserSkillIndex prepared once to compare a user against many postings
             job_analysis: Job analysis result from JobAnalyzer
             
         Returns:
             Dictionary containing skill comparison results
         """
         try:
-            job_skills = job_analysis.get('required_skills', [])
-            
-            # Calculate confidence score
-            confidence_score = self.calculate_confidence_score(user_skills, job_skills)
-            
-            # Identify skill gaps
-            missing_skills = self.identify_skill_gaps(user_skills, job_skills)
+            now = datetime.now()
+            confidence_score, missing_skills, skill_matches = self._compare(
+                self._index(user_skills), job_analysis.get('required_skills', []), now
+            )
             
             # Calculate learning time estimates
             total_learning_time = sum(skill.get('learning_time_days', 0) for skill in missing_skills)
@@ -47,15 +65,15 @@ class SkillComparator:
                 'readiness_status': readiness_status,
                 'missing_skills': missing_skills,
                 'total_learning_time_days': total_learning_time,
-                'skill_matches': self._find_skill_matches(user_skills, job_skills),
-                'analysis_timestamp': datetime.now().isoformat()
+                'skill_matches': skill_matches,
+                'analysis_timestamp': now.isoformat()
             }
             
         except Exception as e:
             logger.error(f"Error in skill comparison: {str(e)}")
             return self._create_empty_comparison()
     
-    def calculate_confidence_score(self, user_skills: List[Dict], job_skills: List[Dict]) -> int:
+    def calculate_confidence_score(self, user_skills: Union[List[Dict], UserSkillIndex], job_skills: List[Dict]) -> int:
         """
         Calculate confidence score (0-100%) based on skill match
         
@@ -66,39 +84,9 @@ class SkillComparator:
         Returns:
             Confidence score as integer percentage
         """
-        if not job_skills:
-            return 100  # No requirements means 100% match
-        
-        # Create user skills lookup
-        user_skill_map = {skill['name'].lower(): skill.get('proficiency_level', 5) for skill in user_skills}
-        
-        total_weight = 0
-        matched_weight = 0
-        
-        for job_skill in job_skills:
-            skill_name = job_skill['name'].lower()
-            required_proficiency = job_skill.get('proficiency_required', 7)
-            priority = job_skill.get('priority', 'important')
-            
-            # Weight based on priority
-            weight = self._get_priority_weight(priority)
-            total_weight += weight
-            
-            # Check if user has this skill
-            if skill_name in user_skill_map:
-                user_proficiency = user_skill_map[skill_name]
-                
-                # Calculate match percentage based on proficiency gap
-                proficiency_match = min(1.0, user_proficiency / required_proficiency)
-                matched_weight += weight * proficiency_match
-        
-        if total_weight == 0:
-            return 100
-        
-        confidence_percentage = (matched_weight / total_weight) * 100
-        return max(0, min(100, int(confidence_percentage)))
+        return self._compare(self._index(user_skills), job_skills, datetime.now())[0]
     
-    def identify_skill_gaps(self, user_skills: List[Dict], job_skills: List[Dict]) -> List[Dict]:
+    def identify_skill_gaps(self, user_skills: Union[List[Dict], UserSkillIndex], job_skills: List[Dict]) -> List[Dict]:
         """
         Identify missing or insufficient skills
         
@@ -109,21 +97,56 @@ class SkillComparator:
         Returns:
             List of missing skills with learning estimates
         """
-        user_skill_map = {skill['name'].lower(): skill.get('proficiency_level', 0) for skill in user_skills}
+        return self._compare(self._index(user_skills), job_skills, datetime.now())[1]
+    
+    def _index(self, user_skills: Union[List[Dict], UserSkillIndex]) -> UserSkillIndex:
+        return user_skills if isinstance(user_skills, UserSkillIndex) else UserSkillIndex(user_skills)
+    
+    def _compare(self, index: UserSkillIndex, job_skills: List[Dict], now: datetime) -> Tuple[int, List[Dict], List[Dict]]:
+        """
+        Score the match, collect gaps and collect matches in one walk over the job skills
+        
+        Returns:
+            Confidence score, prioritized missing skills and skill matches
+        """
+        total_weight = 0
+        matched_weight = 0
         missing_skills = []
+        skill_matches = []
+        completion_dates = {}  # by learning time; formatting dates dominates otherwise
         
         for job_skill in job_skills:
             skill_name = job_skill['name']
-            skill_name_lower = skill_name.lower()
             required_proficiency = job_skill.get('proficiency_required', 7)
             priority = job_skill.get('priority', 'important')
             
-            user_proficiency = user_skill_map.get(skill_name_lower, 0)
+            # Weight based on priority
+            weight = self._get_priority_weight(priority)
+            total_weight += weight
+            
+            user_skill = index.get(skill_name)
+            if user_skill is not None:
+                # A listed skill without a level counts as 5 towards confidence, as 0 for gaps and matches
+                proficiency_match = min(1.0, user_skill.get('proficiency_level', 5) / required_proficiency)
+                matched_weight += weight * proficiency_match
+                
+                user_proficiency = user_skill.get('proficiency_level', 0)
+                skill_matches.append({
+                    'skill_name': skill_name,
+                    'user_proficiency': user_proficiency,
+                    'required_proficiency': required_proficiency,
+                    'match_percentage': min(100, int((user_proficiency / required_proficiency) * 100))
+                })
+            else:
+                user_proficiency = 0
             
             # Check if skill is missing or insufficient
             if user_proficiency < required_proficiency:
                 proficiency_gap = required_proficiency - user_proficiency
                 learning_time = self._estimate_learning_time(skill_name, proficiency_gap)
+                completion_date = completion_dates.get(learning_time)
+                if completion_date is None:
+                    completion_date = completion_dates[learning_time] = self._calculate_completion_date(learning_time, now)
                 
                 missing_skills.append({
                     'skill_name': skill_name,
@@ -133,11 +156,17 @@ class SkillComparator:
                     'priority': priority,
                     'impact_level': self._determine_impact_level(priority, proficiency_gap),
                     'learning_time_days': learning_time,
-                    'estimated_completion_date': self._calculate_completion_date(learning_time)
+                    'estimated_completion_date': completion_date
                 })
         
+        if total_weight == 0:
+            confidence_score = 100  # No requirements means 100% match
+        else:
+            confidence_percentage = (matched_weight / total_weight) * 100
+            confidence_score = max(0, min(100, int(confidence_percentage)))
+        
         # Sort by impact level and priority
-        return self.prioritize_missing_skills(missing_skills)
+        return confidence_score, self.prioritize_missing_skills(missing_skills), skill_matches
     
     def prioritize_missing_skills(self, missing_skills: List[Dict]) -> List[Dict]:
         """
@@ -189,35 +218,9 @@ class SkillComparator:
         Returns:
             Estimated learning time in days
         """
-        # Base learning time per proficiency point
-        base_days_per_point = {
-            # Frontend technologies
-            'html': 2, 'css': 3, 'javascript': 5, 'react': 7, 'vue': 6, 'angular': 8,
-            
-            # Backend technologies
-            'python': 5, 'java': 7, 'node.js': 6, 'django': 6, 'flask': 4, 'express': 5,
-            
-            # AI/ML (more complex)
-            'machine learning': 12, 'tensorflow': 10, 'pytorch': 10, 'data science': 10,
-            
-            # DevOps
-            'docker': 4, 'kubernetes': 8, 'aws': 10, 'azure': 9, 'terraform': 6,
-            
-            # Database
-            'sql': 4, 'mongodb': 5, 'postgresql': 6, 'redis': 3
-        }
-        
-        skill_lower = skill_name.lower()
-        
-        # Find base learning time
-        base_time = base_days_per_point.get(skill_lower, 5)  # Default 5 days per point
-        
-        # Check for partial matches
-        if base_time == 5:  # Default case, try partial matching
-            for known_skill, time in base_days_per_point.items():
-                if known_skill in skill_lower or skill_lower in known_skill:
-                    base_time = time
-                    break
+        # Base learning time per proficiency point (default 5 days per point)
+        skill_info = taxonomy.resolve(skill_name)
+        base_time = skill_info.days_per_point if skill_info and skill_info.days_per_point else 5
         
         # Calculate total time with proficiency gap
         total_time = base_time * proficiency_gap
@@ -225,29 +228,11 @@ class SkillComparator:
         # Apply realistic bounds (minimum 1 day, maximum 90 days per skill)
         return max(1, min(90, total_time))
     
-    def _calculate_completion_date(self, learning_time_days: int) -> str:
+    def _calculate_completion_date(self, learning_time_days: int, now: Optional[datetime] = None) -> str:
         """Calculate estimated completion date"""
-        completion_date = datetime.now() + timedelta(days=learning_time_days)
+        completion_date = (now or datetime.now()) + timedelta(days=learning_time_days)
         return completion_date.strftime('%Y-%m-%d')
     
-    def _find_skill_matches(self, user_skills: List[Dict], job_skills: List[Dict]) -> List[Dict]:
-        """Find skills that match between user and job requirements"""
-        user_skill_map = {skill['name'].lower(): skill for skill in user_skills}
-        matches = []
-        
-        for job_skill in job_skills:
-            skill_name_lower = job_skill['name'].lower()
-            if skill_name_lower in user_skill_map:
-                user_skill = user_skill_map[skill_name_lower]
-                matches.append({
-                    'skill_name': job_skill['name'],
-                    'user_proficiency': user_skill.get('proficiency_level', 0),
-                    'required_proficiency': job_skill.get('proficiency_required', 7),
-                    'match_percentage': min(100, int((user_skill.get('proficiency_level', 0) / job_skill.get('proficiency_required', 7)) * 100))
-                })
-        
-        return matches
-    
     def _determine_readiness_status(self, confidence_score: int) -> str:
         """Determine job readiness status based on confidence score"""
         if confidence_score >= 80:
@@ -0,0 +1,151 @@
+"""
+Skill Matcher
+
+Aho-Corasick automaton that finds every known skill term in a block of text
+in a single pass, with word-boundary awareness so "java" does not match
+inside "javascript" and "sql" does not match inside "postgresql".
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Characters that continue a token ("c" must not match inside "c++" or "c#")
+WORD_EXTRA_CHARS = frozenset('+#_')
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch in WORD_EXTRA_CHARS
+
+
+class SkillMatcher:
+    """Multi-pattern matcher built once over a term -> canonical skill mapping"""
+
+    def __init__(self, terms: Dict[str, str]):
+        """
+        Compile the automaton
+
+        Args:
+            terms: Mapping of lowercase skill term or alias to canonical skill name
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, str]] = [None]
+        self._dict_link: List[int] = [0]
+
+        for term, canonical in terms.items():
+            self._add_term(self.normalize(term), canonical)
+
+        self._build_links()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Lowercase text and collapse whitespace runs so multi-word terms line up"""
+        return WHITESPACE_PATTERN.sub(' ', text.lower())
+
+    def _add_term(self, term: str, canonical: str) -> None:
+        if not term:
+            return
+
+        state = 0
+        for ch in term:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+                self._dict_link.append(0)
+            state = next_state
+
+        self._output[state] = (len(term), canonical)
+
+    def _build_links(self) -> None:
+        """Breadth-first construction of failure and dictionary-suffix links"""
+        queue = list(self._goto[0].values())
+        head = 0
+
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[next_state] = target if target != next_state else 0
+
+                fail_state = self._fail[next_state]
+                self._dict_link[next_state] = fail_state if self._output[fail_state] else self._dict_link[fail_state]
+
+    def find_matches(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Find non-overlapping skill mentions, preferring the leftmost-longest term
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            List of (start, end, canonical_name) tuples in text order
+        """
+        text = self.normalize(text)
+        text_length = len(text)
+        goto, fail, output, dict_link = self._goto, self._fail, self._output, self._dict_link
+
+        candidates = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+
+            node = state if output[state] else dict_link[state]
+            while node:
+                length, canonical = output[node]
+                start = i - length + 1
+                if self._is_boundary(text, start, i + 1, text_length):
+                    candidates.append((start, i + 1, canonical))
+                node = dict_link[node]
+
+        # Leftmost-longest selection so "react native" wins over "react"
+        candidates.sort(key=lambda match: (match[0], match[0] - match[1]))
+        matches = []
+        last_end = 0
+        for start, end, canonical in candidates:
+            if start >= last_end:
+                matches.append((start, end, canonical))
+                last_end = end
+
+        return matches
+
+    def find_skills(self, text: str) -> List[str]:
+        """Return canonical skill names mentioned in text, in order of first appearance"""
+        seen = {}
+        for _, _, canonical in self.find_matches(text):
+            seen.setdefault(canonical, None)
+        return list(seen)
+
+    @staticmethod
+    def _is_boundary(text: str, start: int, end: int, text_length: int) -> bool:
+        if start > 0:
+            before = text[start - 1]
+            if _is_word_char(before) and _is_word_char(text[start]):
+                return False
+            # "js" inside "node.js"
+            if before == '.' and start > 1 and text[start - 2].isalnum():
+                return False
+
+        if end < text_length:
+            after = text[end]
+            if _is_word_char(after) and _is_word_char(text[end - 1]):
+                return False
+            # "node" inside "node.js"
+            if after == '.' and end + 1 < text_length and text[end + 1].isalnum():
+                return False
+
+        return True
@@ -0,0 +1,144 @@
+"""
+Skill Taxonomy
+
+Single source of skill knowledge shared by all services: canonical names,
+aliases, technology category, learning difficulty, prerequisites, course
+templates and learning objectives. Loaded once from data/skill_taxonomy.json
+and frozen at import.
+"""
+
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from services.skill_matcher import SkillMatcher
+
+logger = logging.getLogger(__name__)
+
+TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'skill_taxonomy.json')
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+@dataclass(frozen=True)
+class SkillInfo:
+    """Immutable taxonomy entry for one canonical skill"""
+    name: str
+    category: str
+    aliases: Tuple[str, ...] = ()
+    difficulty_days: Optional[int] = None
+    days_per_point: Optional[int] = None
+    prerequisites: Tuple[str, ...] = ()
+    courses: Tuple[Mapping, ...] = ()
+    learning_objectives: Tuple[str, ...] = ()
+    ambiguous: bool = False
+
+
+def normalize_skill_name(skill_name: str) -> str:
+    """Lowercase a skill name and collapse whitespace for lookups"""
+    return WHITESPACE_PATTERN.sub(' ', (skill_name or '').lower()).strip()
+
+
+class SkillTaxonomy:
+    """Read-only skill index with O(1) canonicalization and lookup"""
+
+    def __init__(self, categories: List[str], skills: List[SkillInfo]):
+        self.categories = tuple(categories)
+
+        skills_by_name = {}
+        term_index = {}
+        for skill in skills:
+            skills_by_name[skill.name] = skill
+            term_index[skill.name] = skill.name
+            for alias in skill.aliases:
+                term_index.setdefault(normalize_skill_name(alias), skill.name)
+
+        self._skills: Mapping[str, SkillInfo] = MappingProxyType(skills_by_name)
+        self._terms: Mapping[str, str] = MappingProxyType(term_index)
+
+        # Names like "express" or "swift" are common English words; only their
+        # aliases ("express.js") are trusted when scanning free text
+        posting_terms = {
+            term: canonical for term, canonical in term_index.items()
+            if not (term == canonical and skills_by_name[canonical].ambiguous)
+        }
+        self._name_matcher = SkillMatcher(term_index)
+        self._posting_matcher = SkillMatcher(posting_terms)
+
+    @classmethod
+    def load(cls, path: str = TAXONOMY_PATH) -> 'SkillTaxonomy':
+        """
+        Load the taxonomy from its JSON data file
+
+        Args:
+            path: Path to the taxonomy data file
+
+        Returns:
+            Frozen SkillTaxonomy instance
+        """
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+
+        skills = []
+        for name, entry in data['skills'].items():
+            skills.append(SkillInfo(
+                name=normalize_skill_name(name),
+                category=entry.get('category', 'other'),
+                aliases=tuple(entry.get('aliases', [])),
+                difficulty_days=entry.get('difficulty_days'),
+                days_per_point=entry.get('days_per_point'),
+                prerequisites=tuple(normalize_skill_name(p) for p in entry.get('prerequisites', [])),
+                courses=tuple(MappingProxyType(dict(course)) for course in entry.get('courses', [])),
+                learning_objectives=tuple(entry.get('learning_objectives', [])),
+                ambiguous=entry.get('ambiguous', False)
+            ))
+
+        logger.info(f"Loaded skill taxonomy with {len(skills)} skills from {path}")
+        return cls(data.get('categories', []), skills)
+
+    def __len__(self) -> int:
+        return len(self._skills)
+
+    def __contains__(self, skill_name: str) -> bool:
+        return self.canonicalize(skill_name) is not None
+
+    def canonicalize(self, skill_name: str) -> Optional[str]:
+        """Map a skill name or alias ("React.js", "Postgres") to its canonical name"""
+        return self._terms.get(normalize_skill_name(skill_name))
+
+    def get(self, skill_name: str) -> Optional[SkillInfo]:
+        """Look up a skill by canonical name or alias"""
+        canonical = self.canonicalize(skill_name)
+        return self._skills[canonical] if canonical else None
+
+    def resolve(self, skill_name: str) -> Optional[SkillInfo]:
+        """
+        Look up a skill, falling back to the first known skill mentioned in the name
+
+        Args:
+            skill_name: Free-form skill name such as "Advanced Python"
+
+        Returns:
+            Matching SkillInfo or None if no known skill is mentioned
+        """
+        skill = self.get(skill_name)
+        if skill is not None:
+            return skill
+
+        mentioned = self._name_matcher.find_skills(skill_name or '')
+        return self._skills[mentioned[0]] if mentioned else None
+
+    def find_skills(self, text: str) -> List[str]:
+        """Return canonical names of skills mentioned in free text, in order of appearance"""
+        return self._posting_matcher.find_skills(text)
+
+    def skills(self) -> Tuple[SkillInfo, ...]:
+        """All taxonomy entries"""
+        return tuple(self._skills.values())
+
+
+taxonomy = SkillTaxonomy.load()
@@ -0,0 +1,307 @@
+"""
+Write-Behind Queue
+
+Optional write-behind layer for Firebase. Callers hand over multi-path
+updates and return immediately; a background flusher coalesces pending
+updates into as few multi-path writes as possible, retrying failed flushes
+with backoff. Pending values stay readable through an overlay until they
+are written, so a request that follows a write sees it. Remaining updates
+are flushed when the process exits.
+"""
+
+import atexit
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+
+def parent_path(path: str) -> str:
+    return path.rsplit('/', 1)[0] if '/' in path else ''
+
+
+def server_increment(delta: float) -> Dict[str, Any]:
+    """Realtime Database server value adding delta to the number stored at a path"""
+    return {'.sv': {'increment': delta}}
+
+
+def increment_delta(value: Any) -> Optional[float]:
+    """Delta of a server_increment value, or None for any other value"""
+    if isinstance(value, dict) and len(value) == 1 and isinstance(value.get('.sv'), dict):
+        return value['.sv'].get('increment')
+    return None
+
+
+def coalesce(previous: Any, value: Any) -> Any:
+    """
+    Value written by two queued writes to the same path
+
+    The later value wins, except that an increment is added to what the
+    earlier write left: another increment, or a plain number.
+    """
+    previous_delta, delta = increment_delta(previous), increment_delta(value)
+    if delta is None:
+        return value
+    if previous_delta is not None:
+        return server_increment(previous_delta + delta)
+    if isinstance(previous, (int, float)) and not isinstance(previous, bool):
+        return previous + delta
+    return value
+
+
+class _Batch:
+    """Updates flushed together as one multi-path write"""
+
+    def __init__(self):
+        self.updates: Dict[str, Any] = {}
+        self.ancestors = set()
+
+    def conflicts(self, path: str) -> bool:
+        """
+        Whether path overlaps a path already in the batch
+
+        A multi-path update may not contain a path and one of its descendants,
+        and an exact repeat is coalesced (the later value wins, increments add up).
+        """
+        if path in self.ancestors:
+            return True
+        parent = parent_path(path)
+        while parent:
+            if parent in self.updates:
+                return True
+            parent = parent_path(parent)
+        return False
+
+    def add(self, path: str, value: Any) -> None:
+        self.updates[path] = value
+        parent = parent_path(path)
+        while parent:
+            self.ancestors.add(parent)
+            parent = parent_path(parent)
+
+
+class WriteBehindQueue:
+    """Bounded queue of multi-path updates drained by a background flusher"""
+
+    def __init__(self, writer: Callable[[Dict[str, Any]], None],
+                 on_failure: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 on_written: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 max_pending: int = None, batch_size: int = None, flush_interval: float = None,
+                 max_retries: int = None, backoff_base: float = None, backoff_max: float = None):
+        self.writer = writer
+        self.on_failure = on_failure
+        self.on_written = on_written
+        self.max_pending = max_pending if max_pending is not None else Config.FIREBASE_WRITE_BEHIND_MAX_PENDING
+        self.batch_size = batch_size if batch_size is not None else Config.FIREBASE_WRITE_BEHIND_BATCH_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else Config.FIREBASE_WRITE_BEHIND_FLUSH_INTERVAL
+        self.max_retries = max_retries if max_retries is not None else Config.FIREBASE_WRITE_BEHIND_MAX_RETRIES
+        self.backoff_base = backoff_base if backoff_base is not None else Config.RETRY_BACKOFF_BASE
+        self.backoff_max = backoff_max if backoff_max is not None else Config.RETRY_BACKOFF_MAX
+
+        self._batches = deque()
+        self._in_flight: Optional[_Batch] = None
+        self._pending = 0
+        # path -> (value, batch holding its latest write); children indexed by parent path
+        self._overlay: Dict[str, Tuple[Any, _Batch]] = {}
+        self._children: Dict[str, set] = {}
+        self._condition = threading.Condition()
+        self._flusher = None
+        self._closing = False
+        self._flush_requested = False
+
+        self.enqueued = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.retries = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def enqueue(self, updates: Dict[str, Any]) -> bool:
+        """
+        Queue a multi-path update
+
+        All paths of one call are flushed in the same write, so they stay atomic.
+
+        Args:
+            updates: Mapping of database path to the value written there
+
+        Returns:
+            False if the queue is full or closed; the caller should write synchronously
+        """
+        self._ensure_flusher()
+
+        with self._condition:
+            if self._closing or self._pending + len(updates) > self.max_pending:
+                self.rejected += 1
+                return False
+
+            batch = self._batches[-1] if self._batches else None
+            if (batch is None or len(batch.updates) + len(updates) > self.batch_size
+                    or any(batch.conflicts(path) for path in updates)):
+                batch = _Batch()
+                self._batches.append(batch)
+
+            for path, value in updates.items():
+                if path in batch.updates:
+                    value = coalesce(batch.updates[path], value)
+                    self.coalesced += 1
+                else:
+                    self._pending += 1
+                batch.add(path, value)
+                self._overlay[path] = (value, batch)
+                self._children.setdefault(parent_path(path), set()).add(path)
+
+            self.enqueued += 1
+            self._condition.notify_all()
+            return True
+
+    def get(self, path: str, default: Any = MISSING) -> Any:
+        """
+        Pending value written at path
+
+        Returns:
+            The value, or default (MISSING unless given) if nothing is pending
+        """
+        with self._condition:
+            entry = self._overlay.get(path)
+        return entry[0] if entry is not None else default
+
+    def pending_children(self, path: str) -> Dict[str, Any]:
+        """Pending values written directly below path, keyed by child name"""
+        with self._condition:
+            return {child.rsplit('/', 1)[1]: self._overlay[child][0]
+                    for child in self._children.get(path, ())}
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Block until every queued update has been written (or given up on)
+
+        Returns:
+            True if the queue drained within the timeout
+        """
+        self._ensure_flusher()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        with self._condition:
+            while self._batches or self._in_flight is not None:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._flush_requested = True
+                self._condition.notify_all()
+                self._condition.wait(remaining)
+        return True
+
+    def close(self, timeout: float = None) -> bool:
+        """Stop accepting updates and flush what is queued"""
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        drained = self.flush(timeout)
+        if not drained:
+            logger.error(f"Write-behind queue closed with {self._pending} unwritten path(s)")
+        return drained
+
+    def stats(self) -> Dict:
+        """Queue depth and flush counters for monitoring"""
+        with self._condition:
+            return {
+                'pending': self._pending,
+                'batches': len(self._batches) + (1 if self._in_flight is not None else 0),
+                'max_pending': self.max_pending,
+                'enqueued': self.enqueued,
+                'coalesced': self.coalesced,
+                'flushes': self.flushes,
+                'retries': self.retries,
+                'failed': self.failed,
+                'rejected': self.rejected
+            }
+
+    def _ensure_flusher(self) -> None:
+        # Started lazily so the thread lives in each gunicorn worker, not the master
+        if self._flusher is not None:
+            return
+
+        with self._condition:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name='firebase-write-behind', daemon=True)
+            self._flusher.start()
+            atexit.register(self.close, Config.FIREBASE_WRITE_BEHIND_SHUTDOWN_TIMEOUT)
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._condition:
+                while not self._batches:
+                    self._condition.wait()
+                # Give concurrent writers a moment to coalesce into the batch
+                deadline = time.monotonic() + self.flush_interval
+                while (not self._closing and not self._flush_requested and len(self._batches) == 1
+                       and len(self._batches[0].updates) < self.batch_size):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch = self._batches.popleft()
+                self._in_flight = batch
+
+            written = self._write_with_retries(batch)
+
+            with self._condition:
+                for path in batch.updates:
+                    entry = self._overlay.get(path)
+                    if entry is not None and entry[1] is batch:
+                        del self._overlay[path]
+                        siblings = self._children.get(parent_path(path))
+                        if siblings is not None:
+                            siblings.discard(path)
+                            if not siblings:
+                                del self._children[parent_path(path)]
+                self._pending -= len(batch.updates)
+                self._in_flight = None
+                if not self._batches:
+                    self._flush_requested = False
+                if written:
+                    self.flushes += 1
+                else:
+                    self.failed += len(batch.updates)
+                self._condition.notify_all()
+
+            if not written and self.on_failure is not None:
+                try:
+                    self.on_failure(batch.updates)
+                except Exception as e:
+                    logger.error(f"Write-behind failure handler raised: {str(e)}")
+            elif written and self.on_written is not None:
+                try:
+                    self.on_written(batch.updates)
+                except Exception as e:
+                    logger.error(f"Write-behind written handler raised: {str(e)}")
+
+    def _write_with_retries(self, batch: _Batch) -> bool:
+        attempt = 0
+        while True:
+            try:
+                self.writer(batch.updates)
+                return True
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    logger.error(f"Giving up on write-behind flush of {len(batch.updates)} path(s): {str(e)}")
+                    return False
+                # Full-jitter exponential backoff; shorter waits while shutting down
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+                if self._closing:
+                    delay = min(delay, self.backoff_base)
+                logger.warning(f"Write-behind flush failed ({str(e)}), retrying in {delay:.2f}s")
+                self.retries += 1
+                time.sleep(delay)
+                attempt += 1
+
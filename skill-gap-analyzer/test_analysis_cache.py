@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-addressed job analysis cache
+Checks that reposts of a posting share a key and that hit/miss accounting
+stays exact when request threads share the cache
+"""
+
+import os
+import sys
+import threading
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.analysis_cache import AnalysisCache, InMemoryCacheBackend, posting_cache_key
+
+
+def test_reposted_posting_shares_a_key():
+    posting = "Python Developer\n• Django\n• AWS\n120 applicants"
+    repost = "  python developer  * django * aws   Posted 3 days ago  "
+    assert posting_cache_key(posting) == posting_cache_key(repost)
+    assert posting_cache_key(posting) != posting_cache_key("Java Developer")
+
+
+def test_counters_are_exact_under_threads():
+    cache = AnalysisCache(InMemoryCacheBackend(max_entries=10), ttl=60)
+    cache.set('hit', {'position_title': 'Developer'})
+    lookups = 5000
+
+    def work():
+        for _ in range(lookups):
+            cache.get('hit')
+            cache.get('miss')
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert stats['hits'] == stats['misses'] == 8 * lookups
+    assert stats['hit_rate'] == 0.5
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✓ {name}")
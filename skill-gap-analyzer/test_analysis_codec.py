@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the analysis storage codec
+Encoded analyses must decode to exactly what was stored, keep their
+metadata readable without decoding, and records written before the codec
+must still read as they are
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.analysis_codec import METADATA_FIELDS, decode_analysis, encode_analysis, is_encoded
+
+ANALYSIS = {
+    'analysis_id': 'a1',
+    'created_at': '2026-10-18T07:00:00',
+    'user_id': 'u1',
+    'version': '1.0',
+    'job_analysis': {'position_title': 'Backend Engineer', 'required_skills': ['Python', 'Node.js', 'C#']},
+    'skill_comparison': {'matched_skills': ['Python'], 'missing_skills': ['Node.js', 'C#'], 'match_percentage': 33.3},
+    'learning_path': {'phases': [{'title': 'Café basics — 日本語', 'weeks': 2, 'optional': False, 'notes': None}]},
+    'timestamp': '2026-10-18T07:00:00'
+}
+
+
+def test_z1_round_trip():
+    stored = encode_analysis(ANALYSIS, 'z1')
+    assert is_encoded(stored) and stored['codec'] == 'z1'
+    assert decode_analysis(stored) == ANALYSIS
+
+
+def test_metadata_stays_plain():
+    stored = encode_analysis(dict(ANALYSIS, job_analysis_ref='abc'), 'z1')
+    assert {key: stored[key] for key in METADATA_FIELDS} == {
+        'analysis_id': 'a1', 'created_at': '2026-10-18T07:00:00', 'user_id': 'u1', 'version': '1.0',
+        'job_analysis_ref': 'abc'}
+    assert 'skill_comparison' not in stored and 'timestamp' not in stored
+
+
+def test_every_compression_level_decodes():
+    for level in (0, 1, 6, 9):
+        assert decode_analysis(encode_analysis(ANALYSIS, 'z1', level=level)) == ANALYSIS
+
+
+def test_plain_records_are_returned_unchanged():
+    assert decode_analysis(ANALYSIS) is ANALYSIS
+    assert decode_analysis(None) is None
+
+
+def test_unknown_codec_is_an_error():
+    stored = dict(encode_analysis(ANALYSIS, 'z1'), codec='z9')
+    try:
+        decode_analysis(stored)
+    except ValueError as e:
+        assert 'z9' in str(e)
+    else:
+        raise AssertionError('unknown codec decoded')
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✓ {name}")
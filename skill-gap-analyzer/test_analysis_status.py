@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for asynchronous analysis status across workers
+Workers share only the local store, as gunicorn workers on one host do; a
+job queued on one worker must be reported by the others while it is queued,
+running, and after it failed
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+from services.analysis_queue import AnalysisQueue
+from services.firebase_service import FirebaseService
+from services.local_store import SQLiteLocalStore
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'local_store.db')
+
+
+def other_worker_app():
+    """An app whose only link to the submitting worker is the shared SQLite store"""
+    from app import create_app
+    saved = Config.LOCAL_STORE_BACKEND, Config.LOCAL_STORE_DB_PATH
+    Config.LOCAL_STORE_BACKEND, Config.LOCAL_STORE_DB_PATH = 'sqlite', DB_PATH
+    try:
+        return create_app()
+    finally:
+        Config.LOCAL_STORE_BACKEND, Config.LOCAL_STORE_DB_PATH = saved
+
+
+def submitting_worker():
+    service = FirebaseService(local_store=SQLiteLocalStore(DB_PATH))
+    return AnalysisQueue(max_workers=1, max_queue_size=10, on_status=service.store_analysis_status)
+
+
+def wait_for(analysis_queue, analysis_id):
+    assert analysis_queue.get_status(analysis_id, wait=5)['status'] in (AnalysisQueue.COMPLETED, AnalysisQueue.FAILED)
+
+
+def test_queued_and_running_jobs_are_visible_to_other_workers():
+    analysis_queue = submitting_worker()
+    client = other_worker_app().test_client()
+    release = threading.Event()
+
+    analysis_queue.submit('running-job', release.wait, 5)
+    analysis_queue.submit('queued-job', lambda: None)
+    try:
+        deadline = time.monotonic() + 5
+        while client.get('/api/analysis/running-job/status').get_json()['status'] != AnalysisQueue.RUNNING:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert client.get('/api/analysis/queued-job/status').get_json()['status'] == AnalysisQueue.QUEUED
+    finally:
+        release.set()
+
+    wait_for(analysis_queue, 'queued-job')
+    status = client.get('/api/analysis/running-job/status').get_json()
+    assert status['status'] == AnalysisQueue.COMPLETED
+    assert status['results_url'] == '/results/running-job'
+
+
+def test_failed_jobs_are_reported_by_other_workers():
+    analysis_queue = submitting_worker()
+    client = other_worker_app().test_client()
+
+    def fail():
+        raise RuntimeError('upstream down')
+
+    analysis_queue.submit('failed-job', fail)
+    wait_for(analysis_queue, 'failed-job')
+
+    status = client.get('/api/analysis/failed-job/status').get_json()
+    assert status['status'] == AnalysisQueue.FAILED
+    assert status['error'] == 'Analysis failed. Please try again.'
+    assert 'results_url' not in status
+
+
+def test_long_poll_follows_the_shared_status():
+    analysis_queue = submitting_worker()
+    client = other_worker_app().test_client()
+    release = threading.Event()
+
+    analysis_queue.submit('slow-job', release.wait, 5)
+    threading.Timer(0.3, release.set).start()
+    started = time.monotonic()
+    status = client.get('/api/analysis/slow-job/status?wait=5').get_json()
+    assert status['status'] == AnalysisQueue.COMPLETED
+    assert time.monotonic() - started < 4
+
+
+def test_unknown_jobs_are_not_found():
+    client = other_worker_app().test_client()
+    assert client.get('/api/analysis/no-such-job/status').status_code == 404
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✓ {name}")
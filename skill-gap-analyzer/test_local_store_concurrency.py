@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Concurrency stress test for the local store
+Hammers both backends and FirebaseService's local fallback from many threads,
+as a gthread gunicorn worker does, and checks that no update is lost and no
+reader sees a value change underneath it
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.local_store import LOCK_STRIPES, InMemoryLocalStore, SQLiteLocalStore
+
+THREADS = 16
+
+
+def run_threads(target, count=THREADS):
+    """Start count threads on target(index) together and re-raise the first failure"""
+    errors = []
+    barrier = threading.Barrier(count)
+
+    def run(index):
+        try:
+            barrier.wait()
+            target(index)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+def check_no_lost_updates(store, increments):
+    """Concurrent read-modify-write updates of shared and per-thread keys all land"""
+    def hammer(index):
+        for i in range(increments):
+            store.update(f'counters/shared-{i % 4}', lambda value: (value or 0) + 1)
+            store.update(f'users/user-{index}', lambda user: {'updates': (user or {}).get('updates', 0) + 1})
+
+    run_threads(hammer)
+
+    assert sum(store.get(f'counters/shared-{i}') for i in range(4)) == THREADS * increments
+    for index in range(THREADS):
+        assert store.get(f'users/user-{index}') == {'updates': increments}
+
+
+def test_memory_store_loses_no_updates():
+    check_no_lost_updates(InMemoryLocalStore(max_entries=1000, max_bytes=1024 * 1024), 2000)
+
+
+def test_sqlite_store_loses_no_updates():
+    with tempfile.TemporaryDirectory() as directory:
+        check_no_lost_updates(SQLiteLocalStore(os.path.join(directory, 'store.db'), 1000, 1024 * 1024), 100)
+
+
+def test_readers_never_see_values_change():
+    """Values read while writers keep replacing them stay internally consistent"""
+    store = InMemoryLocalStore(max_entries=1000, max_bytes=16 * 1024 * 1024)
+    stop = threading.Event()
+
+    def append_entry(record):
+        record = record or {'count': 0, 'entries': []}
+        count = record['count'] + 1
+        return {'count': count, 'entries': (record['entries'] + [count])[-200:]}
+
+    def work(index):
+        if index % 2:
+            for _ in range(1000):
+                store.update(f'records/{index % 4}', append_entry)
+            stop.set()
+            return
+        while not stop.is_set():
+            record = store.get(f'records/{index % 4}')
+            if record:
+                count, entries = record['count'], list(record['entries'])
+                assert entries == list(range(count - min(count, 200) + 1, count + 1))
+            store.items('records/')
+            store.stats()
+
+    run_threads(work)
+
+
+def test_unrelated_keys_do_not_wait_for_a_slow_update():
+    """A long update() callback blocks writers of its own key only"""
+    store = InMemoryLocalStore(max_entries=1000, max_bytes=1024 * 1024)
+    slow_key = 'users/slow'
+    other_key = next(f'users/other-{i}' for i in range(1000)
+                     if hash(f'users/other-{i}') % LOCK_STRIPES != hash(slow_key) % LOCK_STRIPES)
+    in_callback = threading.Event()
+    release = threading.Event()
+
+    def slow_update(value):
+        in_callback.set()
+        release.wait(5)
+        return 'slow'
+
+    updater = threading.Thread(target=store.update, args=(slow_key, slow_update))
+    updater.start()
+    try:
+        assert in_callback.wait(5)
+        done = threading.Event()
+        writer = threading.Thread(target=lambda: (store.set(other_key, 'fast'), store.get(other_key), done.set()))
+        writer.start()
+        assert done.wait(2), 'write to an unrelated key waited for another key\'s update'
+        writer.join()
+    finally:
+        release.set()
+        updater.join()
+
+    assert store.get(slow_key) == 'slow' and store.get(other_key) == 'fast'
+
+
+def test_firebase_service_local_fallback_under_threads():
+    """Progress updates, analyses, reads and cleanup interleave without losing data"""
+    from services.firebase_service import FirebaseService
+
+    firebase_service = FirebaseService(local_store=InMemoryLocalStore(max_entries=100000, max_bytes=256 * 1024 * 1024))
+    firebase_service.firebase_initialized = False
+    updates_per_thread = 100
+
+    def work(index):
+        user_id = f'user-{index % 4}'
+        for i in range(updates_per_thread):
+            assert firebase_service.update_skill_progress(user_id, f'Skill {i % 10}', i % 10 + 1)
+            if i % 10 == 0:
+                firebase_service.store_analysis({'skill_comparison': {}, 'learning_path': {}}, user_id=user_id)
+                firebase_service.get_user_analyses(user_id, limit=5)
+                firebase_service.cleanup_old_data(30)
+            progress = firebase_service.get_user_progress(user_id)
+            assert 'error' not in progress
+
+    run_threads(work)
+
+    for user in range(4):
+        progress = firebase_service.get_user_progress(f'user-{user}')
+        assert progress['statistics']['total_updates'] == updates_per_thread * THREADS // 4
+        assert progress['statistics']['total_skills'] == 10
+        assert len(firebase_service.get_user_analyses(f'user-{user}', limit=100)) == 10 * THREADS // 4
+
+
+
+def test_expiry_slots_are_claimed_once_under_threads():
+    """Analyses stored from many threads fill each expiry slot exactly up to its size"""
+    from services.firebase_service import EXPIRY_SLOT_SIZE, FirebaseService
+
+    firebase_service = FirebaseService(local_store=InMemoryLocalStore(max_entries=100000, max_bytes=256 * 1024 * 1024))
+    firebase_service.firebase_initialized = False
+    analyses_per_thread = 40
+
+    def work(index):
+        for _ in range(analyses_per_thread):
+            firebase_service.store_analysis({'skill_comparison': {}, 'learning_path': {}}, user_id=f'user-{index}')
+
+    # Switch threads far more often than usual, so an unguarded read-modify-write shows up
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        run_threads(work)
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    slots = firebase_service.local_storage.get('expiry_slots')
+    sizes = [len(firebase_service.local_storage.get(f'expiry_index/{slot}')) for slot in slots]
+    assert sum(sizes) == analyses_per_thread * THREADS
+    # Only an hour boundary during the run can leave more than one slot short
+    assert all(size <= EXPIRY_SLOT_SIZE for size in sizes)
+    assert sum(1 for size in sizes if size < EXPIRY_SLOT_SIZE) <= 2
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✓ {name}")
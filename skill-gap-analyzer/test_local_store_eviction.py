@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Eviction tests for the local store
+The fallback store may drop analyses to stay within its bounds, but never
+user records or the indexes pointing at analyses
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.local_store import FALLBACK_EVICTABLE_PREFIXES, InMemoryLocalStore, SQLiteLocalStore
+
+KEPT = ('users/u1', 'user_analyses/u1', 'expiry_slots', 'expiry_index/2026-10-18T06/1-abc')
+
+
+def stores():
+    path = os.path.join(tempfile.mkdtemp(), 'local_store.db')
+    yield InMemoryLocalStore(max_entries=10, max_bytes=10 ** 6, evictable_prefixes=FALLBACK_EVICTABLE_PREFIXES)
+    yield SQLiteLocalStore(path, max_entries=10, max_bytes=10 ** 6, evictable_prefixes=FALLBACK_EVICTABLE_PREFIXES)
+
+
+def test_only_analyses_are_evicted():
+    for store in stores():
+        for key in KEPT:
+            store.set(key, {'kept': key})
+        for i in range(20):
+            store.set(f'analyses/a{i}', {'analysis_id': f'a{i}'})
+            store.set(f'job_analyses/j{i}', {'referenced_at': str(i)})
+        store.measure()
+
+        assert len(store) == 10
+        assert all(store.get(key) == {'kept': key} for key in KEPT)
+        assert store.get('analyses/a19') and store.get('job_analyses/j19')
+        assert store.get('analyses/a0') is None
+        assert store.stats()['evicted_lru'] == 34
+
+
+def test_only_analyses_expire():
+    for store in stores():
+        store.set('users/u1', {'skills': {}}, ttl=0.01)
+        store.set('analyses/a1', {'analysis_id': 'a1'}, ttl=0.01)
+        time.sleep(0.02)
+        assert store.get('users/u1') == {'skills': {}}
+        assert store.get('analyses/a1') is None
+
+
+def test_protected_entries_may_exceed_the_bounds():
+    for store in stores():
+        for i in range(12):
+            store.set(f'users/u{i}', {'skills': {}})
+        store.set('analyses/a1', {'analysis_id': 'a1'})
+        store.set('analyses/a2', {'analysis_id': 'a2'})
+        store.measure()
+        assert all(store.get(f'users/u{i}') for i in range(12))
+        assert store.get('analyses/a1') is None
+
+
+def test_existing_database_rows_are_classified():
+    path = os.path.join(tempfile.mkdtemp(), 'local_store.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE local_store (key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, '
+                 'expires_at REAL, updated_at REAL NOT NULL)')
+    conn.execute("INSERT INTO local_store VALUES ('users/old', '{}', 11, NULL, 0)")
+    conn.commit()
+    conn.close()
+
+    store = SQLiteLocalStore(path, max_entries=2, max_bytes=10 ** 6, evictable_prefixes=FALLBACK_EVICTABLE_PREFIXES)
+    for i in range(3):
+        store.set(f'analyses/a{i}', {'analysis_id': f'a{i}'})
+    assert store.get('users/old') == {}
+    assert store.get('analyses/a2') and store.get('analyses/a0') is None
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✓ {name}")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for the progress update endpoints
+Single and batch updates accept the same proficiency levels: integers
+from 1 to 10
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+
+INVALID_LEVELS = (0, 11, '5', 5.5, True)
+
+
+def create_test_app():
+    from app import create_app
+    saved = Config.LOCAL_STORE_BACKEND
+    Config.LOCAL_STORE_BACKEND = 'memory'
+    try:
+        return create_app()
+    finally:
+        Config.LOCAL_STORE_BACKEND = saved
+
+
+client = create_test_app().test_client()
+
+
+def update(level, skill_name='Python'):
+    return client.post('/api/update-progress', json={'user_id': 'u1', 'skill_name': skill_name, 'proficiency_level': level})
+
+
+def test_single_update_validates_the_level():
+    assert update(7).status_code == 200
+    for level in INVALID_LEVELS:
+        response = update(level)
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'proficiency_level must be an integer from 1 to 10'
+    assert update(5, skill_name='  ').get_json()['error'] == 'skill_name is required'
+    assert update(None).get_json()['error'] == 'Missing required fields'
+
+
+def test_batch_update_validates_each_item_alike():
+    items = [{'skill_name': 'SQL', 'proficiency_level': 4}] + [
+        {'skill_name': 'Go', 'proficiency_level': level} for level in INVALID_LEVELS]
+    body = client.post('/api/update-progress-batch', json={'user_id': 'u2', 'updates': items}).get_json()
+
+    assert body['updated'] == 1 and body['invalid'] == len(INVALID_LEVELS)
+    assert [result['status'] for result in body['results']] == ['updated'] + ['invalid'] * len(INVALID_LEVELS)
+    assert {result.get('error') for result in body['results'][1:]} == {'proficiency_level must be an integer from 1 to 10'}
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✓ {name}")
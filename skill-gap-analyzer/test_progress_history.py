@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Tests for progress history paging
+Pages come newest first and a page's next_cursor leads to the entries
+right before it, without reading the rest of the history
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.firebase_service import FirebaseService, history_page
+from services.local_store import InMemoryLocalStore
+
+
+def test_history_page_walks_back_by_cursor():
+    history = [{'entry_id': f'-{i:03d}', 'proficiency_level': i} for i in range(7)]
+    first = history_page(history, 3)
+    assert [entry['entry_id'] for entry in first['entries']] == ['-006', '-005', '-004']
+
+    second = history_page(history, 3, first['next_cursor'])
+    assert [entry['entry_id'] for entry in second['entries']] == ['-003', '-002', '-001']
+
+    last = history_page(history, 3, second['next_cursor'])
+    assert [entry['entry_id'] for entry in last['entries']] == ['-000']
+    assert last['next_cursor'] is None
+
+
+def test_progress_returns_the_newest_page_and_running_statistics():
+    service = FirebaseService(local_store=InMemoryLocalStore(1000, 10 ** 7), write_behind=False)
+    for level in range(1, 6):
+        assert service.update_skill_progress('u1', 'Node.js', level)
+
+    progress = service.get_user_progress('u1', history_limit=2)
+    assert [entry['proficiency_level'] for entry in progress['progress_history']] == [5, 4]
+    assert list(progress['current_skills']) == ['Node%2Ejs']
+    assert progress['statistics']['total_updates'] == 5
+    assert progress['statistics']['average_proficiency'] == 5.0
+
+    older = service.get_progress_history_page('u1', limit=10, cursor=progress['history_cursor'])
+    assert [entry['proficiency_level'] for entry in older['entries']] == [3, 2, 1]
+    assert older['next_cursor'] is None
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✓ {name}")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for progress statistics kept at write time
+Statistics change by increments from each skill's previous level, users
+stored before statistics were kept are seeded once, and queued increments
+of concurrent batches add up
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.firebase_service import (FirebaseService, apply_statistics_changes, progress_statistics_changes,
+                                       summarize_progress_statistics)
+from services.local_store import InMemoryLocalStore
+from services.write_behind import WriteBehindQueue, server_increment
+
+LEGACY_USER = {
+    'skills': {
+        'Python': {'skill_name': 'Python', 'proficiency_level': 4, 'updated_at': '2025-01-01T00:00:00'},
+        'SQL': {'skill_name': 'SQL', 'proficiency_level': 6, 'updated_at': '2025-01-02T00:00:00'}
+    },
+    'progress_history': [
+        {'skill_name': 'Python', 'proficiency_level': 4, 'updated_at': '2025-01-01T00:00:00'},
+        {'skill_name': 'SQL', 'proficiency_level': 6, 'updated_at': '2025-01-02T00:00:00'}
+    ]
+}
+
+
+def local_service():
+    return FirebaseService(local_store=InMemoryLocalStore(1000, 10 ** 7), write_behind=False)
+
+
+def entry(level, updated_at='2026-10-18T07:00:00'):
+    return {'proficiency_level': level, 'updated_at': updated_at}
+
+
+def test_statistics_follow_each_skills_previous_level():
+    service = local_service()
+    assert service.update_skill_progress_batch('u1', [('Python', 3), ('SQL', 5)])
+    assert service.update_skill_progress_batch('u1', [('Python', 6), ('Python', 8), ('Go', 2)])
+
+    statistics = service.get_user_progress('u1')['statistics']
+    assert statistics['total_skills'] == 3
+    assert statistics['average_proficiency'] == 5.0
+    assert statistics['total_updates'] == 5
+    assert statistics['last_updated'] == service.local_storage.get('users/u1')['skills']['Go']['updated_at']
+
+
+def test_legacy_users_are_seeded_once_and_then_counted():
+    service = local_service()
+    service.local_storage.set('users/legacy', LEGACY_USER)
+    assert service.get_user_progress('legacy')['statistics']['total_updates'] == 2
+
+    # Both updates hit the legacy skills; each must still count
+    assert service.update_skill_progress('legacy', 'Python', 7)
+    assert service.update_skill_progress('legacy', 'SQL', 8)
+
+    statistics = service.get_user_progress('legacy')['statistics']
+    assert statistics['total_updates'] == 4
+    assert statistics['total_skills'] == 2
+    assert statistics['average_proficiency'] == 7.5
+
+
+def test_existing_statistics_only_get_increments():
+    skills = {'Python': entry(4)}
+    changes = progress_statistics_changes({'total_skills': 1, 'proficiency_sum': 4, 'total_updates': 1}, skills,
+                                          [('Python', entry(6)), ('Go', entry(3))])
+    assert changes == {
+        'total_skills': server_increment(1),
+        'proficiency_sum': server_increment(5),
+        'total_updates': server_increment(2),
+        'last_updated': '2026-10-18T07:00:00'
+    }
+
+
+def test_queued_batches_merge_their_increments():
+    writes = []
+    queue = WriteBehindQueue(writes.append, flush_interval=60, max_retries=0, max_pending=100, batch_size=50)
+    stored = {'total_skills': 1, 'proficiency_sum': 4, 'total_updates': 1, 'last_updated': ''}
+    skills = {'Python': entry(4)}
+    batches = [[('Python', entry(6))], [('Go', entry(3)), ('Go', entry(5))], [('Rust', entry(2, '2026-10-18T08:00:00'))]]
+
+    expected = stored
+    for batch in batches:
+        changes = progress_statistics_changes(stored, skills, batch)
+        queue.enqueue({f'users/u1/statistics/{field}': value for field, value in changes.items()})
+        expected = apply_statistics_changes(expected, changes)
+    assert queue.flush(timeout=5)
+
+    assert len(writes) == 1
+    written = apply_statistics_changes(stored, {path.rsplit('/', 1)[1]: value for path, value in writes[0].items()})
+    assert written == expected == {'total_skills': 3, 'proficiency_sum': 13, 'total_updates': 5,
+                                   'last_updated': '2026-10-18T08:00:00'}
+
+
+def test_seed_and_later_increments_merge_in_one_write():
+    writes = []
+    queue = WriteBehindQueue(writes.append, flush_interval=60, max_retries=0, max_pending=100, batch_size=50)
+    seed = progress_statistics_changes(None, LEGACY_USER['skills'], [('Python', entry(7))], history_count=2)
+    assert seed['total_updates'] == 3 and seed['proficiency_sum'] == 13
+    later = progress_statistics_changes(seed, dict(LEGACY_USER['skills'], Python=entry(7)), [('SQL', entry(8))])
+
+    for changes in (seed, later):
+        queue.enqueue({f'statistics/{field}': value for field, value in changes.items()})
+    assert queue.flush(timeout=5)
+    assert writes[0]['statistics/total_updates'] == 4
+    assert writes[0]['statistics/proficiency_sum'] == 15
+
+
+def test_summary_only_divides():
+    assert summarize_progress_statistics({'total_skills': 3, 'proficiency_sum': 16, 'total_updates': 9,
+                                          'last_updated': 'x'}) == {
+        'total_skills': 3, 'average_proficiency': 5.3, 'total_updates': 9, 'last_updated': 'x'}
+    assert summarize_progress_statistics(None)['average_proficiency'] == 0
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✓ {name}")
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Tests for the token-bucket rate limiter
+A rate of 0 turns a limiter off rather than refusing to start
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.rate_limiter import InMemoryRateLimitBackend, RateLimiter, get_upstream_rate_limiter
+
+
+def test_burst_then_limited():
+    limiter = RateLimiter('test', 60, 2, backend=InMemoryRateLimitBackend())
+    assert limiter.check('client')[0]
+    assert limiter.check('client')[0]
+    allowed, retry_after = limiter.check('client')
+    assert not allowed and 0 < retry_after <= 1
+    assert limiter.check('other client')[0]
+
+
+def test_zero_rate_disables_the_limiter():
+    for rate in (0, -1):
+        limiter = RateLimiter('disabled', rate, 1, backend=InMemoryRateLimitBackend())
+        assert all(limiter.check('client') == (True, 0.0) for _ in range(100))
+        assert limiter.acquire('client', max_wait=0)
+        assert limiter.stats()['enabled'] is False
+        assert limiter.limited == 0
+
+
+def test_zero_rate_disables_an_upstream_limiter():
+    limiter = get_upstream_rate_limiter('test-disabled-upstream', 0)
+    assert all(limiter.acquire(max_wait=0) for _ in range(100))
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✓ {name}")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for conditional requests on /results
+A revalidation with the current ETag gets a 304 without loading the
+analysis; a stale ETag gets the page again and an unknown analysis a 404
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+
+POSTING = "Backend Engineer\nWe need Python, Django, PostgreSQL and Docker experience."
+
+
+def create_test_app():
+    from app import create_app
+    saved = Config.LOCAL_STORE_BACKEND
+    Config.LOCAL_STORE_BACKEND = 'memory'
+    try:
+        return create_app()
+    finally:
+        Config.LOCAL_STORE_BACKEND = saved
+
+
+client = create_test_app().test_client()
+analysis_id = client.post('/analyze', json={'job_posting': POSTING, 'user_skills': ['Python']}).get_json()['analysis_id']
+
+
+def test_results_carry_an_etag():
+    response = client.get(f'/results/{analysis_id}')
+    assert response.status_code == 200
+    assert response.headers['ETag'].startswith(f'"{analysis_id}-')
+    assert 'private' in response.headers['Cache-Control']
+
+
+def test_revalidation_with_current_etag_is_not_modified():
+    etag = client.get(f'/results/{analysis_id}').headers['ETag']
+    response = client.get(f'/results/{analysis_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+
+def test_stale_etag_gets_the_page():
+    response = client.get(f'/results/{analysis_id}', headers={'If-None-Match': '"stale"'})
+    assert response.status_code == 200
+    assert response.data
+
+
+def test_unknown_analysis_is_not_found_even_when_revalidating():
+    etag = client.get(f'/results/{analysis_id}').headers['ETag']
+    response = client.get('/results/no-such-analysis', headers={'If-None-Match': etag.replace(analysis_id, 'no-such-analysis')})
+    assert response.status_code == 404
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✓ {name}")
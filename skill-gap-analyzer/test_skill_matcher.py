@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for the Aho-Corasick skill matcher
+Covers the word-boundary edge cases the substring scan it replaced got wrong
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.skill_matcher import SkillMatcher
+
+TERMS = {
+    'java': 'Java',
+    'javascript': 'JavaScript',
+    'sql': 'SQL',
+    'postgresql': 'PostgreSQL',
+    'c': 'C',
+    'c++': 'C++',
+    'c#': 'C#',
+    'node': 'Node',
+    'node.js': 'Node.js',
+    'js': 'JavaScript',
+    'react': 'React',
+    'react native': 'React Native',
+    'machine learning': 'Machine Learning'
+}
+
+matcher = SkillMatcher(TERMS)
+
+
+def test_java_does_not_match_inside_javascript():
+    assert matcher.find_skills('Senior JavaScript engineer') == ['JavaScript']
+    assert matcher.find_skills('Java and JavaScript') == ['Java', 'JavaScript']
+
+
+def test_sql_does_not_match_inside_postgresql():
+    assert matcher.find_skills('PostgreSQL administration') == ['PostgreSQL']
+    assert matcher.find_skills('SQL, PostgreSQL') == ['SQL', 'PostgreSQL']
+
+
+def test_symbols_continue_a_token():
+    assert matcher.find_skills('C++ and C# developers') == ['C++', 'C#']
+    assert matcher.find_skills('Embedded C, some C++') == ['C', 'C++']
+
+
+def test_dotted_names_match_whole():
+    assert matcher.find_skills('Backend in Node.js.') == ['Node.js']
+    assert matcher.find_skills('node, then js') == ['Node', 'JavaScript']
+
+
+def test_longest_term_wins_and_whitespace_is_folded():
+    assert matcher.find_skills('React  Native apps') == ['React Native']
+    assert matcher.find_skills('MACHINE\nLEARNING and React') == ['Machine Learning', 'React']
+
+
+def test_repeated_mentions_are_reported_once_in_order():
+    assert matcher.find_skills('SQL, Java, SQL again, java') == ['SQL', 'Java']
+    assert matcher.find_matches('java') == [(0, 4, 'Java')]
+    assert matcher.find_skills('') == []
+
+
+def test_taxonomy_skills_in_a_posting():
+    from services.skill_taxonomy import taxonomy
+    assert taxonomy.find_skills('We need JavaScript, PostgreSQL and Node.js experience') == ['javascript', 'postgresql', 'node.js']
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✓ {name}")
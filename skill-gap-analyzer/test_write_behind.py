@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the Firebase write-behind queue
+Covers coalescing of queued writes, server increments adding up, and the
+overlay that keeps unwritten values readable
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.write_behind import MISSING, WriteBehindQueue, increment_delta, server_increment
+
+
+def make_queue(fail=False, **kwargs):
+    """Queue that only writes when flushed, recording every multi-path write"""
+    writes, failures = [], []
+
+    def writer(updates):
+        if fail:
+            raise ConnectionError('Firebase unavailable')
+        writes.append(dict(updates))
+
+    settings = dict(flush_interval=60, max_retries=0, backoff_base=0, max_pending=100, batch_size=50)
+    settings.update(kwargs)
+    return WriteBehindQueue(writer, on_failure=failures.append, **settings), writes, failures
+
+
+def test_repeated_writes_coalesce_into_one_write():
+    queue, writes, _ = make_queue()
+    for level in range(1, 6):
+        assert queue.enqueue({'users/u1/skills/Python/proficiency_level': level, f'history/{level}': level})
+    assert queue.flush(timeout=5)
+
+    assert len(writes) == 1
+    assert writes[0]['users/u1/skills/Python/proficiency_level'] == 5
+    assert sorted(key for key in writes[0] if key.startswith('history/')) == [f'history/{i}' for i in range(1, 6)]
+    assert queue.stats()['coalesced'] == 4
+
+
+def test_queued_increments_add_up():
+    queue, writes, _ = make_queue()
+    path = 'users/u1/statistics/total_updates'
+    queue.enqueue({path: server_increment(2)})
+    queue.enqueue({path: server_increment(3)})
+    assert increment_delta(queue.get(path)) == 5
+
+    # A plain value replaces earlier increments; later increments are not folded into it
+    queue.enqueue({'users/u2/statistics/total_updates': server_increment(1)})
+    queue.enqueue({'users/u2/statistics/total_updates': 7})
+    assert queue.flush(timeout=5)
+    assert writes == [{path: server_increment(5), 'users/u2/statistics/total_updates': 7}]
+
+
+def test_overlay_serves_unwritten_values():
+    queue, _, _ = make_queue()
+    queue.enqueue({'users/u1/skills/Python': {'proficiency_level': 3}, 'users/u1/skills/SQL': {'proficiency_level': 5}})
+
+    assert queue.get('users/u1/skills/Python') == {'proficiency_level': 3}
+    assert queue.get('users/u1/skills/Go') is MISSING
+    assert queue.get('users/u1/skills/Go', None) is None
+    assert set(queue.pending_children('users/u1/skills')) == {'Python', 'SQL'}
+
+    assert queue.flush(timeout=5)
+    assert queue.get('users/u1/skills/Python') is MISSING
+    assert queue.pending_children('users/u1/skills') == {}
+
+
+def test_overlapping_paths_are_written_in_order():
+    queue, writes, _ = make_queue()
+    queue.enqueue({'users/u1/profile': {'name': 'Ada'}})
+    queue.enqueue({'users/u1/profile/name': 'Grace'})
+    assert queue.get('users/u1/profile/name') == 'Grace'
+    assert queue.flush(timeout=5)
+    assert writes == [{'users/u1/profile': {'name': 'Ada'}}, {'users/u1/profile/name': 'Grace'}]
+
+
+def test_full_queue_rejects_and_failed_writes_are_handed_back():
+    queue, _, failures = make_queue(fail=True, max_pending=2)
+    assert queue.enqueue({'analyses/a1': {'created_at': '2026-10-18'}, 'user_analyses/u1/a1': 'x'})
+    assert not queue.enqueue({'analyses/a2': {'created_at': '2026-10-18'}})
+    assert queue.flush(timeout=5)
+
+    assert failures == [{'analyses/a1': {'created_at': '2026-10-18'}, 'user_analyses/u1/a1': 'x'}]
+    assert queue.get('analyses/a1') is MISSING
+    assert queue.stats()['failed'] == 2 and queue.stats()['rejected'] == 1
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✓ {name}")